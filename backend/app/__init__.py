@@ -1,61 +1,110 @@
 from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from flask_socketio import SocketIO
-from flask_mail import Mail
-from flask_sqlalchemy import SQLAlchemy
-from apscheduler.schedulers.background import BackgroundScheduler
 from dotenv import load_dotenv
+import click
+from .extensions import db, mail, migrate, scheduler, socketio
+from .utils import database, metrics
+from .utils.market_data import market_data
+from .utils.stock_updater import price_stream
+from .utils.alerts import alert_engine
+from .utils.response_cache import response_cache
+from .utils.bar_store import bar_store
+from .strategies.incremental import live_signals
 import os
 
 load_dotenv()
 
-db = SQLAlchemy()
-socketio = SocketIO()
-scheduler = BackgroundScheduler()
-mail = Mail()
-
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
     
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///robinhood_dashboard.db'
+    app.config['SQLALCHEMY_DATABASE_URI'] = database.database_url()
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLITE_JOURNAL_MODE'] = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config['SQLITE_BUSY_TIMEOUT'] = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))
+    app.config['SQLITE_SYNCHRONOUS'] = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', 10))
+    app.config['DB_MAX_OVERFLOW'] = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    app.config['DB_POOL_TIMEOUT'] = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    app.config['DB_POOL_RECYCLE'] = int(os.getenv('DB_POOL_RECYCLE', 1800))
     app.config['JWT_SECRET_KEY'] = os.getenv('SECRET_KEY')
+    app.config['USER_CACHE_TTL'] = int(os.getenv('USER_CACHE_TTL', 60))
     app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER')
     app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT', 587))
     app.config['MAIL_USE_TLS'] = os.getenv('MAIL_USE_TLS', 'True') == 'True'
     app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
     app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
+    app.config['NOTIFICATION_SENDER'] = os.getenv('NOTIFICATION_SENDER', 'noreply@robinhooddashboard.com')
+    app.config['NOTIFICATION_QUEUE_SIZE'] = int(os.getenv('NOTIFICATION_QUEUE_SIZE', 1000))
+    app.config['NOTIFICATION_WORKERS'] = int(os.getenv('NOTIFICATION_WORKERS', 2))
+    app.config['NOTIFICATION_BATCH_SIZE'] = int(os.getenv('NOTIFICATION_BATCH_SIZE', 50))
+    app.config['NOTIFICATION_JOB_RETENTION'] = int(os.getenv('NOTIFICATION_JOB_RETENTION', 86400))
+    app.config['MARKET_DATA_TTL'] = int(os.getenv('MARKET_DATA_TTL', 60))
+    app.config['MARKET_DATA_CACHE_SIZE'] = int(os.getenv('MARKET_DATA_CACHE_SIZE', 1024))
+    # Keep enabled in every process that serves Socket.IO clients; see schedule_stock_updates.
+    app.config['SCHEDULER_ENABLED'] = os.getenv('SCHEDULER_ENABLED', 'True') == 'True'
+    app.config['PRICE_STREAM_MIN_TICK'] = float(os.getenv('PRICE_STREAM_MIN_TICK', 0.01))
+    app.config['SIGNAL_CHECKPOINT_PATH'] = os.getenv('SIGNAL_CHECKPOINT_PATH')
+    app.config['LIVE_SIGNALS_IDLE_TTL'] = int(os.getenv('LIVE_SIGNALS_IDLE_TTL', 86400))
+    app.config['PROFILING_ENABLED'] = os.getenv('PROFILING_ENABLED', 'False') == 'True'
+    app.config['PROFILE_SAMPLE_RATE'] = float(os.getenv('PROFILE_SAMPLE_RATE', 0.0))
+    app.config['BAR_STORE_PATH'] = os.getenv('BAR_STORE_PATH')
+    app.config['BACKTEST_WORKERS'] = int(os.getenv('BACKTEST_WORKERS', os.cpu_count() or 1))
+    app.config['BACKTEST_MAX_RUNS'] = int(os.getenv('BACKTEST_MAX_RUNS', 10000))
+    app.config['SCREEN_WORKERS'] = int(os.getenv('SCREEN_WORKERS', 4))
+    app.config['SCREEN_TIMEOUT'] = float(os.getenv('SCREEN_TIMEOUT', 10.0))
+    app.config['SCREEN_MAX_SYMBOLS'] = int(os.getenv('SCREEN_MAX_SYMBOLS', 500))
+    app.config['ANALYTICS_CACHE_TTL'] = int(os.getenv('ANALYTICS_CACHE_TTL', 300))
+    app.config['IMPORT_BATCH_SIZE'] = int(os.getenv('IMPORT_BATCH_SIZE', 5000))
+    app.config['QUERY_BUDGET'] = int(os.getenv('QUERY_BUDGET', 50))
+    # Upper bound on price staleness in cached responses; trades invalidate them in every process.
+    app.config['RESPONSE_CACHE_TTL'] = int(os.getenv('RESPONSE_CACHE_TTL', 30))
+    app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    app.config.update(config or {})
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', database.engine_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config))
     
     db.init_app(app)
+    database.init_app(app, db)
+    migrate.init_app(app, db)
     JWTManager(app)
     socketio.init_app(app, cors_allowed_origins="*")
     mail.init_app(app)
+    market_data.init_app(app)
+    price_stream.init_app(app)
+    live_signals.init_app(app)
+    alert_engine.init_app(app)
+    response_cache.init_app(app)
+    bar_store.init_app(app)
+    metrics.init_app(app)
 
     with app.app_context():
+        from .notifications.dispatcher import dispatcher
+        from .auth.identity import user_cache
+        from .portfolio.analytics import analytics_cache
         from .auth import auth as auth_blueprint
         from .portfolio import portfolio as portfolio_blueprint
         from .trading import trading as trading_blueprint
         from .notifications import notifications as notifications_blueprint
         from .admin import admin as admin_blueprint
         from .models.user import User
+        from .models.version import bump_version
+        from .models.position import rebuild_positions, verify_positions
 
         app.register_blueprint(auth_blueprint, url_prefix='/api/auth')
         app.register_blueprint(portfolio_blueprint, url_prefix='/api/portfolio')
         app.register_blueprint(trading_blueprint, url_prefix='/api/trading')
         app.register_blueprint(notifications_blueprint, url_prefix='/api/notifications')
         app.register_blueprint(admin_blueprint, url_prefix='/api/admin')
+        dispatcher.init_app(app)
+        user_cache.init_app(app)
+        analytics_cache.init_app(app)
 
         @app.route('/api/health')
         def health_check():
             return {'status': 'healthy'}, 200
 
-        db.create_all()
-
-    scheduler.start()
-
     @app.cli.command('create-admin')
     def create_admin():
         """Create an admin user."""
@@ -70,12 +119,31 @@ def create_app():
                 admin = User(username='admin', email='admin@example.com', is_admin=True)
                 admin.set_password(password)
                 db.session.add(admin)
+                bump_version('users')
                 db.session.commit()
+                response_cache.invalidate('admin')
                 print("Admin user created successfully.")
                 print(f"Username: admin")
                 print(f"Password: {password}")
                 print("Please store this password securely and change it after first login.")
 
+    @app.cli.command('rebuild-positions')
+    @click.option('--verify', is_flag=True, help='Only report positions that disagree with trade history.')
+    @click.option('--user-id', type=int, help='Limit to a single user.')
+    def rebuild_positions_command(verify, user_id):
+        """Rebuild (or verify) the positions table from trade history."""
+        with app.app_context():
+            if verify:
+                mismatches = verify_positions(user_id)
+                for uid, symbol, expected, stored in mismatches:
+                    print(f"User {uid} {symbol}: expected {expected}, stored {stored}")
+                print(f"{len(mismatches)} mismatched positions.")
+                if mismatches:
+                    raise SystemExit(1)
+            else:
+                count = rebuild_positions(user_id)
+                print(f"Rebuilt {count} positions.")
+
     @app.cli.command('list-users')
     def list_users():
         """List all users."""
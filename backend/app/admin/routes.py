@@ -1,17 +1,16 @@
 from flask import jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func
 from . import admin
-from ..models.user import User, db
+from ..auth.identity import admin_required, current_user, user_cache
+from ..extensions import db
+from ..models.user import User
+from ..models.version import bump_version, read_version
 from ..utils.logger import loki_logger
+from ..utils.response_cache import response_cache
 
 @admin.route('/users', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_users():
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    if not current_user.is_admin:
-        return jsonify({"message": "Admin access required"}), 403
-    
     users = User.query.all()
     return jsonify([{
         'id': user.id,
@@ -21,14 +20,9 @@ def get_users():
     } for user in users]), 200
 
 @admin.route('/user/<int:user_id>', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_user(user_id):
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    if not current_user.is_admin:
-        return jsonify({"message": "Admin access required"}), 403
-    
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({"message": "User not found"}), 404
     
@@ -36,36 +30,25 @@ def update_user(user_id):
     user.username = data.get('username', user.username)
     user.email = data.get('email', user.email)
     user.is_admin = data.get('is_admin', user.is_admin)
-    
+    bump_version('users')
     db.session.commit()
-    loki_logger.info(f"Admin {current_user.username} updated user {user.username}")
+    user_cache.invalidate(user_id)
+    response_cache.invalidate('admin')
+    loki_logger.info(f"Admin {current_user().username} updated user {user.username}")
     return jsonify({"message": "User updated successfully"}), 200
 
 @admin.route('/stats', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_stats():
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    if not current_user.is_admin:
-        return jsonify({"message": "Admin access required"}), 403
-    
-    total_users = User.query.count()
-    admin_users = User.query.filter_by(is_admin=True).count()
-    
-    return jsonify({
-        "total_users": total_users,
-        "admin_users": admin_users
-    }), 200
+    def stats():
+        total, admins = db.session.query(func.count(User.id), func.count(User.id).filter(User.is_admin)).one()
+        return {"total_users": total, "admin_users": admins}
+    return response_cache.respond(response_cache.get('admin', stats, version=read_version('users')))
 
 @admin.route('/user/<int:user_id>/change-password', methods=['POST'])
-@jwt_required()
+@admin_required
 def change_password(user_id):
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    if not current_user.is_admin:
-        return jsonify({"message": "Admin access required"}), 403
-    
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({"message": "User not found"}), 404
     
@@ -76,5 +59,5 @@ def change_password(user_id):
     
     user.set_password(new_password)
     db.session.commit()
-    loki_logger.info(f"Admin {current_user.username} changed password for user {user.username}")
+    loki_logger.info(f"Admin {current_user().username} changed password for user {user.username}")
     return jsonify({"message": "Password changed successfully"}), 200
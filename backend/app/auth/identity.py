@@ -0,0 +1,77 @@
+from collections import namedtuple
+from functools import wraps
+from flask import jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
+from ..extensions import db
+from ..models.user import User
+from ..utils.ttl_cache import ScopedCache
+
+CachedUser = namedtuple('CachedUser', [
+    'id', 'username', 'email', 'is_admin', 'email_notifications', 'push_notifications'
+])
+
+
+def user_claims(user):
+    """Claims embedded in the access token at login."""
+    return {
+        'is_admin': bool(user.is_admin),
+        'email_notifications': bool(user.email_notifications),
+        'push_notifications': bool(user.push_notifications),
+    }
+
+
+class UserCache(ScopedCache):
+    """Per-process TTL cache of read-only user snapshots keyed by id.
+
+    Writes to a user must call ``invalidate``; other processes see the change
+    once their entry expires.
+    """
+
+    def __init__(self, ttl=60, max_entries=10000):
+        super().__init__(ttl, max_scopes=max_entries, max_entries=1)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+
+    def get(self, user_id):
+        user_id = int(user_id)
+        snapshot = self.lookup(user_id)
+        if snapshot is not None:
+            return snapshot
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        return self.store(user_id, None, CachedUser(*(getattr(user, field) for field in CachedUser._fields)))
+
+    def invalidate(self, user_id):
+        super().invalidate(int(user_id))
+
+
+user_cache = UserCache()
+
+
+def current_user_id():
+    return int(get_jwt_identity())
+
+
+def current_user():
+    return user_cache.get(current_user_id())
+
+
+def admin_required(f):
+    """jwt_required() plus an admin check.
+
+    Tokens without the is_admin claim are rejected without touching the
+    database; admin claims are confirmed against the user cache so a demoted
+    admin loses access within the cache TTL.
+    """
+    @wraps(f)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if not get_jwt().get('is_admin'):
+            return jsonify({"message": "Admin access required"}), 403
+        user = current_user()
+        if user is None or not user.is_admin:
+            return jsonify({"message": "Admin access required"}), 403
+        return f(*args, **kwargs)
+    return wrapper
@@ -1,8 +1,12 @@
 from flask import jsonify, request
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required
 from . import auth
-from ..models.user import User, db
+from .identity import current_user_id, user_claims
+from ..extensions import db
+from ..models.user import User
+from ..models.version import bump_version
 from ..utils.logger import loki_logger
+from ..utils.response_cache import response_cache
 
 @auth.route('/register', methods=['POST'])
 def register():
@@ -13,7 +17,9 @@ def register():
     new_user = User(username=data['username'], email=data['email'])
     new_user.set_password(data['password'])
     db.session.add(new_user)
+    bump_version('users')
     db.session.commit()
+    response_cache.invalidate('admin')
     loki_logger.info(f"New user registered: {new_user.username}")
     return jsonify({"message": "User created successfully"}), 201
 
@@ -22,7 +28,7 @@ def login():
     data = request.json
     user = User.query.filter_by(username=data['username']).first()
     if user and user.check_password(data['password']):
-        access_token = create_access_token(identity=user.id)
+        access_token = create_access_token(identity=str(user.id), additional_claims=user_claims(user))
         loki_logger.info(f"User logged in: {user.username}")
         return jsonify(access_token=access_token), 200
     loki_logger.warning(f"Failed login attempt for username: {data['username']}")
@@ -31,5 +37,4 @@ def login():
 @auth.route('/protected', methods=['GET'])
 @jwt_required()
 def protected():
-    current_user_id = get_jwt_identity()
-    return jsonify(logged_in_as=current_user_id), 200
+    return jsonify(logged_in_as=current_user_id()), 200
@@ -0,0 +1,19 @@
+"""The app's Flask extensions, created once and bound in create_app().
+
+Import them from here (``from ..extensions import db``) rather than from the
+``app`` package, so models and utilities do not need to import the app factory.
+"""
+import os
+from apscheduler.schedulers.background import BackgroundScheduler
+from flask_mail import Mail
+from flask_migrate import Migrate
+from flask_socketio import SocketIO
+from flask_sqlalchemy import SQLAlchemy
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+db = SQLAlchemy()
+migrate = Migrate(directory=MIGRATIONS_DIR, render_as_batch=True)
+socketio = SocketIO()
+mail = Mail()
+scheduler = BackgroundScheduler()
@@ -0,0 +1,35 @@
+from ..extensions import db
+from datetime import datetime
+
+class Alert(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    symbol = db.Column(db.String(10), nullable=False)
+    metric = db.Column(db.String(10), nullable=False, default='price')  # 'price' or 'rsi'
+    condition = db.Column(db.String(5), nullable=False)  # 'above' or 'below'
+    threshold = db.Column(db.Float, nullable=False)
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    triggered_at = db.Column(db.DateTime)
+    triggered_value = db.Column(db.Float)
+
+    __table_args__ = (
+        db.Index('ix_alert_user_id', 'user_id', 'id'),
+        db.Index('ix_alert_active', 'active'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'symbol': self.symbol,
+            'metric': self.metric,
+            'condition': self.condition,
+            'threshold': self.threshold,
+            'active': self.active,
+            'created_at': self.created_at.isoformat(),
+            'triggered_at': self.triggered_at.isoformat() if self.triggered_at else None,
+            'triggered_value': self.triggered_value,
+        }
+
+    def __repr__(self):
+        return f'<Alert {self.symbol} {self.metric} {self.condition} {self.threshold}>'
@@ -0,0 +1,29 @@
+from ..extensions import db
+from datetime import datetime
+
+class NotificationJob(db.Model):
+    """Delivery state of a queued notification, so any worker can report on it."""
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    status = db.Column(db.String(10), nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    channels = db.Column(db.JSON, nullable=False)
+    errors = db.Column(db.JSON, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_notification_job_updated_at', 'updated_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'channels': self.channels,
+            'errors': self.errors,
+        }
+
+    def __repr__(self):
+        return f'<NotificationJob {self.id} {self.status}>'
@@ -0,0 +1,92 @@
+from sqlalchemy import case, func
+from ..extensions import db
+from .trade import Trade, bump_trade_version
+from .version import UPSERTS
+
+class Position(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    symbol = db.Column(db.String(10), nullable=False)
+    quantity = db.Column(db.Float, nullable=False, default=0.0)
+    cost_basis = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (db.UniqueConstraint('user_id', 'symbol', name='uq_position_user_symbol'),)
+
+    def __repr__(self):
+        return f'<Position {self.symbol} {self.quantity}>'
+
+
+def apply_trade(trade):
+    """Fold a new trade into its position and bump the user's trade version; the caller commits all together.
+
+    One INSERT ... ON CONFLICT DO UPDATE adds the deltas in the database, so
+    concurrent trades on the same (user, symbol) neither lose an update nor
+    race to create the row.
+    """
+    sign = 1 if trade.type == 'buy' else -1
+    insert = UPSERTS[db.session.get_bind().dialect.name]
+    stmt = insert(Position).values(
+        user_id=trade.user_id,
+        symbol=trade.symbol,
+        quantity=sign * trade.quantity,
+        cost_basis=sign * trade.quantity * trade.price,
+    )
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[Position.user_id, Position.symbol],
+        set_={
+            'quantity': Position.quantity + stmt.excluded.quantity,
+            'cost_basis': Position.cost_basis + stmt.excluded.cost_basis,
+        },
+    ))
+    bump_trade_version(trade.user_id)
+
+
+def aggregate_trades(user_id=None):
+    """Yield (user_id, symbol, quantity, cost_basis) computed from the Trade table in SQL."""
+    sign = case((Trade.type == 'buy', 1.0), else_=-1.0)
+    query = db.session.query(
+        Trade.user_id,
+        Trade.symbol,
+        func.sum(sign * Trade.quantity),
+        func.sum(sign * Trade.quantity * Trade.price),
+    ).group_by(Trade.user_id, Trade.symbol)
+    if user_id is not None:
+        query = query.filter(Trade.user_id == user_id)
+    return query
+
+
+def verify_positions(user_id=None, tolerance=1e-6):
+    """Return a list of (user_id, symbol, expected, stored) rows that disagree."""
+    stored_query = Position.query
+    if user_id is not None:
+        stored_query = stored_query.filter_by(user_id=user_id)
+    stored = {(p.user_id, p.symbol): (p.quantity, p.cost_basis) for p in stored_query}
+
+    mismatches = []
+    for uid, symbol, quantity, cost_basis in aggregate_trades(user_id):
+        actual = stored.pop((uid, symbol), None)
+        expected = (quantity or 0.0, cost_basis or 0.0)
+        if actual is None or any(abs(a - e) > tolerance for a, e in zip(actual, expected)):
+            mismatches.append((uid, symbol, expected, actual))
+    for (uid, symbol), actual in stored.items():
+        mismatches.append((uid, symbol, None, actual))
+    return mismatches
+
+
+def rebuild_positions(user_id=None):
+    """Recompute positions from trade history; returns the number of positions written."""
+    delete_query = Position.query
+    if user_id is not None:
+        delete_query = delete_query.filter_by(user_id=user_id)
+    delete_query.delete(synchronize_session=False)
+
+    rows = [
+        {'user_id': uid, 'symbol': symbol, 'quantity': quantity or 0.0, 'cost_basis': cost_basis or 0.0}
+        for uid, symbol, quantity, cost_basis in aggregate_trades(user_id)
+    ]
+    if rows:
+        db.session.execute(Position.__table__.insert(), rows)
+    for uid in {user_id} if user_id is not None else {row['user_id'] for row in rows}:
+        bump_trade_version(uid)
+    db.session.commit()
+    return len(rows)
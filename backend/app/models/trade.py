@@ -1,5 +1,6 @@
-from .user import db
+from ..extensions import db
 from datetime import datetime
+from .version import bump_version, read_version
 
 class Trade(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -10,5 +11,16 @@ class Trade(db.Model):
     timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     type = db.Column(db.String(4), nullable=False)  # 'buy' or 'sell'
 
+    __table_args__ = (db.Index('ix_trade_user_timestamp', 'user_id', 'timestamp', 'id'),)
+
     def __repr__(self):
         return f'<Trade {self.symbol} {self.type}>'
+
+
+def trade_version(user_id):
+    """Changes with every trade recorded for ``user_id``, by any process."""
+    return read_version(f'trades:{user_id}')
+
+
+def bump_trade_version(user_id):
+    bump_version(f'trades:{user_id}')
@@ -1,7 +1,5 @@
-from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
-
-db = SQLAlchemy()
+from ..extensions import db
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -0,0 +1,31 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from ..extensions import db
+
+class Version(db.Model):
+    """Change counters that per-process caches compare against before serving.
+
+    Keys are 'users', 'alerts' and 'trades:<user id>'. Writers bump the key in
+    the same transaction as the change, so every worker sees a new value
+    with one primary-key read.
+    """
+    key = db.Column(db.String(40), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<Version {self.key} {self.value}>'
+
+
+UPSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def bump_version(key):
+    """Increment ``key``'s counter and return its new value; the caller commits it with the change it marks."""
+    insert = UPSERTS[db.session.get_bind().dialect.name]
+    stmt = insert(Version).values(key=key, value=1)
+    return db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[Version.key], set_={'value': Version.value + 1}
+    ).returning(Version.value)).scalar_one()
+
+
+def read_version(key):
+    return db.session.query(Version.value).filter(Version.key == key).scalar() or 0
@@ -0,0 +1,234 @@
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy import delete
+from ..extensions import db, mail, socketio
+from ..models.notification_job import NotificationJob
+from ..models.version import UPSERTS
+from ..utils.logger import loki_logger
+
+
+class QueueFull(Exception):
+    pass
+
+
+def send_email_batch(app, jobs):
+    """Send a batch of email jobs over one SMTP connection; returns {job_id: error}."""
+    from flask_mail import Message
+
+    errors = {}
+    with mail.connect() as connection:
+        for job in jobs:
+            try:
+                msg = Message(job['subject'], sender=app.config['NOTIFICATION_SENDER'], recipients=[job['email']])
+                msg.body = job['body']
+                connection.send(msg)
+            except Exception as e:
+                errors[job['id']] = str(e)
+    return errors
+
+
+def send_push_batch(app, jobs):
+    """Deliver push notifications to the user's Socket.IO room."""
+    from ..utils.metrics import record_emit
+    from ..utils.stock_updater import user_room
+
+    for job in jobs:
+        socketio.emit('notification', {
+            'id': job['id'],
+            'subject': job['subject'],
+            'body': job['body'],
+        }, to=user_room(job['user_id']))
+        record_emit('notification')
+    return {}
+
+
+class NotificationDispatcher:
+    """Bounded queue of notification jobs drained by a small pool of worker threads.
+
+    Each worker takes up to ``batch_size`` queued jobs at a time and hands them
+    to each channel as one batch (one SMTP connection per batch for email).
+    Failed channels are retried with exponential backoff.
+
+    The queue and the workers belong to the process that accepted the job,
+    which also answers ``status`` from memory. When the app has a database,
+    each batch's state is written to the notification_job table before and
+    after it is sent (and rows older than ``retention`` seconds are
+    pruned), so other processes can report on a job once a worker has
+    picked it up.
+    """
+
+    def __init__(self, maxsize=1000, workers=2, batch_size=50, max_retries=3, backoff=1.0, history=10000,
+                 retention=86400):
+        self.maxsize = maxsize
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.history = history
+        self.retention = retention
+        self.channels = {'email': send_email_batch, 'push': send_push_batch}
+        self.jobs = OrderedDict()
+        self.app = None
+        self.queue = None
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.maxsize = app.config.get('NOTIFICATION_QUEUE_SIZE', self.maxsize)
+        self.workers = app.config.get('NOTIFICATION_WORKERS', self.workers)
+        self.batch_size = app.config.get('NOTIFICATION_BATCH_SIZE', self.batch_size)
+        self.max_retries = app.config.get('NOTIFICATION_MAX_RETRIES', self.max_retries)
+        self.backoff = app.config.get('NOTIFICATION_RETRY_BACKOFF', self.backoff)
+        self.retention = app.config.get('NOTIFICATION_JOB_RETENTION', self.retention)
+
+    def register_channel(self, name, handler):
+        """``handler(app, jobs)`` sends a batch and returns {job_id: error} for failures."""
+        self.channels[name] = handler
+
+    def submit(self, channels, user_id, email, subject, body):
+        job = {
+            'id': uuid.uuid4().hex,
+            'user_id': user_id,
+            'email': email,
+            'subject': subject,
+            'body': body,
+            'status': 'queued',
+            'attempts': 0,
+            'channels': {channel: 'pending' for channel in channels},
+            'errors': {},
+        }
+        self._start()
+        with self._lock:
+            self.jobs[job['id']] = job
+            while len(self.jobs) > self.history:
+                self.jobs.popitem(last=False)
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.jobs.pop(job['id'], None)
+            raise QueueFull()
+        return job['id']
+
+    def status(self, job_id):
+        """The job's state from this process, else from the shared table (needs an app context)."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job:
+                return dict(job, channels=dict(job['channels']))
+        if not self._shared():
+            return None
+        row = db.session.get(NotificationJob, job_id)
+        return row.to_dict() if row else None
+
+    def _shared(self):
+        return self.app is not None and 'sqlalchemy' in self.app.extensions
+
+    def _persist(self, jobs):
+        """Write the jobs' state to the notification_job table; call inside an app context."""
+        if not jobs or not self._shared():
+            return
+        now = datetime.utcnow()
+        rows = [{
+            'id': job['id'],
+            'user_id': job['user_id'],
+            'status': job['status'],
+            'attempts': job['attempts'],
+            'channels': dict(job['channels']),
+            'errors': dict(job['errors']),
+            'updated_at': now,
+        } for job in jobs]
+        try:
+            insert = UPSERTS[db.session.get_bind().dialect.name]
+            stmt = insert(NotificationJob).values(rows)
+            db.session.execute(stmt.on_conflict_do_update(
+                index_elements=[NotificationJob.id],
+                set_={column: stmt.excluded[column] for column in ('status', 'attempts', 'channels', 'errors', 'updated_at')},
+            ))
+            db.session.execute(delete(NotificationJob).where(
+                NotificationJob.updated_at < now - timedelta(seconds=self.retention)
+            ))
+            db.session.commit()
+        except Exception:
+            # Delivery does not depend on the shared state; only other workers' status reads do.
+            db.session.rollback()
+            loki_logger.exception(f'Could not record the state of {len(jobs)} notification jobs')
+
+    def _start(self):
+        with self._lock:
+            if self.queue is not None:
+                return
+            self.queue = queue.Queue(maxsize=self.maxsize)
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'notification-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            with self.app.app_context():
+                self._persist([job for job in batch if job['attempts'] == 0])
+                self._dispatch(batch)
+                self._persist(batch)
+            for _ in batch:
+                self.queue.task_done()
+
+    def _dispatch(self, batch):
+        for job in batch:
+            job['attempts'] += 1
+        for channel, handler in self.channels.items():
+            jobs = [job for job in batch if job['channels'].get(channel) == 'pending']
+            if not jobs:
+                continue
+            try:
+                errors = handler(self.app, jobs)
+            except Exception as e:
+                errors = {job['id']: str(e) for job in jobs}
+            for job in jobs:
+                if job['id'] in errors:
+                    job['errors'][channel] = errors[job['id']]
+                else:
+                    job['channels'][channel] = 'sent'
+        for job in batch:
+            self._settle(job)
+
+    def _settle(self, job):
+        pending = [channel for channel, state in job['channels'].items() if state == 'pending']
+        if not pending:
+            job['status'] = 'sent'
+            loki_logger.info(f"Notification {job['id']} sent to user {job['user_id']}")
+        elif job['attempts'] > self.max_retries:
+            for channel in pending:
+                job['channels'][channel] = 'failed'
+            job['status'] = 'failed'
+            loki_logger.error(f"Notification {job['id']} to user {job['user_id']} failed: {job['errors']}")
+        else:
+            job['status'] = 'retrying'
+            delay = self.backoff * 2 ** (job['attempts'] - 1)
+            timer = threading.Timer(delay, self._retry, args=(job,))
+            timer.daemon = True
+            timer.start()
+
+    def _retry(self, job):
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            for channel, state in job['channels'].items():
+                if state == 'pending':
+                    job['channels'][channel] = 'failed'
+            job['status'] = 'failed'
+            with self.app.app_context():
+                self._persist([job])
+
+
+dispatcher = NotificationDispatcher()
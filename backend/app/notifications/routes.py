@@ -1,26 +1,32 @@
 from flask import jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from . import notifications
-from ..models.user import User, db
+from ..auth.identity import current_user, current_user_id, user_cache
+from ..extensions import db
+from ..models.alert import Alert
+from ..models.user import User
+from ..models.version import bump_version
+from ..utils.alerts import alert_engine, parse_alert, watch_indicator
 from ..utils.logger import loki_logger
-from flask_mail import Message, Mail
-
-mail = Mail()
+from ..utils.stock_updater import price_stream, schedule_stock_updates, watch_alerts, ALERTS_ROOM
+from .dispatcher import dispatcher, QueueFull
 
 @notifications.route('/settings', methods=['GET', 'POST'])
 @jwt_required()
 def notification_settings():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user_id = current_user_id()
 
     if request.method == 'POST':
+        user = db.session.get(User, user_id)
         data = request.json
         user.email_notifications = data.get('email_notifications', user.email_notifications)
         user.push_notifications = data.get('push_notifications', user.push_notifications)
         db.session.commit()
+        user_cache.invalidate(user_id)
         loki_logger.info(f"User {user_id} updated notification settings")
         return jsonify({"message": "Notification settings updated successfully"}), 200
 
+    user = current_user()
     return jsonify({
         "email_notifications": user.email_notifications,
         "push_notifications": user.push_notifications
@@ -29,24 +35,79 @@ def notification_settings():
 @notifications.route('/send', methods=['POST'])
 @jwt_required()
 def send_notification():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user_id = current_user_id()
+    user = current_user()
     data = request.json
 
+    channels = []
     if user.email_notifications:
-        try:
-            msg = Message(data['subject'],
-                          sender="noreply@robinhooddashboard.com",
-                          recipients=[user.email])
-            msg.body = data['body']
-            mail.send(msg)
-            loki_logger.info(f"Email notification sent to user {user_id}")
-        except Exception as e:
-            loki_logger.error(f"Failed to send email notification to user {user_id}: {str(e)}")
-            return jsonify({"error": "Failed to send email notification"}), 500
-
+        channels.append('email')
     if user.push_notifications:
-        # Implement push notification logic here
-        pass
+        channels.append('push')
+    if not channels:
+        return jsonify({"message": "Notifications are disabled for this user"}), 200
+
+    try:
+        job_id = dispatcher.submit(channels, user.id, user.email, data['subject'], data['body'])
+    except QueueFull:
+        loki_logger.error(f"Notification queue full, rejected notification for user {user_id}")
+        return jsonify({"error": "Notification queue is full, try again later"}), 503
+
+    return jsonify({"message": "Notification queued", "job_id": job_id}), 202
+
+@notifications.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def notification_status(job_id):
+    job = dispatcher.status(job_id)
+    if not job or job['user_id'] != current_user_id():
+        return jsonify({"message": "Notification not found"}), 404
+    return jsonify({
+        "job_id": job['id'],
+        "status": job['status'],
+        "attempts": job['attempts'],
+        "channels": job['channels'],
+        "errors": job['errors']
+    }), 200
+
+@notifications.route('/alerts', methods=['GET'])
+@jwt_required()
+def list_alerts():
+    alerts = Alert.query.filter_by(user_id=current_user_id()).order_by(Alert.id.desc())
+    return jsonify({"alerts": [alert.to_dict() for alert in alerts]}), 200
 
-    return jsonify({"message": "Notification sent successfully"}), 200
+@notifications.route('/alerts', methods=['POST'])
+@jwt_required()
+def create_alert():
+    user_id = current_user_id()
+    try:
+        symbol, metric, condition, threshold = parse_alert(request.json or {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not watch_indicator(symbol, metric):
+        return jsonify({"error": "No market data for symbol"}), 404
+
+    alert = Alert(user_id=user_id, symbol=symbol, metric=metric, condition=condition, threshold=threshold)
+    db.session.add(alert)
+    version = bump_version('alerts')
+    db.session.commit()
+    if alert_engine.loaded:
+        alert_engine.add(alert, version)
+    else:
+        alert_engine.load()
+    watch_alerts()
+    schedule_stock_updates(ALERTS_ROOM, alert_engine.symbols(), emit=False)
+    loki_logger.info(f"User {user_id} created alert {alert.id} on {symbol} {metric} {condition} {threshold}")
+    return jsonify(alert.to_dict()), 201
+
+@notifications.route('/alerts/<int:alert_id>', methods=['DELETE'])
+@jwt_required()
+def delete_alert(alert_id):
+    alert = db.session.get(Alert, alert_id)
+    if not alert or alert.user_id != current_user_id():
+        return jsonify({"message": "Alert not found"}), 404
+    db.session.delete(alert)
+    version = bump_version('alerts')
+    db.session.commit()
+    alert_engine.remove(alert_id, version)
+    price_stream.subscribe(ALERTS_ROOM, alert_engine.symbols(), emit=False)
+    return jsonify({"message": "Alert deleted"}), 200
@@ -2,4 +2,4 @@ from flask import Blueprint
 
 portfolio = Blueprint('portfolio', __name__)
 
-from . import routes
+from . import routes, events
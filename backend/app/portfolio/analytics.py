@@ -0,0 +1,159 @@
+import math
+from sqlalchemy import case, func
+from ..extensions import db
+from ..models.trade import Trade, trade_version
+from ..utils.bar_store import bar_store
+from ..utils.ttl_cache import ScopedCache
+
+TRADING_DAYS = 252
+DEFAULT_BENCHMARK = 'SPY'
+
+
+class AnalyticsCache(ScopedCache):
+    """Per-process cache of analytics results keyed by user, then by query.
+
+    Results are stored at the user's trade version, so a trade made through
+    any process recomputes them; they also expire after ``ttl`` seconds so
+    intraday prices are picked up.
+    """
+
+    def __init__(self, ttl=300, max_users=1000):
+        super().__init__(ttl, max_scopes=max_users)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('ANALYTICS_CACHE_TTL', self.ttl)
+        self.clear()
+
+    def get(self, user_id, key, compute):
+        version = trade_version(user_id)
+        result = self.lookup(user_id, key, version)
+        if result is None:
+            result = self.store(user_id, key, compute(), version)
+        return result
+
+
+analytics_cache = AnalyticsCache()
+
+
+def daily_quantity_changes(user_id):
+    """(symbol, date, signed quantity) per symbol and trading day, summed in SQL."""
+    sign = case((Trade.type == 'buy', 1.0), else_=-1.0)
+    day = func.date(Trade.timestamp)
+    return db.session.query(Trade.symbol, day, func.sum(sign * Trade.quantity)).filter(
+        Trade.user_id == user_id
+    ).group_by(Trade.symbol, day).all()
+
+
+def holdings_matrix(changes, dates, symbols):
+    """Dates x symbols quantities held at each close.
+
+    A trade counts from the close of its own day; trades before the first
+    date are folded into the opening holdings.
+    """
+    import numpy as np
+
+    columns = {symbol: i for i, symbol in enumerate(symbols)}
+    changes = [change for change in changes if change[0] in columns]
+    deltas = np.zeros((len(dates), len(symbols)))
+    if changes:
+        days = np.array([np.datetime64(str(day), 'D') for _, day, _ in changes])
+        rows = np.searchsorted(dates, days, side='left')
+        keep = rows < len(dates)
+        cols = np.array([columns[symbol] for symbol, _, _ in changes])
+        np.add.at(deltas, (rows[keep], cols[keep]), np.array([q or 0.0 for _, _, q in changes])[keep])
+    return deltas.cumsum(axis=0)
+
+
+def risk_metrics(prices, holdings, benchmark=None):
+    """Time-weighted return series and risk statistics.
+
+    ``prices`` and ``holdings`` are dates x symbols arrays. Each day's return
+    is the change in value of the previous close's holdings, so trades (cash
+    flows) do not count as performance. Days before anything is held are
+    dropped.
+    """
+    import numpy as np
+
+    values = (holdings * prices).sum(axis=1)
+    start = (holdings[:-1] * prices[:-1]).sum(axis=1)
+    end = (holdings[:-1] * prices[1:]).sum(axis=1)
+    held = np.flatnonzero(start)
+    first = held[0] if len(held) else len(start)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.where(start != 0, end / start - 1, 0.0)[first:]
+
+    index = np.concatenate([[1.0], np.cumprod(1 + returns)])
+    drawdown = index / np.maximum.accumulate(index) - 1
+    volatility = returns.std(ddof=1) * np.sqrt(TRADING_DAYS) if len(returns) > 1 else None
+
+    beta = None
+    if benchmark is not None and len(returns) > 1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            benchmark_returns = (benchmark[1:] / benchmark[:-1] - 1)[first:]
+        variance = benchmark_returns.var(ddof=1)
+        if np.isfinite(variance) and variance > 0:
+            beta = np.cov(returns, benchmark_returns)[0, 1] / variance
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        asset_returns = prices[1:] / prices[:-1] - 1
+        correlation = np.corrcoef(asset_returns[first:], rowvar=False) if len(returns) > 1 else None
+
+    return {
+        'values': values,
+        'returns': returns,
+        'index': index[1:],
+        'offset': first + 1,
+        'total_return': index[-1] - 1,
+        'volatility': volatility,
+        'max_drawdown': drawdown.min(),
+        'beta': beta,
+        'correlation': np.atleast_2d(correlation) if correlation is not None else None,
+    }
+
+
+def _number(value):
+    return None if value is None or not math.isfinite(value) else round(float(value), 6)
+
+
+def portfolio_analytics(user_id, period='1y', benchmark=DEFAULT_BENCHMARK):
+    changes = daily_quantity_changes(user_id)
+    symbols = sorted({symbol for symbol, _, _ in changes})
+    closes = bar_store.closes(symbols + [benchmark], period=period) if symbols else None
+    result = {
+        'period': period,
+        'benchmark': benchmark,
+        'symbols': [],
+        'missing': [],
+        'series': {'dates': [], 'value': [], 'twr': [], 'returns': []},
+        'total_return': None,
+        'volatility': None,
+        'max_drawdown': None,
+        'beta': None,
+        'correlation': [],
+    }
+    if closes is None or closes.empty:
+        result['missing'] = symbols
+        return result
+
+    import numpy as np
+
+    universe = [symbol for symbol in symbols if symbol in closes.columns]
+    result['symbols'] = universe
+    result['missing'] = [symbol for symbol in symbols if symbol not in closes.columns]
+    dates = closes.index.values.astype('datetime64[D]')
+    prices = np.nan_to_num(closes[universe].ffill().to_numpy())
+    bench = closes[benchmark].ffill().to_numpy() if benchmark in closes.columns else None
+    metrics = risk_metrics(prices, holdings_matrix(changes, dates, universe), bench)
+
+    offset = metrics['offset']
+    result['series'] = {
+        'dates': [str(day) for day in dates[offset:]],
+        'value': [_number(value) for value in metrics['values'][offset:]],
+        'twr': [_number(value - 1) for value in metrics['index']],
+        'returns': [_number(value) for value in metrics['returns']],
+    }
+    for name in ('total_return', 'volatility', 'max_drawdown', 'beta'):
+        result[name] = _number(metrics[name])
+    if metrics['correlation'] is not None:
+        result['correlation'] = [[_number(value) for value in row] for row in metrics['correlation']]
+    return result
@@ -0,0 +1,58 @@
+from flask import request
+from flask_jwt_extended import decode_token
+from flask_socketio import emit, join_room, leave_room
+from ..extensions import db, socketio
+from ..models.position import Position
+from ..utils.metrics import record_emit
+from ..utils.stock_updater import price_stream, schedule_stock_updates, user_room, symbol_room
+
+def position_symbols(user_id):
+    return [symbol for (symbol,) in db.session.query(Position.symbol).filter(Position.user_id == user_id)]
+
+def send_snapshot(room):
+    snapshot = price_stream.snapshot(room)
+    emit('stock_snapshot', snapshot)
+    record_emit('stock_snapshot', len(snapshot['prices']))
+
+@socketio.on('connect')
+def on_connect(auth=None):
+    token = (auth or {}).get('token')
+    if not token:
+        return False
+    try:
+        user_id = int(decode_token(token)['sub'])
+    except Exception:
+        return False
+    # The room follows the user's positions for as long as a socket is
+    # connected, so a reconnect streams again without refetching holdings.
+    room = user_room(user_id)
+    join_room(room)
+    price_stream.connect(request.sid, room)
+    schedule_stock_updates(room, position_symbols(user_id))
+    send_snapshot(room)
+
+@socketio.on('disconnect')
+def on_disconnect(*args):
+    price_stream.disconnect(request.sid)
+
+@socketio.on('watch')
+def on_watch(data):
+    for symbol in (data or {}).get('symbols', []):
+        room = symbol_room(symbol.upper())
+        join_room(room)
+        price_stream.connect(request.sid, room)
+        schedule_stock_updates(room, [symbol.upper()])
+        send_snapshot(room)
+
+@socketio.on('unwatch')
+def on_unwatch(data):
+    for symbol in (data or {}).get('symbols', []):
+        room = symbol_room(symbol.upper())
+        leave_room(room)
+        price_stream.leave(request.sid, room)
+
+@socketio.on('resync')
+def on_resync(data):
+    room = (data or {}).get('room')
+    if room and price_stream.joined(request.sid, room):
+        send_snapshot(room)
@@ -1,61 +1,76 @@
-from flask import jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import jsonify, request
+from flask_jwt_extended import jwt_required
 from . import portfolio
+from .analytics import DEFAULT_BENCHMARK, analytics_cache, portfolio_analytics
+from ..auth.identity import current_user_id
 from ..models.user import User
-from ..models.trade import Trade
-from ..utils.stock_updater import schedule_stock_updates
-import yfinance as yf
+from ..models.position import Position
+from ..models.trade import trade_version
+from ..utils.stock_updater import price_stream, user_room
+from ..utils.market_data import market_data, parse_symbol, PERIOD_BARS
+from ..utils.response_cache import response_cache
 
 @portfolio.route('/holdings', methods=['GET'])
 @jwt_required()
 def get_holdings():
-    current_user_id = get_jwt_identity()
-    trades = Trade.query.filter_by(user_id=current_user_id).all()
-    holdings = {}
-    for trade in trades:
-        if trade.symbol not in holdings:
-            holdings[trade.symbol] = 0
-        if trade.type == 'buy':
-            holdings[trade.symbol] += trade.quantity
-        else:
-            holdings[trade.symbol] -= trade.quantity
-    
-    # Schedule real-time updates for the user's holdings
-    schedule_stock_updates(list(holdings.keys()))
-    
-    return jsonify(holdings), 200
+    user_id = current_user_id()
+    entry = response_cache.get(user_id, lambda: {
+        position.symbol: position.quantity for position in Position.query.filter_by(user_id=user_id)
+    }, version=trade_version(user_id))
+    # Pick up newly traded symbols if the user's dashboard is connected; the
+    # room itself is subscribed and released by the socket (see events.py).
+    price_stream.update_joined(user_room(user_id), entry.payload.keys())
+    return response_cache.respond(entry)
 
 @portfolio.route('/performance', methods=['GET'])
 @jwt_required()
 def get_performance():
-    current_user_id = get_jwt_identity()
-    trades = Trade.query.filter_by(user_id=current_user_id).all()
-    
-    holdings = {}
-    for trade in trades:
-        if trade.symbol not in holdings:
-            holdings[trade.symbol] = {'quantity': 0, 'cost_basis': 0}
-        if trade.type == 'buy':
-            holdings[trade.symbol]['quantity'] += trade.quantity
-            holdings[trade.symbol]['cost_basis'] += trade.quantity * trade.price
-        else:
-            holdings[trade.symbol]['quantity'] -= trade.quantity
-            holdings[trade.symbol]['cost_basis'] -= trade.quantity * trade.price
+    user_id = current_user_id()
+    return response_cache.respond(response_cache.get(
+        user_id, lambda: portfolio_performance(user_id), version=trade_version(user_id)
+    ))
+
+def portfolio_performance(user_id):
+    positions = Position.query.filter(
+        Position.user_id == user_id,
+        Position.quantity > 0
+    ).all()
 
-    symbols = list(holdings.keys())
-    current_prices = yf.download(symbols, period="1d")['Close'].iloc[-1]
+    symbols = [position.symbol for position in positions]
+    current_prices = market_data.latest_prices(symbols)
 
     performance = {}
-    for symbol, data in holdings.items():
-        if data['quantity'] > 0:
-            current_value = data['quantity'] * current_prices[symbol]
-            cost_basis = data['cost_basis']
+    for position in positions:
+        symbol = position.symbol
+        if symbol in current_prices:
+            current_value = position.quantity * current_prices[symbol]
+            cost_basis = position.cost_basis
             performance[symbol] = {
-                'quantity': data['quantity'],
+                'quantity': position.quantity,
                 'cost_basis': cost_basis,
                 'current_value': current_value,
                 'profit_loss': current_value - cost_basis,
-                'profit_loss_percent': ((current_value - cost_basis) / cost_basis) * 100
+                # A position bought at no cost has no meaningful percentage.
+                'profit_loss_percent': ((current_value - cost_basis) / cost_basis) * 100 if cost_basis else None
             }
 
-    return jsonify(performance), 200
+    return performance
+
+@portfolio.route('/analytics', methods=['GET'])
+@jwt_required()
+def get_analytics():
+    user_id = current_user_id()
+    period = request.args.get('period', '1y')
+    if period not in PERIOD_BARS or period == '1d':
+        return jsonify({"error": "Invalid period"}), 400
+    try:
+        benchmark = parse_symbol(request.args.get('benchmark', DEFAULT_BENCHMARK))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    result = analytics_cache.get(
+        user_id,
+        (period, benchmark),
+        lambda: portfolio_analytics(user_id, period, benchmark)
+    )
+    return jsonify(result), 200
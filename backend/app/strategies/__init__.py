@@ -1,2 +1,17 @@
-from .moving_average import MovingAverageCrossover
-from .rsi import RSIStrategy
+def __getattr__(name):
+    # The batch strategies pull in pandas; load them on first use so importing
+    # app.strategies.incremental stays cheap.
+    if name not in ('STRATEGIES', 'MovingAverageCrossover', 'RSIStrategy'):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from .moving_average import MovingAverageCrossover
+    from .rsi import RSIStrategy
+
+    globals().update(
+        MovingAverageCrossover=MovingAverageCrossover,
+        RSIStrategy=RSIStrategy,
+        STRATEGIES={
+            'moving_average': MovingAverageCrossover,
+            'rsi': RSIStrategy,
+        },
+    )
+    return globals()[name]
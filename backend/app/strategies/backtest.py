@@ -0,0 +1,85 @@
+import itertools
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from . import STRATEGIES
+from ..utils.pool import shared_pool
+
+TRADING_DAYS = 252
+
+
+def grid_values(grid):
+    keys = sorted(grid)
+    return keys, [v if isinstance(v, (list, tuple)) else [v] for v in (grid[k] for k in keys)]
+
+
+def grid_size(grid):
+    """Number of parameter sets ``expand_grid`` would return, without building them."""
+    return math.prod(len(values) for values in grid_values(grid)[1])
+
+
+def expand_grid(grid):
+    """{'short_window': [20, 50], 'long_window': [200]} -> list of param dicts."""
+    keys, values = grid_values(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def backtest(closes, positions, cost=0.0):
+    """Vectorized backtest over a dates x symbols close matrix.
+
+    ``positions`` is a strategy's ``positions`` frame (changes in signal); the
+    held exposure is its running sum, entered at the close after the change.
+    ``cost`` is charged per unit of exposure traded, as a fraction of price.
+    Returns per-symbol equity, drawdown, returns and traded exposure frames.
+    """
+    exposure = positions.fillna(0.0).cumsum()
+    traded = exposure.diff().abs()
+    traded.iloc[0] = exposure.iloc[0].abs()
+    returns = exposure.shift(1).fillna(0.0) * closes.pct_change().fillna(0.0) - traded * cost
+    equity = (1 + returns).cumprod()
+    drawdown = equity / equity.cummax() - 1
+    return {'equity': equity, 'drawdown': drawdown, 'returns': returns, 'traded': traded}
+
+
+def summarize(result):
+    returns = result['returns']
+    std = returns.std()
+    years = len(returns) / TRADING_DAYS
+    return pd.DataFrame({
+        'total_return': result['equity'].iloc[-1] - 1,
+        'max_drawdown': result['drawdown'].min(),
+        'turnover': result['traded'].sum() / years if years else np.nan,
+        'sharpe': (returns.mean() / std.where(std > 0)) * np.sqrt(TRADING_DAYS),
+        'trades': (result['traded'] > 0).sum(),
+    })
+
+
+def run_backtest(closes, strategy, params, cost=0.0):
+    signals = STRATEGIES[strategy](**params).generate_signals_batch(closes)
+    return backtest(closes, signals['positions'], cost)
+
+
+def _run_chunk(closes, strategy, chunk, cost):
+    return [summarize(run_backtest(closes, strategy, params, cost)) for params in chunk]
+
+
+def run_grid(closes, strategy, grid, cost=0.0, workers=1):
+    """Backtest every parameter combination; returns [(params, metrics DataFrame)].
+
+    With ``workers > 1`` the combinations are split into one chunk per worker
+    and run on a shared process pool; each chunk covers every symbol at once.
+    """
+    param_sets = expand_grid(grid)
+    if workers <= 1 or len(param_sets) == 1:
+        return list(zip(param_sets, _run_chunk(closes, strategy, param_sets, cost)))
+
+    size = -(-len(param_sets) // workers)
+    chunks = [param_sets[i:i + size] for i in range(0, len(param_sets), size)]
+    pool = shared_pool('backtest', lambda: ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+    ))
+    futures = [pool.submit(_run_chunk, closes, strategy, chunk, cost) for chunk in chunks]
+    metrics = [m for future in futures for m in future.result()]
+    return list(zip(param_sets, metrics))
@@ -0,0 +1,299 @@
+import json
+import math
+import os
+import threading
+import time
+from datetime import date
+
+
+class RollingMean:
+    """O(1) simple moving average over a fixed-size ring buffer."""
+
+    def __init__(self, window):
+        self.window = window
+        self.buffer = [0.0] * window
+        self.head = 0
+        self.count = 0
+        self.total = 0.0
+
+    @property
+    def value(self):
+        return self.total / self.count if self.count else math.nan
+
+    def push(self, x):
+        if self.count == self.window:
+            self.total -= self.buffer[self.head]
+        else:
+            self.count += 1
+        self.buffer[self.head] = x
+        self.total += x
+        self.head = (self.head + 1) % self.window
+        return self.value
+
+    def peek(self, x):
+        """The value push(x) would produce, without changing state."""
+        if self.count == self.window:
+            return (self.total - self.buffer[self.head] + x) / self.window
+        return (self.total + x) / (self.count + 1)
+
+    def state(self):
+        return {'window': self.window, 'buffer': list(self.buffer), 'head': self.head,
+                'count': self.count, 'total': self.total}
+
+    @classmethod
+    def from_state(cls, state):
+        mean = cls(state['window'])
+        mean.buffer = list(state['buffer'])
+        mean.head = state['head']
+        mean.count = state['count']
+        mean.total = state['total']
+        return mean
+
+
+class IncrementalMovingAverageCrossover:
+    """Bar-by-bar MovingAverageCrossover: same signal, O(1) per bar."""
+
+    def __init__(self, short_window=50, long_window=200):
+        self.short_window = short_window
+        self.long_window = long_window
+        self.short = RollingMean(short_window)
+        self.long = RollingMean(long_window)
+        self.bars = 0
+        self.signal = 0.0
+
+    def _evaluate(self, short_mavg, long_mavg):
+        if self.bars < self.short_window:
+            signal = 0.0
+        else:
+            signal = 1.0 if short_mavg > long_mavg else 0.0
+        return {
+            'signal': signal,
+            'positions': signal - self.signal if self.bars else math.nan,
+            'short_mavg': short_mavg,
+            'long_mavg': long_mavg,
+        }
+
+    def update(self, close):
+        result = self._evaluate(self.short.push(close), self.long.push(close))
+        self.bars += 1
+        self.signal = result['signal']
+        return result
+
+    def peek(self, close):
+        return self._evaluate(self.short.peek(close), self.long.peek(close))
+
+    def state(self):
+        return {'short_window': self.short_window, 'long_window': self.long_window,
+                'short': self.short.state(), 'long': self.long.state(),
+                'bars': self.bars, 'signal': self.signal}
+
+    @classmethod
+    def from_state(cls, state):
+        strategy = cls(state['short_window'], state['long_window'])
+        strategy.short = RollingMean.from_state(state['short'])
+        strategy.long = RollingMean.from_state(state['long'])
+        strategy.bars = state['bars']
+        strategy.signal = state['signal']
+        return strategy
+
+
+class IncrementalRSI:
+    """Wilder-smoothed RSI with running average gain/loss, O(1) per bar.
+
+    The first ``period`` changes seed the averages with a simple mean, as in
+    Wilder's original definition; the RSI is undefined (signal 0) until then.
+    """
+
+    def __init__(self, period=14, overbought=70, oversold=30):
+        self.period = period
+        self.overbought = overbought
+        self.oversold = oversold
+        self.prev_close = None
+        self.changes = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.signal = 0.0
+
+    def _averages(self, close):
+        if self.prev_close is None:
+            return 0, 0.0, 0.0
+        delta = close - self.prev_close
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        changes = self.changes + 1
+        if changes <= self.period:
+            # Running simple mean while seeding.
+            avg_gain = self.avg_gain + (gain - self.avg_gain) / changes
+            avg_loss = self.avg_loss + (loss - self.avg_loss) / changes
+        else:
+            avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        return changes, avg_gain, avg_loss
+
+    def _evaluate(self, changes, avg_gain, avg_loss):
+        if changes < self.period:
+            rsi = math.nan
+        elif avg_loss == 0:
+            rsi = 100.0 if avg_gain > 0 else 50.0
+        else:
+            rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+
+        signal = 0.0
+        if rsi < self.oversold:
+            signal = 1.0
+        elif rsi > self.overbought:
+            signal = -1.0
+        return {
+            'signal': signal,
+            'positions': signal - self.signal if self.prev_close is not None else math.nan,
+            'rsi': rsi,
+        }
+
+    def update(self, close):
+        changes, avg_gain, avg_loss = self._averages(close)
+        result = self._evaluate(changes, avg_gain, avg_loss)
+        self.changes, self.avg_gain, self.avg_loss = changes, avg_gain, avg_loss
+        self.prev_close = close
+        self.signal = result['signal']
+        return result
+
+    def peek(self, close):
+        return self._evaluate(*self._averages(close))
+
+    def state(self):
+        return {'period': self.period, 'overbought': self.overbought, 'oversold': self.oversold,
+                'prev_close': self.prev_close, 'changes': self.changes,
+                'avg_gain': self.avg_gain, 'avg_loss': self.avg_loss, 'signal': self.signal}
+
+    @classmethod
+    def from_state(cls, state):
+        strategy = cls(state['period'], state['overbought'], state['oversold'])
+        strategy.prev_close = state['prev_close']
+        strategy.changes = state['changes']
+        strategy.avg_gain = state['avg_gain']
+        strategy.avg_loss = state['avg_loss']
+        strategy.signal = state['signal']
+        return strategy
+
+
+INCREMENTAL_STRATEGIES = {
+    'moving_average': IncrementalMovingAverageCrossover,
+    'rsi': IncrementalRSI,
+}
+
+
+class LiveSignals:
+    """Latest signal per (symbol, strategy), kept current from live price ticks.
+
+    Indicators are seeded once from daily history. A tick is treated as the
+    provisional close of the current bar and only evaluated with ``peek``; the
+    last tick of a session is committed as that session's bar once the
+    provider reports a newer bar date, so weekends and holidays add no bars.
+    Entries nobody has asked for within ``idle_ttl`` seconds are evicted.
+    """
+
+    def __init__(self, idle_ttl=86400):
+        self.entries = {}
+        self.checkpoint_path = None
+        self.idle_ttl = idle_ttl
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.checkpoint_path = app.config.get('SIGNAL_CHECKPOINT_PATH')
+        self.idle_ttl = app.config.get('LIVE_SIGNALS_IDLE_TTL', self.idle_ttl)
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            self.load(self.checkpoint_path)
+
+    def seed(self, symbol, name, closes, **params):
+        """Seed from a Series of daily closes; the last close is today's provisional bar."""
+        indicator = INCREMENTAL_STRATEGIES[name](**params)
+        for close in closes.iloc[:-1]:
+            indicator.update(float(close))
+        last_price = float(closes.iloc[-1])
+        entry = {
+            'indicator': indicator,
+            'bar_date': closes.index[-1].date(),
+            'last_price': last_price,
+            'latest': indicator.peek(last_price),
+            'requested': time.monotonic(),
+        }
+        with self._lock:
+            self.entries[(symbol, name)] = entry
+        return entry['latest']
+
+    def latest(self, symbol, name):
+        entry = self.entries.get((symbol, name))
+        if entry is None:
+            return None
+        entry['requested'] = time.monotonic()
+        return entry['latest']
+
+    def evict(self, keep=()):
+        """Drop entries not requested within ``idle_ttl`` (except ``keep`` keys); returns the dropped keys."""
+        cutoff = time.monotonic() - self.idle_ttl
+        with self._lock:
+            idle = [key for key, entry in self.entries.items() if entry['requested'] < cutoff and key not in keep]
+            for key in idle:
+                del self.entries[key]
+        return idle
+
+    def symbols(self):
+        with self._lock:
+            return sorted({symbol for symbol, _ in self.entries})
+
+    def values(self, name, field):
+        """``{symbol: latest[field]}`` for every symbol tracked with strategy ``name``."""
+        with self._lock:
+            return {symbol: entry['latest'][field] for (symbol, strategy), entry in self.entries.items()
+                    if strategy == name}
+
+    def on_prices(self, prices, bar_dates):
+        """Apply ``{symbol: price}`` ticks; ``bar_dates`` maps symbols to the provider's latest bar date."""
+        with self._lock:
+            for (symbol, _), entry in self.entries.items():
+                price = prices.get(symbol)
+                if price is None:
+                    continue
+                bar_date = bar_dates.get(symbol)
+                if bar_date is not None and bar_date > entry['bar_date']:
+                    entry['indicator'].update(entry['last_price'])
+                    entry['bar_date'] = bar_date
+                entry['last_price'] = price
+                entry['latest'] = entry['indicator'].peek(price)
+
+    def checkpoint(self):
+        with self._lock:
+            return [{
+                'symbol': symbol,
+                'strategy': name,
+                'state': entry['indicator'].state(),
+                'bar_date': entry['bar_date'].isoformat(),
+                'last_price': entry['last_price'],
+            } for (symbol, name), entry in self.entries.items()]
+
+    def restore(self, checkpoint):
+        entries = {}
+        for item in checkpoint:
+            indicator = INCREMENTAL_STRATEGIES[item['strategy']].from_state(item['state'])
+            entries[(item['symbol'], item['strategy'])] = {
+                'indicator': indicator,
+                'bar_date': date.fromisoformat(item['bar_date']),
+                'last_price': item['last_price'],
+                'latest': indicator.peek(item['last_price']),
+                'requested': time.monotonic(),
+            }
+        with self._lock:
+            self.entries = entries
+
+    def save(self, path=None):
+        path = path or self.checkpoint_path
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.checkpoint(), f)
+        os.replace(tmp_path, path)
+
+    def load(self, path=None):
+        with open(path or self.checkpoint_path) as f:
+            self.restore(json.load(f))
+
+
+live_signals = LiveSignals()
@@ -6,15 +6,26 @@ class MovingAverageCrossover:
         self.short_window = short_window
         self.long_window = long_window
 
-    def generate_signals(self, data):
-        signals = pd.DataFrame(index=data.index)
-        signals['signal'] = 0.0
+    def generate_signals_batch(self, closes):
+        """Signals for a dates x symbols close matrix.
+
+        Returns a DataFrame with (field, symbol) columns for the fields
+        signal, short_mavg, long_mavg and positions.
+        """
+        short_mavg = closes.rolling(window=self.short_window, min_periods=1, center=False).mean()
+        long_mavg = closes.rolling(window=self.long_window, min_periods=1, center=False).mean()
 
-        signals['short_mavg'] = data['Close'].rolling(window=self.short_window, min_periods=1, center=False).mean()
-        signals['long_mavg'] = data['Close'].rolling(window=self.long_window, min_periods=1, center=False).mean()
+        signal = np.where(short_mavg.to_numpy() > long_mavg.to_numpy(), 1.0, 0.0)
+        signal[:self.short_window] = 0.0
+        signal = pd.DataFrame(signal, index=closes.index, columns=closes.columns)
 
-        signals['signal'][self.short_window:] = np.where(signals['short_mavg'][self.short_window:] 
-                                                         > signals['long_mavg'][self.short_window:], 1.0, 0.0)   
-        signals['positions'] = signals['signal'].diff()
+        return pd.concat({
+            'signal': signal,
+            'short_mavg': short_mavg,
+            'long_mavg': long_mavg,
+            'positions': signal.diff(),
+        }, axis=1)
 
-        return signals
+    def generate_signals(self, data):
+        batch = self.generate_signals_batch(data[['Close']])
+        return batch.xs('Close', axis=1, level=1)
@@ -7,19 +7,42 @@ class RSIStrategy:
         self.overbought = overbought
         self.oversold = oversold
 
+    def _wilder(self, values):
+        """Wilder's smoothing per column, seeded with the mean of the first ``period`` values.
+
+        Matches IncrementalRSI, which /analyze and the alerts serve, so the
+        batch endpoints report the same signals.
+        """
+        seed = values.rolling(window=self.period).mean()
+        seen = seed.notna().cumsum()
+        values = values.mask(seen == 0).mask(seen == 1, seed)
+        return values.ewm(alpha=1 / self.period, adjust=False).mean()
+
+    def generate_signals_batch(self, closes):
+        """Signals for a dates x symbols close matrix.
+
+        Returns a DataFrame with (field, symbol) columns for the fields
+        rsi, signal and positions.
+        """
+        delta = closes.diff()
+        gain = self._wilder(delta.clip(lower=0).where(delta.notna()))
+        loss = self._wilder((-delta).clip(lower=0).where(delta.notna()))
+
+        rsi = 100 - (100 / (1 + gain / loss))
+        # Same edge cases as IncrementalRSI: no losses is 100, a flat window 50.
+        rsi = rsi.mask(loss == 0, np.where(gain > 0, 100.0, 50.0))
+
+        values = rsi.to_numpy()
+        signal = np.where(values < self.oversold, 1.0, 0.0)
+        signal = np.where(values > self.overbought, -1.0, signal)
+        signal = pd.DataFrame(signal, index=closes.index, columns=closes.columns)
+
+        return pd.concat({
+            'rsi': rsi,
+            'signal': signal,
+            'positions': signal.diff(),
+        }, axis=1)
+
     def generate_signals(self, data):
-        delta = data['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        signals = pd.DataFrame(index=data.index)
-        signals['rsi'] = rsi
-        signals['signal'] = 0.0
-        signals['signal'] = np.where(signals['rsi'] < self.oversold, 1.0, 0.0)
-        signals['signal'] = np.where(signals['rsi'] > self.overbought, -1.0, signals['signal'])
-        signals['positions'] = signals['signal'].diff()
-        
-        return signals
+        batch = self.generate_signals_batch(data[['Close']])
+        return batch.xs('Close', axis=1, level=1)
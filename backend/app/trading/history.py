@@ -0,0 +1,79 @@
+import base64
+import csv
+import io
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+from ..extensions import db
+from ..models.trade import Trade
+
+HISTORY_COLUMNS = ['id', 'symbol', 'quantity', 'price', 'type', 'timestamp']
+EXPORT_BATCH_SIZE = 1000
+
+
+def encode_cursor(row):
+    raw = f"{row.timestamp.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return (timestamp, id); raises ValueError for malformed cursors."""
+    try:
+        timestamp, trade_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(timestamp), int(trade_id)
+    except (UnicodeDecodeError, TypeError, ValueError, base64.binascii.Error):
+        raise ValueError('Invalid cursor')
+
+
+def parse_date(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def history_query(user_id, symbol=None, start=None, end=None, cursor=None):
+    """Newest-first column query over the (user_id, timestamp, id) index."""
+    query = db.session.query(*(getattr(Trade, column) for column in HISTORY_COLUMNS)).filter(
+        Trade.user_id == user_id
+    )
+    if symbol:
+        query = query.filter(Trade.symbol == symbol)
+    if start:
+        query = query.filter(Trade.timestamp >= start)
+    if end:
+        query = query.filter(Trade.timestamp < end)
+    if cursor:
+        timestamp, trade_id = cursor
+        query = query.filter(or_(
+            Trade.timestamp < timestamp,
+            and_(Trade.timestamp == timestamp, Trade.id < trade_id)
+        ))
+    return query.order_by(Trade.timestamp.desc(), Trade.id.desc())
+
+
+def serialize(row):
+    trade = dict(zip(HISTORY_COLUMNS, row))
+    trade['timestamp'] = row.timestamp.isoformat()
+    return trade
+
+
+def page(query, limit):
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return [serialize(row) for row in rows[:limit]], next_cursor
+
+
+def stream_ndjson(query):
+    for row in query.yield_per(EXPORT_BATCH_SIZE):
+        yield json.dumps(serialize(row)) + '\n'
+
+
+def stream_csv(query):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HISTORY_COLUMNS)
+    for i, row in enumerate(query.yield_per(EXPORT_BATCH_SIZE), 1):
+        writer.writerow(serialize(row).values())
+        if i % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+import math
+from datetime import datetime, timezone
+from ..extensions import db
+from ..models.trade import Trade, bump_trade_version
+from ..models.position import rebuild_positions
+from ..utils.market_data import parse_symbol
+
+IMPORT_COLUMNS = ['symbol', 'quantity', 'price', 'type']
+IMPORT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportAborted(ValueError):
+    """The stream itself was unreadable; ``result`` counts what was committed before it failed."""
+
+    def __init__(self, message, result):
+        super().__init__(message)
+        self.result = result
+
+
+def import_format(filename=None, mimetype=None):
+    if (filename or '').lower().endswith(('.ndjson', '.jsonl')) or mimetype in ('application/x-ndjson', 'application/jsonl'):
+        return 'ndjson'
+    return 'csv'
+
+
+def read_csv(stream):
+    """Yield one dict per CSV row; extra columns (e.g. ``id`` from an export) are ignored."""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    missing = [column for column in IMPORT_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    try:
+        yield from reader
+    except csv.Error as e:
+        raise ValueError(f'Invalid CSV: {e}')
+
+
+def read_ndjson(stream):
+    for line in io.TextIOWrapper(stream, encoding='utf-8'):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson}
+
+
+def trade_row(record, user_id, now):
+    """Validate one record into Trade column values; raises ValueError."""
+    if not isinstance(record, dict):
+        raise ValueError('Expected a JSON object')
+    symbol = parse_symbol(record.get('symbol'))
+    trade_type = str(record.get('type') or '').strip().lower()
+    if trade_type not in ('buy', 'sell'):
+        raise ValueError('type must be buy or sell')
+    try:
+        quantity, price = float(record['quantity']), float(record['price'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('quantity and price must be numbers')
+    if not (quantity > 0 and math.isfinite(quantity)) or not (price > 0 and math.isfinite(price)):
+        raise ValueError('quantity and price must be positive')
+    timestamp = record.get('timestamp')
+    try:
+        timestamp = datetime.fromisoformat(timestamp) if timestamp else now
+    except (TypeError, ValueError):
+        raise ValueError('Invalid timestamp')
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return {
+        'user_id': user_id,
+        'symbol': symbol,
+        'quantity': quantity,
+        'price': price,
+        'type': trade_type,
+        'timestamp': timestamp,
+    }
+
+
+def import_trades(user_id, records, batch_size=IMPORT_BATCH_SIZE):
+    """Insert valid records in batches of ``batch_size``, one executemany and commit each.
+
+    Invalid rows are skipped and reported (up to MAX_REPORTED_ERRORS).
+    Positions are rebuilt once, after the last batch. Errors reading the
+    stream itself (missing columns, bad encoding) raise ImportAborted with
+    the counts so far; batches before the error stay committed.
+    """
+    now = datetime.utcnow()
+    imported, rejected, errors, batch = 0, 0, [], []
+
+    def flush():
+        db.session.execute(Trade.__table__.insert(), batch)
+        bump_trade_version(user_id)
+        db.session.commit()
+
+    try:
+        for row, record in enumerate(records, 1):
+            try:
+                batch.append(trade_row(record, user_id, now))
+            except ValueError as e:
+                rejected += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({'row': row, 'error': str(e)})
+            if len(batch) >= batch_size:
+                flush()
+                imported += len(batch)
+                batch = []
+        if batch:
+            flush()
+            imported += len(batch)
+    except Exception as e:
+        # A malformed stream aborts the import; keep positions in step with
+        # the batches that were already committed.
+        db.session.rollback()
+        positions = rebuild_positions(user_id) if imported else 0
+        if isinstance(e, ValueError):
+            raise ImportAborted(str(e), {
+                'imported': imported, 'rejected': rejected, 'errors': errors, 'positions': positions,
+            }) from e
+        raise
+
+    positions = rebuild_positions(user_id) if imported else 0
+    return {'imported': imported, 'rejected': rejected, 'errors': errors, 'positions': positions}
@@ -1,59 +1,244 @@
-from flask import jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Response, current_app, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required
 from . import trading
-from ..models.user import db
-from ..models.trade import Trade
-from ..strategies import MovingAverageCrossover, RSIStrategy
-import yfinance as yf
+from ..auth.identity import current_user_id
+from .history import history_query, decode_cursor, parse_date, page, stream_csv, stream_ndjson
+from .imports import READERS, ImportAborted, import_format, import_trades
+from .screen import parse_specs, screen
+from ..extensions import db
+from ..models.trade import Trade, trade_version
+from ..models.position import apply_trade
+from ..portfolio.analytics import analytics_cache
+from ..strategies.incremental import INCREMENTAL_STRATEGIES, live_signals
+from ..utils.bar_store import bar_store
+from ..utils.market_data import PERIOD_BARS, parse_symbol
+from ..utils.metrics import query_budget
+from ..utils.response_cache import response_cache
+from ..utils.stock_updater import schedule_stock_updates, LIVE_SIGNALS_ROOM
+import json
+import math
+import time
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
 
 @trading.route('/execute', methods=['POST'])
 @jwt_required()
 def execute_trade():
     data = request.json
+    try:
+        symbol = parse_symbol(data.get('symbol'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     new_trade = Trade(
-        user_id=get_jwt_identity(),
-        symbol=data['symbol'],
+        user_id=current_user_id(),
+        symbol=symbol,
         quantity=data['quantity'],
         price=data['price'],
         type=data['type']
     )
     db.session.add(new_trade)
+    apply_trade(new_trade)
     db.session.commit()
+    analytics_cache.invalidate(new_trade.user_id)
+    response_cache.invalidate(new_trade.user_id)
     return jsonify({"message": "Trade executed successfully"}), 201
 
+@trading.route('/import', methods=['POST'])
+@query_budget(None)  # one INSERT per batch, so the statement count grows with the file
+@jwt_required()
+def import_trade_history():
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    fmt = request.args.get('format') or import_format(upload.filename if upload else None, request.mimetype)
+    if fmt not in READERS:
+        return jsonify({"error": "Invalid format"}), 400
+    
+    user_id = current_user_id()
+    try:
+        result = import_trades(
+            user_id,
+            READERS[fmt](stream),
+            batch_size=current_app.config['IMPORT_BATCH_SIZE']
+        )
+    except ImportAborted as e:
+        # Header or encoding errors; batches before the error stay committed
+        # and are counted, so the client can resume after ``imported`` rows.
+        return jsonify(dict(e.result, error=str(e))), 400
+    finally:
+        analytics_cache.invalidate(user_id)
+        response_cache.invalidate(user_id)
+    return jsonify(result), 201 if result['imported'] else 400
+
 @trading.route('/history', methods=['GET'])
 @jwt_required()
 def get_trade_history():
-    user_id = get_jwt_identity()
-    trades = Trade.query.filter_by(user_id=user_id).all()
-    return jsonify([{
-        'symbol': trade.symbol,
-        'quantity': trade.quantity,
-        'price': trade.price,
-        'type': trade.type,
-        'timestamp': trade.timestamp
-    } for trade in trades]), 200
+    user_id = current_user_id()
+    args = request.args
+    export = args.get('format', 'json')
+    if export not in ('json', 'ndjson', 'csv'):
+        return jsonify({"error": "Invalid format"}), 400
+    
+    try:
+        query = history_query(
+            user_id,
+            symbol=args.get('symbol'),
+            start=parse_date(args.get('start')),
+            end=parse_date(args.get('end')),
+            cursor=decode_cursor(args['cursor']) if args.get('cursor') else None
+        )
+        limit = min(int(args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+    
+    if export == 'ndjson':
+        return Response(stream_with_context(stream_ndjson(query)), mimetype='application/x-ndjson')
+    if export == 'csv':
+        return Response(
+            stream_with_context(stream_csv(query)),
+            mimetype='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=trades.csv'}
+        )
+    
+    def history_page():
+        trades, next_cursor = page(query, limit)
+        return {"trades": trades, "next_cursor": next_cursor}
+    return response_cache.respond(response_cache.get(user_id, history_page, version=trade_version(user_id)))
 
 @trading.route('/analyze', methods=['POST'])
 @jwt_required()
 def analyze_stock():
     data = request.json
-    symbol = data['symbol']
-    strategy = data['strategy']
+    strategy = data.get('strategy')
+    try:
+        symbol = parse_symbol(data.get('symbol'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    stock_data = yf.download(symbol, period="1y")
-    
-    if strategy == 'moving_average':
-        strategy = MovingAverageCrossover()
-    elif strategy == 'rsi':
-        strategy = RSIStrategy()
-    else:
+    if strategy not in INCREMENTAL_STRATEGIES:
         return jsonify({"error": "Invalid strategy"}), 400
     
-    signals = strategy.generate_signals(stock_data)
+    # Served from live indicator state; history is only fetched to seed it.
+    latest = live_signals.latest(symbol, strategy)
+    if latest is None:
+        stock_data = bar_store.history(symbol, period="1y")
+        if stock_data.empty:
+            return jsonify({"error": "No market data for symbol"}), 404
+        latest = live_signals.seed(symbol, strategy, stock_data['Close'])
+        schedule_stock_updates(LIVE_SIGNALS_ROOM, live_signals.symbols(), emit=False)
     
     return jsonify({
         "symbol": symbol,
-        "latest_signal": signals['signal'].iloc[-1],
-        "latest_position": signals['positions'].iloc[-1]
+        "latest_signal": latest['signal'],
+        "latest_position": None if math.isnan(latest['positions']) else latest['positions']
+    }), 200
+
+@trading.route('/screen', methods=['POST'])
+@jwt_required()
+def screen_watchlist():
+    started = time.monotonic()
+    data = request.json
+    period = data.get('period', '1y')
+    try:
+        symbols = list(dict.fromkeys(parse_symbol(symbol) for symbol in data.get('symbols', [])))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if not symbols:
+        return jsonify({"error": "At least one symbol is required"}), 400
+    if len(symbols) > current_app.config['SCREEN_MAX_SYMBOLS']:
+        return jsonify({"error": f"At most {current_app.config['SCREEN_MAX_SYMBOLS']} symbols"}), 400
+    if period not in PERIOD_BARS:
+        return jsonify({"error": "Invalid period"}), 400
+    try:
+        specs = parse_specs(data.get('strategies'))
+        timeout = min(float(data.get('timeout', current_app.config['SCREEN_TIMEOUT'])),
+                      current_app.config['SCREEN_TIMEOUT'])
+    except (AttributeError, TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # One batched price fetch for the whole watchlist.
+    closes = bar_store.closes(symbols, period=period)
+    if closes.empty:
+        return jsonify({"error": "No market data for symbols"}), 404
+    missing = [symbol for symbol in symbols if symbol not in closes.columns]
+    results = screen(
+        closes,
+        specs,
+        workers=current_app.config['SCREEN_WORKERS'],
+        timeout=max(timeout - (time.monotonic() - started), 0)
+    )
+    
+    def generate():
+        for item in results:
+            if 'summary' in item:
+                item['summary']['missing'] = missing
+            yield json.dumps(item) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@trading.route('/backtest', methods=['POST'])
+@jwt_required()
+def run_strategy_backtest():
+    # Deferred: the batch strategies and backtester import pandas/numpy.
+    from ..strategies import STRATEGIES
+    from ..strategies.backtest import expand_grid, grid_size, run_grid
+
+    data = request.json
+    strategy = data.get('strategy')
+    grid = data.get('params', {})
+    period = data.get('period', '1y')
+    
+    if strategy not in STRATEGIES:
+        return jsonify({"error": "Invalid strategy"}), 400
+    try:
+        symbols = list(dict.fromkeys(parse_symbol(symbol) for symbol in data.get('symbols', [])))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    if not symbols:
+        return jsonify({"error": "At least one symbol is required"}), 400
+    if period not in PERIOD_BARS:
+        return jsonify({"error": "Invalid period"}), 400
+    if not isinstance(grid, dict):
+        return jsonify({"error": "params must be an object of parameter values or lists"}), 400
+    try:
+        cost = float(data.get('cost', 0.0))
+    except (TypeError, ValueError):
+        return jsonify({"error": "cost must be a number"}), 400
+    if not 0 <= cost < 1:
+        return jsonify({"error": "cost must be a fraction of price between 0 and 1"}), 400
+    # Size the grid before expanding it: a few long lists multiply out to
+    # more parameter sets than fit in memory.
+    runs = len(symbols) * grid_size(grid)
+    if runs > current_app.config['BACKTEST_MAX_RUNS']:
+        return jsonify({"error": f"Backtest too large ({runs} symbol/parameter runs)"}), 400
+    try:
+        for params in expand_grid(grid):
+            STRATEGIES[strategy](**params)
+    except TypeError as e:
+        return jsonify({"error": f"Invalid strategy parameters: {e}"}), 400
+    
+    closes = bar_store.closes(symbols, period=period)
+    if closes.empty:
+        return jsonify({"error": "No market data for symbols"}), 404
+    
+    results = run_grid(
+        closes,
+        strategy,
+        grid,
+        cost=cost,
+        workers=current_app.config['BACKTEST_WORKERS']
+    )
+    
+    return jsonify({
+        "strategy": strategy,
+        "symbols": list(closes.columns),
+        "start": closes.index[0].date().isoformat(),
+        "end": closes.index[-1].date().isoformat(),
+        "results": [{
+            "params": params,
+            "metrics": metrics.astype(object).where(metrics.notna(), None).to_dict(orient='index')
+        } for params, metrics in results]
     }), 200
@@ -0,0 +1,86 @@
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from ..utils.pool import shared_pool
+
+SCREEN_CHUNK_SIZE = 25
+
+def parse_specs(raw):
+    """Normalise ['rsi', {'strategy': 'moving_average', 'params': {...}}] to [(name, params)].
+
+    Raises ValueError for unknown strategies or parameters they do not accept.
+    """
+    from ..strategies import STRATEGIES
+
+    specs = []
+    for item in raw or []:
+        name, params = (item, {}) if isinstance(item, str) else (item.get('strategy'), item.get('params') or {})
+        if name not in STRATEGIES:
+            raise ValueError(f'Invalid strategy: {name}')
+        try:
+            STRATEGIES[name](**params)
+        except TypeError as e:
+            raise ValueError(f'Invalid parameters for {name}: {e}')
+        specs.append((name, params))
+    if not specs:
+        raise ValueError('At least one strategy is required')
+    return specs
+
+
+def _number(value):
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def evaluate(closes, name, params):
+    """Latest signal and position change for every column of a close matrix."""
+    from ..strategies import STRATEGIES
+
+    batch = STRATEGIES[name](**params).generate_signals_batch(closes)
+    last = batch.iloc[-1]
+    return [{
+        'symbol': symbol,
+        'strategy': name,
+        'params': params,
+        'close': _number(closes[symbol].iloc[-1]),
+        'latest_signal': _number(last[('signal', symbol)]),
+        'latest_position': _number(last[('positions', symbol)]),
+    } for symbol in closes.columns]
+
+
+def screen(closes, specs, workers=4, timeout=10.0):
+    """Evaluate each strategy spec over chunks of symbols on a shared thread pool.
+
+    Yields result dicts in completion order, then a summary. Work still queued
+    when ``timeout`` elapses is cancelled and reported as timed out; chunks
+    already running finish in the background but are not waited for.
+    """
+    deadline = time.monotonic() + timeout
+    pool = shared_pool('screen', lambda: ThreadPoolExecutor(max_workers=workers, thread_name_prefix='screen'))
+    symbols = list(closes.columns)
+    pending = {}
+    for name, params in specs:
+        for i in range(0, len(symbols), SCREEN_CHUNK_SIZE):
+            chunk = symbols[i:i + SCREEN_CHUNK_SIZE]
+            pending[pool.submit(evaluate, closes[chunk], name, params)] = (name, params, chunk)
+
+    results, errors = 0, []
+    while pending:
+        done, _ = wait(pending, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            name, params, chunk = pending.pop(future)
+            try:
+                rows = future.result()
+            except Exception as e:
+                errors.append({'strategy': name, 'params': params, 'symbols': chunk, 'error': str(e)})
+                continue
+            results += len(rows)
+            yield from rows
+
+    timed_out = []
+    for future, (name, params, chunk) in pending.items():
+        future.cancel()
+        timed_out.append({'strategy': name, 'params': params, 'symbols': chunk})
+    yield {'summary': {'results': results, 'errors': errors, 'timed_out': timed_out}}
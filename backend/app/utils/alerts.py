@@ -0,0 +1,278 @@
+import bisect
+import math
+import threading
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from sqlalchemy import case, update
+from ..extensions import db
+from ..models.version import bump_version, read_version
+from ..strategies.incremental import live_signals
+from .bar_store import bar_store
+from .logger import loki_logger
+from .market_data import parse_symbol
+
+METRICS = {'price': (0.0, math.inf), 'rsi': (0.0, 100.0)}
+CONDITIONS = ('above', 'below')
+CLAIM_CHUNK = 500  # alert ids per UPDATE, well under SQLite's bound-parameter limit
+
+ActiveAlert = namedtuple('ActiveAlert', ['id', 'user_id', 'symbol', 'metric', 'condition', 'threshold'])
+
+
+def parse_alert(data):
+    """Validate an alert request body; returns (symbol, metric, condition, threshold)."""
+    symbol = parse_symbol(data.get('symbol'))
+    metric = data.get('metric', 'price')
+    condition = data.get('condition')
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+    if condition not in CONDITIONS:
+        raise ValueError(f"condition must be one of {', '.join(CONDITIONS)}")
+    try:
+        threshold = float(data['threshold'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('threshold must be a number')
+    low, high = METRICS[metric]
+    if not low < threshold < high:
+        raise ValueError(f'{metric} threshold must be between {low:g} and {high:g}')
+    return symbol, metric, condition, threshold
+
+
+def watch_indicator(symbol, metric):
+    """Make sure live signals track ``metric`` for ``symbol``; False when there is no history to seed it."""
+    if metric == 'price' or live_signals.latest(symbol, metric) is not None:
+        return True
+    history = bar_store.history(symbol, period='1y')
+    if history.empty:
+        return False
+    live_signals.seed(symbol, metric, history['Close'])
+    return True
+
+
+class ThresholdIndex:
+    """Alerts on one (symbol, metric), split by direction and sorted by threshold.
+
+    A move from ``previous`` to ``value`` crosses exactly the ``above``
+    thresholds in (previous, value] or the ``below`` thresholds in
+    [value, previous), so a tick finds the triggered alerts as one contiguous
+    slice with two bisections instead of scanning them all.
+    """
+
+    def __init__(self):
+        self.sides = {condition: ([], []) for condition in CONDITIONS}  # (thresholds, alert ids)
+
+    def __len__(self):
+        return sum(len(thresholds) for thresholds, _ in self.sides.values())
+
+    def add(self, condition, threshold, alert_id):
+        thresholds, ids = self.sides[condition]
+        i = bisect.bisect_right(thresholds, threshold)
+        thresholds.insert(i, threshold)
+        ids.insert(i, alert_id)
+
+    def remove(self, condition, threshold, alert_id):
+        thresholds, ids = self.sides[condition]
+        for i in range(bisect.bisect_left(thresholds, threshold), bisect.bisect_right(thresholds, threshold)):
+            if ids[i] == alert_id:
+                del thresholds[i], ids[i]
+                return
+
+    def cross(self, previous, value):
+        """Remove and return the ids of alerts crossed by a move from ``previous`` to ``value``."""
+        if value > previous:
+            thresholds, ids = self.sides['above']
+            lo, hi = bisect.bisect_right(thresholds, previous), bisect.bisect_right(thresholds, value)
+        elif value < previous:
+            thresholds, ids = self.sides['below']
+            lo, hi = bisect.bisect_left(thresholds, value), bisect.bisect_left(thresholds, previous)
+        else:
+            return []
+        if lo == hi:
+            return []
+        fired = ids[lo:hi]
+        del thresholds[lo:hi], ids[lo:hi]
+        return fired
+
+
+class AlertEngine:
+    """One-shot price and indicator alerts, checked against every price tick.
+
+    Active alerts are loaded from the database into per-(symbol, metric)
+    threshold indexes. Alerts fire when a value crosses their threshold
+    between two ticks; fired alerts leave the index, are marked triggered and
+    are sent through the notification dispatcher.
+
+    Every process running the price stream keeps its own index. Creating,
+    deleting and triggering alerts bump the 'alerts' version (models.version)
+    in the same transaction; ``refresh`` reloads the index when that differs
+    from the version it was built at, so changes made through another worker
+    are picked up on the next tick. ``notify`` only sends alerts this
+    process managed to mark triggered, so each alert is sent once.
+    """
+
+    def __init__(self):
+        self.alerts = {}
+        self.indexes = defaultdict(ThresholdIndex)
+        self.last = {}
+        self.version = None
+        self.pending = []
+        self.app = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+
+    @property
+    def loaded(self):
+        return self.version is not None
+
+    def refresh(self):
+        """Reload if alerts changed since the index was built; True when it did. Call inside an app context."""
+        if read_version('alerts') == self.version:
+            return False
+        self.load()
+        return True
+
+    def _advance(self, version):
+        """Record a bump made by this process; call holding the lock.
+
+        Only a bump straight after the index's version means nothing else
+        changed in between; otherwise the next ``refresh`` reloads.
+        """
+        if self.version is not None and version == self.version + 1:
+            self.version = version
+
+    def load(self):
+        """Rebuild the indexes from active alerts; call inside an app context."""
+        from ..models.alert import Alert
+
+        version = read_version('alerts')
+        rows = db.session.query(
+            Alert.id, Alert.user_id, Alert.symbol, Alert.metric, Alert.condition, Alert.threshold
+        ).filter(Alert.active.is_(True)).order_by(Alert.threshold)
+        alerts, indexes = {}, defaultdict(ThresholdIndex)
+        for row in rows:
+            alert = ActiveAlert(*row)
+            alerts[alert.id] = alert
+            # Rows arrive sorted by threshold, so every insert is an append.
+            indexes[alert.symbol, alert.metric].add(alert.condition, alert.threshold, alert.id)
+        with self._lock:
+            self.alerts, self.indexes, self.version = alerts, indexes, version
+        return len(alerts)
+
+    def add(self, alert, version=None):
+        """Index a newly created alert; ``version`` is what creating it bumped 'alerts' to."""
+        alert = ActiveAlert(alert.id, alert.user_id, alert.symbol, alert.metric, alert.condition, alert.threshold)
+        with self._lock:
+            if alert.id not in self.alerts:  # a reload may already have picked it up
+                self.alerts[alert.id] = alert
+                self.indexes[alert.symbol, alert.metric].add(alert.condition, alert.threshold, alert.id)
+            self._advance(version)
+
+    def remove(self, alert_id, version=None):
+        with self._lock:
+            alert = self.alerts.pop(alert_id, None)
+            if alert is not None:
+                self.indexes[alert.symbol, alert.metric].remove(alert.condition, alert.threshold, alert.id)
+            self._advance(version)
+
+    def symbols(self, metric=None):
+        with self._lock:
+            return sorted({alert.symbol for alert in self.alerts.values() if metric in (None, alert.metric)})
+
+    def check(self, metric, values):
+        """Record new ``{symbol: value}`` readings; returns [(alert, value)] for alerts they trigger.
+
+        The first reading of a symbol only sets the baseline.
+        """
+        fired = []
+        with self._lock:
+            for symbol, value in values.items():
+                if value is None or math.isnan(value):
+                    continue
+                key = (symbol, metric)
+                previous = self.last.get(key)
+                self.last[key] = value
+                index = self.indexes.get(key)
+                if previous is None or not index:
+                    continue
+                for alert_id in index.cross(previous, value):
+                    fired.append((self.alerts.pop(alert_id), value))
+        return fired
+
+    def on_prices(self, prices, indicators=None):
+        """Check price alerts, then indicator alerts (``{metric: {symbol: value}}``)."""
+        fired = self.check('price', prices)
+        for metric, values in (indicators or {}).items():
+            fired += self.check(metric, values)
+        return fired
+
+    def claim(self, fired):
+        """Mark fired alerts triggered if they are still active.
+
+        Returns the (alert, value) pairs this call claimed and the bumped
+        'alerts' version (None if nothing was claimed).
+        """
+        from ..models.alert import Alert
+
+        values = {alert.id: value for alert, value in fired}
+        claimed = set()
+        ids = list(values)
+        now = datetime.utcnow()
+        for start in range(0, len(ids), CLAIM_CHUNK):
+            chunk = ids[start:start + CLAIM_CHUNK]
+            claimed.update(db.session.execute(
+                update(Alert)
+                .where(Alert.id.in_(chunk), Alert.active.is_(True))
+                .values(active=False, triggered_at=now,
+                        triggered_value=case({i: values[i] for i in chunk}, value=Alert.id))
+                .returning(Alert.id)
+            ).scalars())
+        version = bump_version('alerts') if claimed else None
+        db.session.commit()
+        return [(alert, value) for alert, value in fired if alert.id in claimed], version
+
+    def notify(self, fired):
+        """Mark fired alerts as triggered and queue a notification for each; returns how many were sent.
+
+        Another process may have fired the same alert on the same tick; only
+        the one whose UPDATE flips it inactive sends it. If the UPDATE fails
+        the alerts are kept and retried with the next tick's.
+        """
+        from ..auth.identity import user_cache
+        from ..notifications.dispatcher import dispatcher, QueueFull
+
+        with self._lock:
+            fired, self.pending = self.pending + list(fired), []
+        if not fired:
+            return 0
+
+        with self.app.app_context():
+            try:
+                claimed, version = self.claim(fired)
+            except Exception:
+                db.session.rollback()
+                with self._lock:
+                    self.pending = fired + self.pending
+                raise
+            with self._lock:
+                self._advance(version)
+
+            for alert, value in claimed:
+                user = user_cache.get(alert.user_id)
+                if user is None:
+                    continue
+                channels = [channel for channel, enabled in
+                            (('email', user.email_notifications), ('push', user.push_notifications)) if enabled]
+                if not channels:
+                    continue
+                label = 'price' if alert.metric == 'price' else alert.metric.upper()
+                subject = f'{alert.symbol} {label} crossed {alert.condition} {alert.threshold:g}'
+                body = f'{alert.symbol} {label} is {value:.2f} ({alert.condition} your alert at {alert.threshold:g}).'
+                try:
+                    dispatcher.submit(channels, alert.user_id, user.email, subject, body)
+                except QueueFull:
+                    loki_logger.error(f'Notification queue full, dropped alert {alert.id} for user {alert.user_id}')
+        return len(claimed)
+
+
+alert_engine = AlertEngine()
@@ -0,0 +1,223 @@
+import contextlib
+import functools
+import os
+import threading
+from collections import defaultdict
+from .market_data import market_data, parse_symbol, OHLCV_COLUMNS, PERIOD_BARS, SYMBOL_PATTERN
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process deployments only
+    fcntl = None
+
+BAR_FIELDS = [
+    ('date', '<M8[D]'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+]
+
+REFRESH_PERIODS = ['5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'max']
+
+
+@functools.cache
+def bar_dtype():
+    # Built on first use so importing the store does not import numpy.
+    import numpy as np
+    return np.dtype(BAR_FIELDS)
+
+
+def _period_for(bars):
+    for period in REFRESH_PERIODS:
+        if PERIOD_BARS[period] >= bars:
+            return period
+    return 'max'
+
+
+def _naive(index):
+    return index.tz_localize(None) if index.tz is not None else index
+
+
+def _today():
+    import numpy as np
+    import pandas as pd
+    return np.datetime64(pd.Timestamp.today().date(), 'D')
+
+
+class BarStore:
+    """Append-only daily OHLCV files, one fixed-width binary file per symbol.
+
+    Only completed bars (before today) are stored. Reads memory-map the file,
+    so date-range slices are views rather than copies; today's partial bar is
+    overlaid from the market-data cache. Every worker shares the files, so
+    writes hold an flock on a ``.lock`` file beside the symbol's bars.
+    """
+
+    def __init__(self, root=None, backfill_period='1y'):
+        self.root = root
+        self.backfill_period = backfill_period
+        self._depth = {}
+        self._checked = {}
+        self._locks = defaultdict(threading.Lock)
+
+    def init_app(self, app):
+        self.root = app.config.get('BAR_STORE_PATH') or os.path.join(app.instance_path, 'bars')
+        self.backfill_period = app.config.get('BAR_STORE_BACKFILL', self.backfill_period)
+
+    def _path(self, symbol):
+        return os.path.join(self.root, f'{parse_symbol(symbol)}.bars')
+
+    @contextlib.contextmanager
+    def _file_lock(self, symbol):
+        """Exclusive lock on ``symbol``'s bars across processes."""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._path(symbol) + '.lock', 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def bars(self, symbol, start=None, end=None):
+        """Zero-copy structured view of stored bars with start <= date <= end."""
+        import numpy as np
+
+        dtype = bar_dtype()
+        path = self._path(symbol)
+        if not os.path.exists(path) or os.path.getsize(path) < dtype.itemsize:
+            return np.empty(0, dtype=dtype)
+        # Whole records only, in case another process is mid-append.
+        bars = np.memmap(path, dtype=dtype, mode='r', shape=(os.path.getsize(path) // dtype.itemsize,))
+        dates = bars['date']
+        lo = 0 if start is None else np.searchsorted(dates, np.datetime64(start, 'D'), side='left')
+        hi = len(bars) if end is None else np.searchsorted(dates, np.datetime64(end, 'D'), side='right')
+        return bars[lo:hi]
+
+    def last_date(self, symbol):
+        import numpy as np
+
+        dtype = bar_dtype()
+        path = self._path(symbol)
+        if not os.path.exists(path) or os.path.getsize(path) < dtype.itemsize:
+            return None
+        with open(path, 'rb') as f:
+            f.seek(os.path.getsize(path) // dtype.itemsize * dtype.itemsize - dtype.itemsize)
+            return np.frombuffer(f.read(dtype.itemsize), dtype=dtype)['date'][0]
+
+    def _period(self, period):
+        return max(period or self.backfill_period, self.backfill_period, key=PERIOD_BARS.get)
+
+    def _plan(self, symbol, period, today):
+        """What ``refresh`` has to do: ('backfill' | 'append' | None, [periods it will fetch])."""
+        import numpy as np
+
+        bars = self.bars(symbol)
+        # Business days covered, counting today's (unstored) bar.
+        covered = np.busday_count(bars['date'][0], today) + 1 if len(bars) else 0
+        if covered < PERIOD_BARS[period] and self._depth.get(symbol, 0) < PERIOD_BARS[period]:
+            newer = [_period_for(np.busday_count(bars['date'][-1], today) + 1)] if len(bars) else []
+            return 'backfill', [period] + newer
+        if self._checked.get(symbol) != today:
+            gap = np.busday_count(bars['date'][-1], today) if len(bars) else PERIOD_BARS[period]
+            if gap > 1:
+                return 'append', [_period_for(gap + 1)]
+        return None, []
+
+    def refresh(self, symbol, period=None):
+        """Make sure completed bars up to yesterday, and at least ``period`` of history, are stored."""
+        period = self._period(period)
+        today = _today()
+        # The thread lock serialises this process; the file lock other
+        # workers. Coverage and the last date are read while holding both.
+        with self._locks[symbol], self._file_lock(symbol):
+            action, periods = self._plan(symbol, period, today)
+            if action == 'backfill':
+                self._backfill(symbol, period)
+            elif action == 'append':
+                self._append(symbol, market_data.history(symbol, period=periods[0]))
+            self._checked[symbol] = today
+
+    def _records(self, frame):
+        import numpy as np
+
+        frame = frame.dropna(subset=['Close'])
+        index = _naive(frame.index)
+        records = np.empty(len(frame), dtype=bar_dtype())
+        records['date'] = index.values.astype('datetime64[D]')
+        for column in OHLCV_COLUMNS:
+            records[column.lower()] = frame[column].to_numpy(dtype='f8')
+        return records[records['date'] < _today()]
+
+    def _append(self, symbol, frame):
+        records = self._records(frame)
+        last = self.last_date(symbol)
+        if last is not None:
+            records = records[records['date'] > last]
+        if len(records):
+            os.makedirs(self.root, exist_ok=True)
+            with open(self._path(symbol), 'ab') as f:
+                f.write(records.tobytes())
+
+    def _backfill(self, symbol, period):
+        import numpy as np
+
+        fetched = self._records(market_data.history(symbol, period=period))
+        existing = np.array(self.bars(symbol))
+        if len(existing):
+            fetched = fetched[fetched['date'] < existing['date'][0]]
+            newer = self._records(market_data.history(symbol, period=_period_for(
+                np.busday_count(existing['date'][-1], _today()) + 1)))
+            merged = np.concatenate([fetched, existing, newer[newer['date'] > existing['date'][-1]]])
+        else:
+            merged = fetched
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self._path(symbol) + '.tmp'
+        merged.tofile(tmp_path)
+        os.replace(tmp_path, self._path(symbol))
+        self._depth[symbol] = PERIOD_BARS[period]
+
+    def history(self, symbol, period='1y'):
+        """OHLCV DataFrame for the last ``period`` of bars, including today's partial bar."""
+        import pandas as pd
+
+        self.refresh(symbol, period)
+        bars = self.bars(symbol)[-PERIOD_BARS[period]:]
+        frame = pd.DataFrame(
+            {column: bars[column.lower()] for column in OHLCV_COLUMNS},
+            index=pd.DatetimeIndex(bars['date'].astype('datetime64[ns]'), name='Date')
+        )
+        live = market_data.history(symbol, period='1d')
+        if not live.empty:
+            live = live.set_axis(_naive(live.index).normalize())[OHLCV_COLUMNS]
+            if len(frame):
+                live = live[live.index > frame.index[-1]]
+            frame = pd.concat([frame, live]) if len(frame) else live
+        return frame.iloc[-PERIOD_BARS[period]:]
+
+    def closes(self, symbols, period='1y'):
+        """Dates x symbols close matrix for the given symbols."""
+        import pandas as pd
+
+        # Anything that is not a ticker cannot have bars; it is reported missing.
+        symbols = [symbol for symbol in symbols if SYMBOL_PATTERN.fullmatch(symbol)]
+        # Warm the market-data cache with one batched fetch per period the
+        # refreshes will need (backfills, stale gaps, today's bar), so the
+        # per-symbol reads below do not each go to the provider.
+        today = _today()
+        fetches = defaultdict(list, {'1d': list(symbols)})
+        for symbol in symbols:
+            for fetch_period in self._plan(symbol, self._period(period), today)[1]:
+                fetches[fetch_period].append(symbol)
+        for fetch_period, group in fetches.items():
+            market_data.closes(group, period=fetch_period)
+        frames = {symbol: self.history(symbol, period)['Close'] for symbol in symbols}
+        frames = {symbol: closes for symbol, closes in frames.items() if not closes.empty}
+        return pd.DataFrame(frames) if frames else pd.DataFrame()
+
+
+bar_store = BarStore()
@@ -0,0 +1,55 @@
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+DEFAULT_DATABASE_URL = 'sqlite:///robinhood_dashboard.db'
+
+
+def database_url(url=None):
+    """Normalise DATABASE_URL; ``postgres://`` (Heroku and friends) is not accepted by SQLAlchemy."""
+    url = url or os.getenv('DATABASE_URL') or DEFAULT_DATABASE_URL
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(url, config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured backend."""
+    if make_url(url).get_backend_name() == 'sqlite':
+        # pysqlite's own timeout is applied before our PRAGMA runs on new connections.
+        return {'connect_args': {'timeout': config['SQLITE_BUSY_TIMEOUT'] / 1000, 'check_same_thread': False}}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': True,
+    }
+
+
+def sqlite_pragmas(journal_mode='WAL', busy_timeout=5000, synchronous='NORMAL'):
+    """Connect listener for SQLite.
+
+    WAL lets readers run alongside the single writer, and busy_timeout makes a
+    blocked writer wait instead of failing with "database is locked".
+    synchronous=NORMAL is durable across application crashes in WAL mode.
+    """
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA journal_mode={journal_mode}')
+        cursor.execute(f'PRAGMA busy_timeout={int(busy_timeout)}')
+        cursor.execute(f'PRAGMA synchronous={synchronous}')
+        cursor.close()
+    return on_connect
+
+
+def init_app(app, db):
+    """Attach the SQLite PRAGMAs to the app's engine; a no-op for other backends."""
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', sqlite_pragmas(
+            app.config['SQLITE_JOURNAL_MODE'],
+            app.config['SQLITE_BUSY_TIMEOUT'],
+            app.config['SQLITE_SYNCHRONOUS'],
+        ))
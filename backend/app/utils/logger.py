@@ -1,22 +1,201 @@
+import atexit
+import json
 import logging
-import logging_loki
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from collections import Counter, defaultdict
+import requests
+from .metrics import record_log
+
+
+class LogStats(Counter):
+    """Record counts by outcome, shared by the logging threads and exported to Prometheus.
+
+    Update through ``add``: ``+=`` on a Counter is not atomic across threads.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def add(self, result, count=1):
+        with self._lock:
+            self[result] += count
+        record_log(result, count)
+
+
+class LokiShipper(threading.Thread):
+    """Drains the log queue and pushes records to Loki in batches.
+
+    A batch is sent when it reaches ``batch_size`` records or ``flush_interval``
+    seconds after its first record. Batches that cannot be delivered are
+    appended to ``spool_path`` (if set) and replayed after the next successful
+    push; otherwise they are dropped and counted.
+    """
+
+    def __init__(self, log_queue, url, tags, stats, batch_size=100, flush_interval=1.0,
+                 spool_path=None, timeout=2.0):
+        super().__init__(name='loki-shipper', daemon=True)
+        self.queue = log_queue
+        self.url = url
+        self.tags = tags
+        self.stats = stats
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.formatter = logging.Formatter()
+        self._stopping = threading.Event()
+
+    def run(self):
+        batch, deadline = [], None
+        while not (self._stopping.is_set() and self.queue.empty()):
+            timeout = self.flush_interval if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                record = self.queue.get(timeout=timeout)
+                batch.append(record)
+                deadline = deadline or time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self.ship(batch)
+                batch, deadline = [], None
+        if batch:
+            self.ship(batch)
+
+    def stop(self, timeout=5.0):
+        self._stopping.set()
+        self.join(timeout)
+
+    def entries(self, records):
+        return [(
+            record.levelname.lower(),
+            str(int(record.created * 1e9)),
+            self.formatter.format(record),
+        ) for record in records]
+
+    def ship(self, records):
+        entries = self.entries(records)
+        if self.push(entries):
+            self.stats.add('shipped', len(entries))
+            self.replay_spool()
+        elif self.spool_path:
+            with open(self.spool_path, 'a') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + '\n')
+            self.stats.add('spooled', len(entries))
+        else:
+            self.stats.add('failed', len(entries))
+
+    def push(self, entries):
+        streams = defaultdict(list)
+        for level, timestamp, line in entries:
+            streams[level].append([timestamp, line])
+        payload = {'streams': [
+            {'stream': dict(self.tags, level=level), 'values': values}
+            for level, values in streams.items()
+        ]}
+        try:
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+            return response.status_code < 300
+        except requests.RequestException:
+            return False
+
+    def replay_spool(self):
+        if not self.spool_path or not os.path.exists(self.spool_path):
+            return
+        replaying = f'{self.spool_path}.replay'
+        os.replace(self.spool_path, replaying)
+        with open(replaying) as f:
+            entries = [tuple(json.loads(line)) for line in f]
+        for i in range(0, len(entries), self.batch_size):
+            chunk = entries[i:i + self.batch_size]
+            if not self.push(chunk):
+                with open(self.spool_path, 'a') as f:
+                    for entry in entries[i:]:
+                        f.write(json.dumps(entry) + '\n')
+                break
+            self.stats.add('shipped', len(chunk))
+            self.stats.add('spooled', -len(chunk))
+        os.remove(replaying)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller: records are dropped when the queue is full."""
+
+    def __init__(self, log_queue, stats, start):
+        super().__init__(log_queue)
+        self.stats = stats
+        self.start = start
+
+    def prepare(self, record):
+        # The shipper formats the message itself; resolve args now so it is thread safe.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        self.start()
+        try:
+            self.queue.put_nowait(record)
+            self.stats.add('enqueued')
+        except queue.Full:
+            self.stats.add('dropped')
+
 
 class LokiLogger:
     def __init__(self):
-        logging_loki.emitter.LokiEmitter.level_tag = "level"
-        handler = logging_loki.LokiHandler(
-            url="http://localhost:3100/loki/api/v1/push",
-            tags={"application": "robinhood-dashboard"},
-            version="1",
-        )
+        self.stats = LogStats()
+        self.queue = queue.Queue(maxsize=int(os.getenv('LOKI_QUEUE_SIZE', 10000)))
+        self.shipper = None
+        self._lock = threading.Lock()
         self.logger = logging.getLogger("loki-logger")
-        self.logger.addHandler(handler)
+        self.logger.addHandler(NonBlockingQueueHandler(self.queue, self.stats, self._start))
         self.logger.setLevel(logging.INFO)
 
-    def info(self, message):
-        self.logger.info(message)
+    def _start(self):
+        if self.shipper is not None:
+            return
+        with self._lock:
+            if self.shipper is None:
+                self.shipper = LokiShipper(
+                    self.queue,
+                    url=os.getenv('LOKI_URL', 'http://localhost:3100/loki/api/v1/push'),
+                    tags={"application": "robinhood-dashboard"},
+                    stats=self.stats,
+                    batch_size=int(os.getenv('LOKI_BATCH_SIZE', 100)),
+                    flush_interval=float(os.getenv('LOKI_FLUSH_INTERVAL', 1.0)),
+                    spool_path=os.getenv('LOKI_SPOOL_PATH'),
+                )
+                self.shipper.start()
+                atexit.register(self.shipper.stop)
+
+    def debug(self, message, *args, **kwargs):
+        self.logger.debug(message, *args, **kwargs)
+
+    def info(self, message, *args, **kwargs):
+        self.logger.info(message, *args, **kwargs)
+
+    def warning(self, message, *args, **kwargs):
+        self.logger.warning(message, *args, **kwargs)
+
+    def error(self, message, *args, **kwargs):
+        self.logger.error(message, *args, **kwargs)
+
+    def exception(self, message, *args, **kwargs):
+        self.logger.exception(message, *args, **kwargs)
+
+    def critical(self, message, *args, **kwargs):
+        self.logger.critical(message, *args, **kwargs)
 
-    def error(self, message):
-        self.logger.error(message)
+    def log(self, level, message, *args, **kwargs):
+        self.logger.log(level, message, *args, **kwargs)
 
 loki_logger = LokiLogger()
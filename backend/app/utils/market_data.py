@@ -0,0 +1,221 @@
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from .metrics import MARKET_DATA_FETCH_SECONDS, record_cache
+
+# pandas, numpy and yfinance are imported where they are used so that
+# importing the app (workers, CLI commands, tests) does not pay for them.
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+PERIOD_BARS = {
+    '1d': 1, '5d': 5, '1mo': 21, '3mo': 63, '6mo': 126,
+    '1y': 252, '2y': 504, '5y': 1260, '10y': 2520, 'ytd': 252, 'max': 2520,
+}
+
+# Tickers as the provider spells them: BRK.B, BF-B, ^GSPC, EURUSD=X. Symbols
+# become bar store file names, so nothing else (no '/') is accepted.
+SYMBOL_PATTERN = re.compile(r'\^?[A-Z0-9][A-Z0-9.=-]{0,9}')
+
+
+def parse_symbol(value):
+    """Upper-cased ticker from request data; raises ValueError for anything else."""
+    symbol = str(value or '').strip().upper()
+    if not SYMBOL_PATTERN.fullmatch(symbol):
+        raise ValueError(f'Invalid symbol: {str(value)[:20]!r}')
+    return symbol
+
+
+class MarketDataProvider:
+    """Fetches daily OHLCV bars; returns {symbol: DataFrame} for the symbols it found."""
+
+    def fetch(self, symbols, period):
+        raise NotImplementedError
+
+
+class YFinanceProvider(MarketDataProvider):
+    def fetch(self, symbols, period):
+        import pandas as pd
+        import yfinance as yf
+
+        data = yf.download(symbols, period=period, group_by='ticker', progress=False)
+        frames = {}
+        for symbol in symbols:
+            if isinstance(data.columns, pd.MultiIndex):
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                frame = data[symbol]
+            else:
+                frame = data
+            frame = frame.dropna(how='all')
+            if not frame.empty:
+                frames[symbol] = frame[[c for c in OHLCV_COLUMNS if c in frame.columns]]
+        return frames
+
+
+class SyntheticProvider(MarketDataProvider):
+    """Deterministic random-walk bars seeded by symbol, for tests and benchmarks."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def fetch(self, symbols, period):
+        import pandas as pd
+
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        bars = PERIOD_BARS.get(period, 252)
+        index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=bars, name='Date')
+        return {symbol: self._frame(symbol, index) for symbol in symbols}
+
+    def _frame(self, symbol, index):
+        import numpy as np
+        import pandas as pd
+
+        # Always walk the full 'max' history so shorter periods are its tail.
+        seed = zlib.crc32(symbol.encode())
+        rng = np.random.default_rng(seed)
+        full = PERIOD_BARS['max']
+        close = (20 + seed % 480) * np.exp(np.cumsum(rng.normal(0.0003, 0.015, full)))
+        spread = np.abs(rng.normal(0, 0.01, full)) * close
+        volume = rng.integers(1_000_000, 10_000_000, full).astype(float)
+        n = len(index)
+        return pd.DataFrame({
+            'Open': (close - spread / 2)[-n:],
+            'High': (close + spread)[-n:],
+            'Low': (close - spread)[-n:],
+            'Close': close[-n:],
+            'Volume': volume[-n:],
+        }, index=index)
+
+
+class _Pending:
+    def __init__(self):
+        self.event = threading.Event()
+        self.frame = None
+        self.error = None
+
+
+class MarketDataService:
+    """TTL + LRU cache in front of a MarketDataProvider, keyed by (symbol, period).
+
+    Concurrent misses for the same key wait on a single in-flight fetch, and the
+    misses of one call are fetched from the provider as one batch.
+    """
+
+    def __init__(self, provider=None, ttl=60, max_entries=1024, period_ttls=None):
+        self.provider = provider or YFinanceProvider()
+        self.ttl = ttl
+        self.period_ttls = period_ttls or {}
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('MARKET_DATA_TTL', self.ttl)
+        self.max_entries = app.config.get('MARKET_DATA_CACHE_SIZE', self.max_entries)
+        self.period_ttls = app.config.get('MARKET_DATA_PERIOD_TTLS', self.period_ttls)
+
+    def set_provider(self, provider):
+        with self._lock:
+            self.provider = provider
+            self._cache.clear()
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def history(self, symbol, period='1y'):
+        """Return the OHLCV DataFrame for one symbol (empty if the provider has none)."""
+        import pandas as pd
+
+        frame = self._get([symbol], period).get(symbol)
+        return frame if frame is not None else pd.DataFrame(columns=OHLCV_COLUMNS)
+
+    def closes(self, symbols, period='1y'):
+        """Return a dates x symbols DataFrame of closing prices."""
+        import pandas as pd
+
+        frames = self._get(list(symbols), period)
+        if not frames:
+            return pd.DataFrame()
+        return pd.DataFrame({symbol: frame['Close'] for symbol, frame in frames.items()})
+
+    def latest_prices(self, symbols, period='1d'):
+        """Return {symbol: last close} for the symbols the provider knows about."""
+        frames = self._get(list(symbols), period)
+        return {
+            symbol: float(frame['Close'].iloc[-1])
+            for symbol, frame in frames.items() if not frame.empty
+        }
+
+    def bar_dates(self, symbols, period='1d'):
+        """Return {symbol: date of the latest bar}, i.e. the session the last close belongs to."""
+        frames = self._get(list(symbols), period)
+        return {symbol: frame.index[-1].date() for symbol, frame in frames.items() if not frame.empty}
+
+    def _get(self, symbols, period):
+        now = time.monotonic()
+        found, waiting, owned = {}, {}, []
+        hits = 0
+        with self._lock:
+            for symbol in dict.fromkeys(symbols):
+                key = (symbol, period)
+                entry = self._cache.get(key)
+                if entry is not None and entry[0] > now:
+                    self._cache.move_to_end(key)
+                    hits += 1
+                    found[symbol] = entry[1]
+                    continue
+                if key in self._pending:
+                    waiting[symbol] = self._pending[key]
+                else:
+                    waiting[symbol] = self._pending[key] = _Pending()
+                    owned.append(symbol)
+            self.hits += hits
+            self.misses += len(waiting)
+        record_cache(hits, len(waiting))
+
+        if owned:
+            self._fetch(owned, period)
+
+        for symbol, pending in waiting.items():
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            if pending.frame is not None:
+                found[symbol] = pending.frame
+        return found
+
+    def _fetch(self, symbols, period):
+        try:
+            with MARKET_DATA_FETCH_SECONDS.labels(period).time():
+                frames = self.provider.fetch(symbols, period)
+            error = None
+        except Exception as e:
+            frames, error = {}, e
+
+        expires = time.monotonic() + self.period_ttls.get(period, self.ttl)
+        with self._lock:
+            for symbol in symbols:
+                key = (symbol, period)
+                pending = self._pending.pop(key)
+                pending.frame = frames.get(symbol)
+                pending.error = error
+                if pending.frame is not None:
+                    self._cache[key] = (expires, pending.frame)
+                    self._cache.move_to_end(key)
+                pending.event.set()
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+
+market_data = MarketDataService()
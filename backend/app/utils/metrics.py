@@ -0,0 +1,173 @@
+import cProfile
+import functools
+import os
+import random
+import time
+from flask import Response, g, has_request_context, request
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+registry = CollectorRegistry()
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency',
+    ['blueprint', 'endpoint', 'method', 'status'], registry=registry
+)
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries', 'SQL statements issued per request',
+    ['blueprint', 'endpoint'], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, float('inf')), registry=registry
+)
+REQUEST_DB_SECONDS = Histogram(
+    'http_request_db_seconds', 'Time spent in SQL statements per request',
+    ['blueprint', 'endpoint'], registry=registry
+)
+MARKET_DATA_FETCH_SECONDS = Histogram(
+    'market_data_fetch_seconds', 'Market-data provider fetch latency', ['period'], registry=registry
+)
+MARKET_DATA_CACHE = Counter(
+    'market_data_cache_requests', 'Market-data cache lookups per symbol', ['result'], registry=registry
+)
+MARKET_DATA_HIT_RATIO = Gauge(
+    'market_data_cache_hit_ratio', 'Market-data cache hits / lookups since start', registry=registry
+)
+JOB_SECONDS = Histogram(
+    'scheduler_job_duration_seconds', 'Background job duration', ['job'], registry=registry
+)
+SOCKET_EMITS = Counter(
+    'socketio_emits', 'Socket.IO messages emitted', ['event'], registry=registry
+)
+SOCKET_EMIT_ITEMS = Counter(
+    'socketio_emit_items', 'Entries (e.g. prices) carried by Socket.IO messages', ['event'], registry=registry
+)
+RESPONSE_CACHE = Counter(
+    'response_cache_requests', 'Response cache lookups and 304s', ['endpoint', 'result'], registry=registry
+)
+LOG_RECORDS = Counter(
+    'loki_log_records', 'Log records by outcome (enqueued, dropped, shipped, failed)', ['result'], registry=registry
+)
+LOG_SPOOLED = Gauge(
+    'loki_log_spooled_records', 'Log records waiting in the spool file for a replay', registry=registry
+)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+_cache_lookups = {'hit': 0, 'miss': 0}
+
+
+def _hit_ratio():
+    total = _cache_lookups['hit'] + _cache_lookups['miss']
+    return _cache_lookups['hit'] / total if total else 0.0
+
+
+MARKET_DATA_HIT_RATIO.set_function(_hit_ratio)
+
+
+def record_cache(hits, misses):
+    for result, count in (('hit', hits), ('miss', misses)):
+        if count:
+            _cache_lookups[result] += count
+            MARKET_DATA_CACHE.labels(result).inc(count)
+
+
+def record_emit(event_name, items=1):
+    SOCKET_EMITS.labels(event_name).inc()
+    SOCKET_EMIT_ITEMS.labels(event_name).inc(items)
+
+
+def record_response_cache(result):
+    RESPONSE_CACHE.labels(request.endpoint or 'unknown', result).inc()
+
+
+def record_log(result, count):
+    if result == 'spooled':
+        LOG_SPOOLED.inc(count)  # replays pass a negative count
+    else:
+        LOG_RECORDS.labels(result).inc(count)
+
+
+def query_budget(limit):
+    """Override QUERY_BUDGET for one view; ``None`` disables the check."""
+    def decorator(f):
+        f.query_budget = limit
+        return f
+    return decorator
+
+
+def timed_job(name):
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            with JOB_SECONDS.labels(name).time():
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    if has_request_context() and 'db_queries' in g:
+        g.db_queries += 1
+        g.db_seconds += elapsed
+        budget = g.get('query_budget')
+        if budget is not None and g.db_queries > budget:
+            raise QueryBudgetExceeded(
+                f'{request.endpoint} issued more than {budget} SQL statements; last: {statement}'
+            )
+
+
+def _labels():
+    return request.blueprint or '', request.endpoint or 'unknown'
+
+
+def init_app(app):
+    sample_rate = app.config.get('PROFILE_SAMPLE_RATE', 0.0)
+    profiling = app.config.get('PROFILING_ENABLED', False)
+    profile_dir = app.config.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles')
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_start = time.perf_counter()
+        g.db_queries = 0
+        g.db_seconds = 0.0
+        # The query budget is only enforced in debug and test runs, where an
+        # N+1 regression should fail loudly.
+        if app.debug or app.testing:
+            view = app.view_functions.get(request.endpoint)
+            g.query_budget = getattr(view, 'query_budget', app.config.get('QUERY_BUDGET'))
+        if profiling and (request.headers.get('X-Profile') or random.random() < sample_rate):
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def record_request_metrics(response):
+        if 'request_start' not in g:
+            return response
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            path = os.path.join(profile_dir, f"{request.endpoint or 'unknown'}-{int(time.time() * 1000)}.prof")
+            profiler.dump_stats(path)
+            response.headers['X-Profile-File'] = os.path.basename(path)
+
+        blueprint, endpoint = _labels()
+        REQUEST_LATENCY.labels(blueprint, endpoint, request.method, response.status_code).observe(
+            time.perf_counter() - g.request_start
+        )
+        REQUEST_DB_QUERIES.labels(blueprint, endpoint).observe(g.db_queries)
+        REQUEST_DB_SECONDS.labels(blueprint, endpoint).observe(g.db_seconds)
+        return response
+
+    @app.route('/api/metrics')
+    def metrics():
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
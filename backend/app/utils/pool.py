@@ -0,0 +1,16 @@
+import threading
+
+_pools = {}
+_lock = threading.Lock()
+
+
+def shared_pool(name, factory):
+    """The process-wide executor registered as ``name``, created by ``factory()`` on first use.
+
+    Executors live until interpreter exit, where concurrent.futures joins them.
+    """
+    with _lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = factory()
+        return pool
@@ -0,0 +1,104 @@
+import functools
+import gzip
+import hashlib
+from flask import current_app, request
+from .metrics import record_response_cache
+from .ttl_cache import ScopedCache
+
+ENCODINGS = ('br', 'gzip')
+
+
+@functools.cache
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def compress(body, encoding):
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    return _brotli().compress(body, quality=5)
+
+
+class CachedResponse:
+    """A rendered JSON body with its ETag and lazily built compressed variants."""
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.body = current_app.json.dumps(payload).encode()
+        self.etag = hashlib.blake2b(self.body, digest_size=16).hexdigest()
+        self.variants = {}
+
+    def encoded(self, encoding):
+        if encoding not in self.variants:
+            self.variants[encoding] = compress(self.body, encoding)
+        return self.variants[encoding]
+
+
+class ResponseCache(ScopedCache):
+    """Per-process cache of JSON responses, keyed by scope (a user id, or 'admin') and request path.
+
+    Responses carry a weak ETag so polling clients get a 304 while the data is
+    unchanged, and bodies of at least ``min_size`` bytes are sent gzip- or
+    brotli-compressed. Callers pass a ``version`` read from the database (see
+    models.version, e.g. the user's trade counter); an entry is only served
+    while it matches, so writes made through other processes show up on the
+    next request. Entries also expire after ``ttl`` seconds so price changes
+    show up.
+    """
+
+    def __init__(self, ttl=30, min_size=1024, max_scopes=1000, max_entries=32):
+        super().__init__(ttl, max_scopes, max_entries)
+        self.min_size = min_size
+
+    def init_app(self, app):
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', self.ttl)
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', self.min_size)
+        self.clear()
+
+    def get(self, scope, compute, key=None, version=None):
+        """The cached response for ``scope`` and the current request path, calling ``compute()`` on a miss.
+
+        An entry cached under a different ``version`` is a miss.
+        """
+        key = key or request.full_path
+        entry = self.lookup(scope, key, version)
+        if entry is not None:
+            record_response_cache('hit')
+            return entry
+        record_response_cache('miss')
+        return self.store(scope, key, CachedResponse(compute()), version)
+
+    def respond(self, entry):
+        """A 304 if the client already has this ETag, otherwise the (compressed) body."""
+        response = current_app.response_class(mimetype='application/json')
+        response.set_etag(entry.etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.vary.add('Accept-Encoding')
+        if request.if_none_match.contains_weak(entry.etag):
+            record_response_cache('not_modified')
+            response.status_code = 304
+            return response
+
+        encoding = self.encoding(len(entry.body))
+        if encoding:
+            response.set_data(entry.encoded(encoding))
+            response.content_encoding = encoding
+        else:
+            response.set_data(entry.body)
+        return response
+
+    def encoding(self, size):
+        if size < self.min_size:
+            return None
+        accepted = request.accept_encodings
+        for encoding in ENCODINGS:
+            if accepted[encoding] and (encoding != 'br' or _brotli()):
+                return encoding
+        return None
+
+
+response_cache = ResponseCache()
@@ -1,17 +1,205 @@
-import yfinance as yf
-from flask_socketio import emit
-
-def update_stock_prices(symbols):
-    from .. import socketio  # Import here to avoid circular dependency
-    data = yf.download(symbols, period="1d")
-    latest_prices = data['Close'].iloc[-1].to_dict()
-    socketio.emit('stock_update', latest_prices)
-
-def schedule_stock_updates(symbols, interval=60):
-    from .. import scheduler  # Import here to avoid circular dependency
-    scheduler.add_job(
-        update_stock_prices,
-        'interval',
-        seconds=interval,
-        args=[symbols]
-    )
\ No newline at end of file
+import threading
+from collections import Counter
+from ..extensions import scheduler, socketio
+from .alerts import alert_engine, watch_indicator
+from .market_data import market_data
+from .logger import loki_logger
+from .metrics import record_emit, timed_job
+from ..strategies.incremental import live_signals
+
+JOB_ID = 'stock-updates'
+LIVE_SIGNALS_ROOM = 'live-signals'
+ALERTS_ROOM = 'alerts'
+
+_scheduler_lock = threading.Lock()
+_warned_disabled = threading.Event()
+
+
+def user_room(user_id):
+    return f'user:{user_id}'
+
+
+def symbol_room(symbol):
+    return f'symbol:{symbol}'
+
+
+class PriceStream:
+    """Reference-counted symbol subscriptions grouped by Socket.IO room.
+
+    Each tick fetches the union of subscribed symbols in one batch. Only prices
+    that moved by at least ``min_tick`` since they were last published are sent,
+    as a ``stock_delta`` per room with a per-room sequence number; clients that
+    see a gap ask for a ``stock_snapshot``.
+    """
+
+    def __init__(self, min_tick=0.01):
+        self.min_tick = min_tick
+        self.rooms = {}
+        self.refcounts = Counter()
+        self.sids = {}
+        self.published = {}
+        self.seqs = Counter()
+        self.unsent = {}
+        self.silent = set()
+        self.run_scheduler = True
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.min_tick = app.config.get('PRICE_STREAM_MIN_TICK', self.min_tick)
+        self.run_scheduler = app.config.get('SCHEDULER_ENABLED', self.run_scheduler)
+
+    def subscribe(self, room, symbols, emit=True):
+        """Set a room's symbols; rooms with ``emit=False`` are fetched but never sent."""
+        with self._lock:
+            if not emit:
+                self.silent.add(room)
+            self._set(room, frozenset(symbols))
+
+    def _set(self, room, symbols):
+        previous = self.rooms.get(room, frozenset())
+        if symbols == previous:
+            return
+        self.refcounts.subtract(previous)
+        self.refcounts.update(symbols)
+        self.refcounts += Counter()  # drop symbols no room references any more
+        if symbols:
+            self.rooms[room] = symbols
+            # Newly added symbols may already be published and unchanged;
+            # send them to this room on the next tick regardless.
+            self.unsent[room] = (self.unsent.get(room, frozenset()) | (symbols - previous)) & symbols
+        else:
+            self.rooms.pop(room, None)
+            self.unsent.pop(room, None)
+            self.seqs.pop(room, None)
+            self.silent.discard(room)
+
+    def update_joined(self, room, symbols):
+        """Change the symbols of a room that some socket has joined; False (and no-op) otherwise."""
+        with self._lock:
+            if not any(room in joined for joined in self.sids.values()):
+                return False
+            self._set(room, frozenset(symbols))
+            return True
+
+    def unsubscribe(self, room):
+        self.subscribe(room, ())
+
+    def connect(self, sid, room):
+        with self._lock:
+            self.sids.setdefault(sid, set()).add(room)
+
+    def leave(self, sid, room):
+        # Unsubscribe under the same lock as the check, so a socket that
+        # joins the room meanwhile (a page reload) keeps its subscription.
+        with self._lock:
+            self.sids.get(sid, set()).discard(room)
+            if not any(room in joined for joined in self.sids.values()):
+                self._set(room, frozenset())
+
+    def disconnect(self, sid):
+        with self._lock:
+            rooms = list(self.sids.get(sid, ()))
+        for room in rooms:
+            self.leave(sid, room)
+        with self._lock:
+            self.sids.pop(sid, None)
+
+    def joined(self, sid, room):
+        with self._lock:
+            return room in self.sids.get(sid, ())
+
+    def symbols(self):
+        with self._lock:
+            return sorted(self.refcounts)
+
+    def snapshot(self, room):
+        with self._lock:
+            symbols = self.rooms.get(room, frozenset())
+            return {
+                'room': room,
+                'seq': self.seqs[room],
+                'prices': {s: self.published[s] for s in symbols if s in self.published},
+            }
+
+    def tick(self, emit):
+        symbols = self.symbols()
+        if not symbols:
+            return {}
+        prices = market_data.latest_prices(symbols)
+
+        messages = []
+        with self._lock:
+            changed = {}
+            for symbol, price in prices.items():
+                last = self.published.get(symbol)
+                if last is None or abs(price - last) >= self.min_tick:
+                    changed[symbol] = self.published[symbol] = price
+            for room, room_symbols in self.rooms.items():
+                if room in self.silent:
+                    continue
+                unsent = self.unsent.pop(room, frozenset())
+                payload = {
+                    s: self.published[s] for s in room_symbols
+                    if s in changed or (s in unsent and s in self.published)
+                }
+                if payload:
+                    self.seqs[room] += 1
+                    messages.append((room, {'room': room, 'seq': self.seqs[room], 'prices': payload}))
+
+        for room, message in messages:
+            emit('stock_delta', message, to=room)
+            record_emit('stock_delta', len(message['prices']))
+        return prices
+
+
+price_stream = PriceStream()
+
+
+def watch_alerts():
+    """Subscribe the stream to everything active alerts need: their symbols and any indicators."""
+    for symbol in alert_engine.symbols('rsi'):
+        watch_indicator(symbol, 'rsi')
+    price_stream.subscribe(LIVE_SIGNALS_ROOM, live_signals.symbols(), emit=False)
+    price_stream.subscribe(ALERTS_ROOM, alert_engine.symbols(), emit=False)
+
+
+@timed_job(JOB_ID)
+def update_stock_prices():
+    # Alerts can be created, deleted or fired by any worker (and outlive the
+    # process), so each tick checks the database's active set before use.
+    with alert_engine.app.app_context():
+        if alert_engine.refresh():
+            watch_alerts()
+    prices = price_stream.tick(socketio.emit)
+    live_signals.on_prices(prices, market_data.bar_dates(prices))
+    if live_signals.evict(keep={(symbol, 'rsi') for symbol in alert_engine.symbols('rsi')}):
+        price_stream.subscribe(LIVE_SIGNALS_ROOM, live_signals.symbols(), emit=False)
+    if live_signals.checkpoint_path:
+        live_signals.save()
+    if alert_engine.notify(alert_engine.on_prices(prices, {'rsi': live_signals.values('rsi', 'rsi')})):
+        price_stream.subscribe(ALERTS_ROOM, alert_engine.symbols(), emit=False)
+
+
+def schedule_stock_updates(room, symbols, interval=60, emit=True):
+    price_stream.subscribe(room, symbols, emit=emit)
+    if scheduler.get_job(JOB_ID) is None:
+        scheduler.add_job(
+            update_stock_prices,
+            'interval',
+            seconds=interval,
+            id=JOB_ID,
+            replace_existing=True
+        )
+    # Rooms, live signals and socket connections are per process, so every
+    # process that serves Socket.IO clients runs its own price stream; the
+    # scheduler starts with the first subscription. SCHEDULER_ENABLED=False
+    # is only for processes without clients (CLI, scripts, tests).
+    if not price_stream.run_scheduler:
+        if not _warned_disabled.is_set():
+            _warned_disabled.set()
+            loki_logger.warning('Price subscriptions made with SCHEDULER_ENABLED=False are never fetched')
+        return
+    if not scheduler.running:
+        with _scheduler_lock:
+            if not scheduler.running:
+                scheduler.start()
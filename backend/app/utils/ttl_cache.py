@@ -0,0 +1,51 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ScopedCache:
+    """Per-process TTL cache of values keyed by scope (a user id, 'admin') and key.
+
+    Scopes beyond ``max_scopes`` and keys within a scope beyond
+    ``max_entries`` are evicted least recently used. A value stored with a
+    ``version`` (see models.version) is only returned while the caller asks
+    for the same version, so writes made by other processes are not served
+    stale; ``invalidate`` frees a scope early in the writing process.
+    """
+
+    def __init__(self, ttl, max_scopes=1000, max_entries=32):
+        self.ttl = ttl
+        self.max_scopes = max_scopes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, scope, key=None, version=None):
+        """The live value for (scope, key) at ``version``, or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(scope, {}).get(key)
+            if entry is None or entry[0] <= now or entry[1] != version:
+                return None
+            self._entries.move_to_end(scope)
+            return entry[2]
+
+    def store(self, scope, key, value, version=None):
+        with self._lock:
+            entries = self._entries.setdefault(scope, OrderedDict())
+            entries[key] = (time.monotonic() + self.ttl, version, value)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            self._entries.move_to_end(scope)
+            while len(self._entries) > self.max_scopes:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, scope):
+        with self._lock:
+            self._entries.pop(scope, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
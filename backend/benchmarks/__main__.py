@@ -0,0 +1,112 @@
+"""Run the benchmark suite and write every result to one JSON file.
+
+    python -m benchmarks --output bench-$(git rev-parse --short HEAD).json
+    python -m benchmarks --only api_latency strategies --compare bench-previous.json
+    python -m benchmarks --scale large    # 10k users, 10M trades, 1000 sockets
+
+Each benchmark runs in its own interpreter (python -m benchmarks.<name>) so
+caches, pools and imported modules do not leak between them. With --compare,
+numeric fields of matching result rows are printed as percentage changes.
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+
+SCALES = {
+    'small': {
+        'api_latency': ['--users', '200', '--trades', '50000', '--requests', '100'],
+        'strategies': ['--symbols', '200', '--period', '2y', '--repeat', '3'],
+        'socketio_fanout': ['--clients', '200', '--ticks', '10'],
+        'trade_writes': ['--threads', '8', '--trades', '100'],
+        'trade_import': ['--rows', '20000', '--baseline-rows', '500'],
+        'startup': ['--repeat', '3'],
+        'alerts': ['--alerts', '100000', '--ticks', '100'],
+    },
+    'large': {
+        'api_latency': ['--users', '10000', '--trades', '10000000', '--requests', '500'],
+        'strategies': ['--symbols', '500', '--period', '5y'],
+        'socketio_fanout': ['--clients', '1000', '--ticks', '20'],
+        'trade_writes': ['--threads', '16', '--trades', '500'],
+        'trade_import': ['--rows', '1000000'],
+        'startup': [],
+        'alerts': ['--alerts', '1000000', '--symbols', '2000'],
+    },
+}
+# Fields that identify a result row rather than measure it.
+KEYS = ('case', 'endpoint', 'strategy', 'mode', 'backend', 'format', 'method', 'path', 'threads', 'clients')
+
+
+def revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(name, args):
+    proc = subprocess.run([sys.executable, '-m', f'benchmarks.{name}', *args], capture_output=True, text=True)
+    if proc.returncode:
+        return {'benchmark': name, 'error': proc.stderr.strip().splitlines()[-1:], 'results': []}
+    return json.loads(proc.stdout)
+
+
+def row_key(row):
+    return tuple((key, row[key]) for key in KEYS if key in row)
+
+
+def compare(current, previous):
+    """Yield (benchmark, row key, field, old, new, change%) for numeric fields in both runs."""
+    for name, report in current['benchmarks'].items():
+        old_rows = {row_key(row): row for row in previous.get('benchmarks', {}).get(name, {}).get('results', [])}
+        for row in report.get('results', []):
+            old = old_rows.get(row_key(row))
+            if not old:
+                continue
+            for field, value in row.items():
+                before = old.get(field)
+                if field in KEYS or isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                if isinstance(before, (int, float)) and before:
+                    yield name, dict(row_key(row)), field, before, value, round((value - before) / before * 100, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', default='small', choices=sorted(SCALES))
+    parser.add_argument('--only', nargs='+', choices=sorted(SCALES['small']))
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare', help='an earlier --output file to diff against')
+    args = parser.parse_args()
+
+    report = {
+        'revision': revision(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': args.scale,
+        'benchmarks': {},
+    }
+    for name, bench_args in SCALES[args.scale].items():
+        if args.only and name not in args.only:
+            continue
+        print(f'running {name} ...', file=sys.stderr)
+        report['benchmarks'][name] = run(name, bench_args)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'wrote {args.output}', file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print(f"{previous.get('revision')} -> {report['revision']}")
+        for name, key, field, before, after, change in compare(report, previous):
+            print(f'{name:16} {json.dumps(key):40} {field:32} {before:>12} -> {after:<12} {change:+.1f}%')
+
+
+if __name__ == '__main__':
+    main()
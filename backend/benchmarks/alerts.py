@@ -0,0 +1,118 @@
+"""Alert engine cost per price tick with many active alerts.
+
+    python -m benchmarks.alerts --alerts 100000 --symbols 500 --ticks 200
+
+Alerts are spread across symbols with thresholds within +/-20% of the
+starting price; every tick moves every price by a seeded random step (0.2%
+standard deviation). The alerts live in a SQLite database and each indexed
+tick includes ``refresh()``, the version check the price-stream job runs
+before checking prices. The threshold index is compared with a linear scan
+over all alerts, which is what checking them without an index costs.
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import tempfile
+import time
+import numpy as np
+from app.extensions import db
+from app.models.alert import Alert
+from app.models.version import bump_version
+from app.utils.alerts import AlertEngine, ActiveAlert
+from .data import make_app, symbols as symbol_names
+
+
+def make_alerts(count, universe, start, rng):
+    picks = rng.integers(0, len(universe), count)
+    thresholds = start[picks] * rng.uniform(0.8, 1.2, count)
+    return [
+        ActiveAlert(i, 1 + i % 10000, universe[pick], 'price', 'above' if threshold > start[pick] else 'below',
+                    float(threshold))
+        for i, (pick, threshold) in enumerate(zip(picks, thresholds), start=1)
+    ]
+
+
+def linear_scan(alerts, previous, prices):
+    fired = []
+    for alert in alerts:
+        before, after = previous[alert.symbol], prices[alert.symbol]
+        if alert.condition == 'above' and before < alert.threshold <= after:
+            fired.append(alert)
+        elif alert.condition == 'below' and after <= alert.threshold < before:
+            fired.append(alert)
+    return fired
+
+
+def summarize(mode, latencies, fired, alerts):
+    latencies = sorted(latencies)
+    return {
+        'mode': mode,
+        'alerts': alerts,
+        'ticks': len(latencies),
+        'fired': fired,
+        'tick_mean_ms': round(statistics.fmean(latencies) * 1e3, 3),
+        'tick_p50_ms': round(latencies[len(latencies) // 2] * 1e3, 3),
+        'tick_p99_ms': round(latencies[int(len(latencies) * 0.99)] * 1e3, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--alerts', type=int, default=100000)
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--ticks', type=int, default=200)
+    parser.add_argument('--scan-ticks', type=int, default=10, help='ticks for the linear-scan baseline')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    universe = symbol_names(args.symbols)
+    start = rng.uniform(10, 500, args.symbols)
+    alerts = make_alerts(args.alerts, universe, start, rng)
+    steps = 1 + rng.normal(0, 0.002, (args.ticks + 1, args.symbols))
+    paths = start * np.cumprod(steps, axis=0)
+    ticks = [dict(zip(universe, row.tolist())) for row in paths]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(f"sqlite:///{os.path.join(tmp, 'alerts.db')}", tmp)
+        engine = AlertEngine()
+        engine.init_app(app)
+        with app.app_context():
+            db.create_all()
+            db.session.execute(Alert.__table__.insert(), [
+                dict(alert._asdict(), active=True, created_at=datetime.datetime(2024, 1, 2)) for alert in alerts
+            ])
+            bump_version('alerts')
+            db.session.commit()
+
+            start_load = time.perf_counter()
+            engine.load()
+            load_ms = (time.perf_counter() - start_load) * 1e3
+            engine.check('price', ticks[0])
+            latencies, refreshes, fired = [], [], 0
+            for prices in ticks[1:]:
+                begin = time.perf_counter()
+                engine.refresh()
+                refreshed = time.perf_counter()
+                fired += len(engine.check('price', prices))
+                latencies.append(time.perf_counter() - begin)
+                refreshes.append(refreshed - begin)
+            db.session.remove()
+    indexed = dict(summarize('threshold_index', latencies, fired, args.alerts), load_ms=round(load_ms, 1),
+                   refresh_mean_ms=round(statistics.fmean(refreshes) * 1e3, 3))
+
+    latencies, fired, remaining = [], 0, list(alerts)
+    for previous, prices in zip(ticks, ticks[1:args.scan_ticks + 1]):
+        begin = time.perf_counter()
+        hits = {alert.id for alert in linear_scan(remaining, previous, prices)}
+        remaining = [alert for alert in remaining if alert.id not in hits]
+        latencies.append(time.perf_counter() - begin)
+        fired += len(hits)
+    scan = summarize('linear_scan', latencies, fired, args.alerts)
+
+    print(json.dumps({'benchmark': 'alerts', 'results': [indexed, scan]}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
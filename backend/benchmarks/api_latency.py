@@ -0,0 +1,98 @@
+"""Latency of the holdings, performance and history endpoints over a seeded database.
+
+    python -m benchmarks.api_latency --users 1000 --trades 200000 --requests 200
+    python -m benchmarks.api_latency --database-url sqlite:////tmp/bench.db --no-seed
+
+Requests go through the Flask test client (no network), so the numbers are
+server-side: routing, auth, SQL, market-data cache and serialization. Repeat
+requests within RESPONSE_CACHE_TTL are served from the response cache; the
+*_not_modified rows are conditional requests answered with a 304.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from app.extensions import db
+from app.models.user import User
+from .data import auth_header, make_app, seed_database
+
+
+def summarize(name, latencies, statuses):
+    latencies = sorted(latencies)
+    return {
+        'endpoint': name,
+        'requests': len(latencies),
+        'errors': sum(status >= 400 for status in statuses),
+        'mean_ms': round(statistics.fmean(latencies) * 1e3, 3),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1e3, 3),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1e3, 3),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99)] * 1e3, 3),
+    }
+
+
+def measure(client, name, requests):
+    latencies, statuses = [], []
+    for path, headers in requests:
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        response.get_data()
+        latencies.append(time.perf_counter() - start)
+        statuses.append(response.status_code)
+    return summarize(name, latencies, statuses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--trades', type=int, default=200000)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--database-url')
+    parser.add_argument('--no-seed', action='store_true', help='reuse an already seeded database')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app = make_app(url, os.path.join(tmp, 'bars'))
+        with app.app_context():
+            seeded = None if args.no_seed else seed_database(args.users, args.trades, seed=args.seed)
+            user_count = db.session.query(User).count()
+            rng = random.Random(args.seed)
+            sample = [rng.randint(1, user_count) for _ in range(args.requests)]
+            headers = {user_id: auth_header(user_id) for user_id in set(sample)}
+
+        client = app.test_client()
+        cursors = {}
+        for user_id in set(sample):
+            cursors[user_id] = client.get('/api/trading/history?limit=50', headers=headers[user_id]).json['next_cursor']
+
+        def requests(path):
+            return [(path(user_id), headers[user_id]) for user_id in sample]
+
+        # One untimed pass fills the market-data cache and bar store, as a warm server would have.
+        measure(client, 'warmup', requests(lambda user_id: '/api/portfolio/performance'))
+        results = [
+            measure(client, 'holdings', requests(lambda user_id: '/api/portfolio/holdings')),
+            measure(client, 'performance', requests(lambda user_id: '/api/portfolio/performance')),
+            measure(client, 'history_first_page', requests(lambda user_id: '/api/trading/history?limit=50')),
+            measure(client, 'history_next_page', requests(
+                lambda user_id: f'/api/trading/history?limit=50&cursor={cursors[user_id] or ""}'
+            )),
+        ]
+        # A polling dashboard revalidates with the ETag it already holds.
+        for name, path in (('holdings', '/api/portfolio/holdings'), ('performance', '/api/portfolio/performance')):
+            etags = {user_id: client.get(path, headers=headers[user_id]).headers['ETag'] for user_id in set(sample)}
+            results.append(measure(client, f'{name}_not_modified', [
+                (path, dict(headers[user_id], **{'If-None-Match': etags[user_id]})) for user_id in sample
+            ]))
+        with app.app_context():
+            db.engine.dispose()
+
+    print(json.dumps({'benchmark': 'api_latency', 'seed': seeded, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
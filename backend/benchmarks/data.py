@@ -0,0 +1,119 @@
+"""Synthetic users, trades and market data shared by the benchmarks.
+
+    python -m benchmarks.data --users 10000 --trades 10000000 --database-url sqlite:////tmp/bench.db
+
+Everything is seeded, so two runs against the same arguments produce the same
+database and prices. Market data comes from the app's SyntheticProvider, so
+no benchmark needs network access.
+"""
+import argparse
+import json
+import tempfile
+import time
+import numpy as np
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import db
+from app.models.position import rebuild_positions
+from app.models.trade import Trade
+from app.models.user import User
+from app.utils.bar_store import bar_store
+from app.utils.market_data import SyntheticProvider, market_data
+
+BENCH_CONFIG = {
+    'JWT_SECRET_KEY': 'benchmark-secret-key-with-at-least-32-bytes',
+    'SCHEDULER_ENABLED': False,
+}
+SYMBOL_COUNT = 500
+SYMBOLS_PER_USER = 12
+INSERT_BATCH = 50000
+
+
+def symbols(count=SYMBOL_COUNT):
+    return [f'S{i:03d}' for i in range(count)]
+
+
+class TickingProvider(SyntheticProvider):
+    """SyntheticProvider whose latest close moves by a seeded random step on every fetch."""
+
+    def __init__(self, latency=0.0, seed=0):
+        super().__init__(latency)
+        self.rng = np.random.default_rng(seed)
+
+    def fetch(self, symbols, period):
+        frames = super().fetch(symbols, period)
+        for frame in frames.values():
+            frame.iloc[-1, frame.columns.get_loc('Close')] *= 1 + self.rng.normal(0, 0.002)
+        return frames
+
+
+def make_app(database_url, bar_root, **config):
+    """create_app() on the given database with synthetic market data and a scratch bar store."""
+    app = create_app(dict(BENCH_CONFIG, SQLALCHEMY_DATABASE_URI=database_url, **config))
+    market_data.set_provider(SyntheticProvider())
+    bar_store.root = bar_root
+    return app
+
+
+def auth_header(user_id):
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+
+
+def seed_database(users, trades, symbol_count=SYMBOL_COUNT, seed=0):
+    """Recreate the schema and fill it; call inside an app context. Returns timings."""
+    rng = np.random.default_rng(seed)
+    universe = np.array(symbols(symbol_count))
+    start = time.perf_counter()
+    db.drop_all()
+    db.create_all()
+
+    db.session.execute(User.__table__.insert(), [
+        {'id': i, 'username': f'user{i}', 'email': f'user{i}@example.com',
+         'email_notifications': True, 'push_notifications': True, 'is_admin': False}
+        for i in range(1, users + 1)
+    ])
+    # Each user trades a fixed handful of symbols, mostly buys, over ~2 years.
+    watchlists = rng.integers(0, symbol_count, size=(users, SYMBOLS_PER_USER))
+    epoch = np.datetime64('2023-01-02T14:30:00', 's')
+    for offset in range(0, trades, INSERT_BATCH):
+        n = min(INSERT_BATCH, trades - offset)
+        user_ids = rng.integers(1, users + 1, n)
+        picks = universe[watchlists[user_ids - 1, rng.integers(0, SYMBOLS_PER_USER, n)]]
+        timestamps = (epoch + rng.integers(0, 2 * 365 * 86400, n).astype('timedelta64[s]')).astype(object)
+        db.session.execute(Trade.__table__.insert(), [{
+            'user_id': int(user_id),
+            'symbol': str(symbol),
+            'quantity': float(quantity),
+            'price': float(price),
+            'type': 'buy' if buy else 'sell',
+            'timestamp': timestamp,
+        } for user_id, symbol, quantity, price, buy, timestamp in zip(
+            user_ids, picks, rng.integers(1, 100, n), rng.uniform(5, 500, n).round(2),
+            rng.random(n) < 0.65, timestamps
+        )])
+        db.session.commit()
+    inserted = time.perf_counter() - start
+    positions = rebuild_positions()
+    return {
+        'users': users,
+        'trades': trades,
+        'positions': positions,
+        'insert_seconds': round(inserted, 2),
+        'total_seconds': round(time.perf_counter() - start, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--trades', type=int, default=200000)
+    parser.add_argument('--database-url', required=True)
+    args = parser.parse_args()
+
+    app = make_app(args.database_url, tempfile.mkdtemp(prefix='bench-bars-'))
+    with app.app_context():
+        print(json.dumps({'benchmark': 'data', 'results': [seed_database(args.users, args.trades)]}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
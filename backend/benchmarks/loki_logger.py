@@ -0,0 +1,95 @@
+"""Request-path cost of a log call: synchronous Loki push vs the queued pipeline.
+
+    python -m benchmarks.loki_logger --count 2000
+
+Runs against a local HTTP stand-in for Loki, so no Loki instance is needed.
+"""
+import argparse
+import json
+import logging
+import queue
+import statistics
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.utils.logger import LokiShipper, NonBlockingQueueHandler
+
+
+class LokiStandIn(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class SynchronousHandler(logging.Handler):
+    """One HTTP push per record on the calling thread, like the previous LokiHandler."""
+
+    def __init__(self, shipper):
+        super().__init__()
+        self.shipper = shipper
+
+    def emit(self, record):
+        self.shipper.ship([record])
+
+
+def measure(logger, count):
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        logger.info('User logged in: user%d', i)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        'mean_us': round(statistics.fmean(latencies) * 1e6, 2),
+        'p50_us': round(latencies[len(latencies) // 2] * 1e6, 2),
+        'p99_us': round(latencies[int(len(latencies) * 0.99)] * 1e6, 2),
+    }
+
+
+def make_logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=2000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), LokiStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/loki/api/v1/push'
+    tags = {'application': 'benchmark'}
+
+    sync_stats = Counter()
+    sync_logger = make_logger('bench-sync', SynchronousHandler(LokiShipper(queue.Queue(), url, tags, sync_stats)))
+    synchronous = measure(sync_logger, args.count)
+
+    log_queue, stats = queue.Queue(maxsize=args.count * 2), Counter()
+    shipper = LokiShipper(log_queue, url, tags, stats)
+    queued_logger = make_logger('bench-queued', NonBlockingQueueHandler(log_queue, stats, lambda: None))
+    shipper.start()
+    queued = measure(queued_logger, args.count)
+    start = time.perf_counter()
+    shipper.stop(timeout=60)
+    queued['drain_seconds'] = round(time.perf_counter() - start, 4)
+    queued.update(stats)
+    server.shutdown()
+
+    print(json.dumps({
+        'benchmark': 'loki_logger',
+        'count': args.count,
+        'results': {'synchronous': synchronous, 'queued': queued},
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
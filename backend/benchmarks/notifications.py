@@ -0,0 +1,85 @@
+"""Email notification throughput against a local SMTP stand-in.
+
+    python -m benchmarks.notifications --count 2000
+
+Requires aiosmtpd (``pip install aiosmtpd``). Runs the dispatcher once with
+one SMTP connection per message and once with batched connections.
+"""
+import argparse
+import json
+import threading
+import time
+from flask import Flask
+from app.extensions import mail
+from app.notifications.dispatcher import NotificationDispatcher, send_email_batch
+
+
+class CountingHandler:
+    def __init__(self):
+        self.received = 0
+        self.done = threading.Event()
+        self.expected = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        if self.received >= self.expected:
+            self.done.set()
+        return '250 OK'
+
+
+def run(port, handler, count, workers, batch_size):
+    app = Flask(__name__)
+    app.config.update(
+        MAIL_SERVER='127.0.0.1',
+        MAIL_PORT=port,
+        MAIL_USE_TLS=False,
+        NOTIFICATION_SENDER='bench@example.com',
+    )
+    mail.init_app(app)
+    dispatcher = NotificationDispatcher(maxsize=count, workers=workers, batch_size=batch_size)
+    dispatcher.init_app(app)
+    dispatcher.channels = {'email': send_email_batch}
+
+    handler.received, handler.expected = 0, count
+    handler.done.clear()
+    start = time.perf_counter()
+    for i in range(count):
+        dispatcher.submit(['email'], i, f'user{i}@example.com', 'Price alert', 'AAPL crossed 200')
+    enqueued = time.perf_counter() - start
+    handler.done.wait(timeout=300)
+    elapsed = time.perf_counter() - start
+    return {
+        'workers': workers,
+        'batch_size': batch_size,
+        'messages': handler.received,
+        'seconds': round(elapsed, 4),
+        'messages_per_sec': round(handler.received / elapsed, 1),
+        'submit_us_per_message': round(enqueued / count * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--port', type=int, default=8025)
+    args = parser.parse_args()
+
+    from aiosmtpd.controller import Controller
+
+    handler = CountingHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=args.port)
+    controller.start()
+    try:
+        results = [
+            run(args.port, handler, args.count, args.workers, 1),
+            run(args.port, handler, args.count, args.workers, args.batch_size),
+        ]
+    finally:
+        controller.stop()
+    print(json.dumps({'benchmark': 'notifications', 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
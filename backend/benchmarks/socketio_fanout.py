@@ -0,0 +1,79 @@
+"""Price-tick fan-out to N connected Socket.IO clients.
+
+    python -m benchmarks.socketio_fanout --clients 1000 --ticks 20
+
+Each client authenticates as its own user whose room watches a few symbols.
+Every tick moves all prices (TickingProvider), so each room gets a delta.
+Clients are flask-socketio test clients, so this measures the server side of
+a tick without network I/O. The synthetic price fetch is timed separately
+from the fan-out: delta computation, serialization and emitting to rooms.
+"""
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from app.extensions import socketio
+from app.utils.market_data import market_data
+from app.utils.stock_updater import price_stream, user_room
+from .data import TickingProvider, auth_header, make_app, symbols
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--symbols-per-client', type=int, default=10)
+    parser.add_argument('--universe', type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    universe = symbols(args.universe)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app('sqlite://', tmp, PRICE_STREAM_MIN_TICK=0.0)
+        market_data.set_provider(TickingProvider())
+        with app.app_context():
+            tokens = {user_id: auth_header(user_id)['Authorization'].split()[1] for user_id in range(1, args.clients + 1)}
+
+        clients = []
+        for user_id, token in tokens.items():
+            price_stream.subscribe(user_room(user_id), rng.sample(universe, args.symbols_per_client))
+            clients.append(socketio.test_client(app, auth={'token': token}))
+        for client in clients:
+            client.get_received()
+
+        subscribed = price_stream.symbols()
+        fetches, latencies, delivered = [], [], 0
+        for _ in range(args.ticks):
+            market_data.clear()
+            start = time.perf_counter()
+            market_data.latest_prices(subscribed)
+            fetches.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            price_stream.tick(socketio.emit)
+            latencies.append(time.perf_counter() - start)
+            delivered += sum(
+                1 for client in clients for message in client.get_received() if message['name'] == 'stock_delta'
+            )
+
+        for client in clients:
+            client.disconnect()
+
+    latencies.sort()
+    print(json.dumps({'benchmark': 'socketio_fanout', 'results': [{
+        'clients': args.clients,
+        'symbols': len(subscribed),
+        'ticks': args.ticks,
+        'messages_delivered': delivered,
+        'expected_messages': args.clients * args.ticks,
+        'fetch_mean_ms': round(statistics.fmean(fetches) * 1e3, 2),
+        'fanout_p50_ms': round(latencies[len(latencies) // 2] * 1e3, 2),
+        'fanout_max_ms': round(latencies[-1] * 1e3, 2),
+        'fanout_mean_ms': round(statistics.fmean(latencies) * 1e3, 2),
+        'messages_per_sec': round(delivered / sum(latencies), 1),
+    }]}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Cold-start cost of a worker and of a CLI command, each in a fresh interpreter.
+
+    python -m benchmarks.startup --repeat 5
+
+Also reports which heavy modules a freshly created app has already imported.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['pandas', 'numpy', 'yfinance', 'app.strategies.backtest', 'app.strategies.moving_average']
+
+CASES = {
+    'import_app': [sys.executable, '-c', 'import app'],
+    'create_app': [sys.executable, '-c', 'import app; app.create_app()'],
+    'cli_routes': [sys.executable, '-m', 'flask', '--app', 'app:create_app', 'routes'],
+}
+
+
+def measure(command, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=BACKEND, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return {
+        'median_ms': round(statistics.median(times) * 1e3, 1),
+        'min_ms': round(min(times) * 1e3, 1),
+    }
+
+
+def loaded_modules():
+    script = (
+        'import json, sys, app; app.create_app(); '
+        f'print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))'
+    )
+    output = subprocess.run([sys.executable, '-c', script], cwd=BACKEND, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = measure([sys.executable, '-c', 'pass'], args.repeat)
+    results = [dict(case=name, **measure(command, args.repeat)) for name, command in CASES.items()]
+    print(json.dumps({
+        'benchmark': 'startup',
+        'interpreter_ms': baseline['median_ms'],
+        'results': results,
+        'heavy_modules_after_create_app': loaded_modules(),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Strategy throughput per symbol: batch signals over a close matrix, and live incremental updates.
+
+    python -m benchmarks.strategies --symbols 500 --period 5y
+"""
+import argparse
+import json
+import time
+import pandas as pd
+from app.strategies import STRATEGIES
+from app.strategies.incremental import INCREMENTAL_STRATEGIES
+from app.utils.market_data import PERIOD_BARS, SyntheticProvider
+from .data import symbols as symbol_names
+
+
+def closes_matrix(count, period):
+    frames = SyntheticProvider().fetch(symbol_names(count), period)
+    return pd.DataFrame({symbol: frame['Close'] for symbol, frame in frames.items()})
+
+
+def batch(closes, repeat):
+    results = []
+    for name, strategy in STRATEGIES.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            strategy().generate_signals_batch(closes)
+        matrix = (time.perf_counter() - start) / repeat
+
+        # The pre-batch path: one generate_signals call per symbol.
+        sample = list(closes.columns[:50])
+        start = time.perf_counter()
+        for symbol in sample:
+            strategy().generate_signals(closes[[symbol]].rename(columns={symbol: 'Close'}))
+        per_symbol = (time.perf_counter() - start) / len(sample)
+
+        results.append({
+            'strategy': name,
+            'mode': 'batch',
+            'symbols': closes.shape[1],
+            'bars': closes.shape[0],
+            'matrix_ms': round(matrix * 1e3, 2),
+            'symbols_per_sec': round(closes.shape[1] / matrix, 1),
+            'per_symbol_loop_symbols_per_sec': round(1 / per_symbol, 1),
+        })
+    return results
+
+
+def incremental(closes):
+    results = []
+    values = closes.to_numpy()
+    for name, strategy in INCREMENTAL_STRATEGIES.items():
+        indicators = [strategy() for _ in range(values.shape[1])]
+        start = time.perf_counter()
+        for row in values:
+            for indicator, close in zip(indicators, row):
+                indicator.update(float(close))
+        elapsed = time.perf_counter() - start
+        updates = values.size
+        results.append({
+            'strategy': name,
+            'mode': 'incremental',
+            'symbols': values.shape[1],
+            'updates': updates,
+            'updates_per_sec': round(updates / elapsed, 1),
+            'tick_us_per_symbol': round(elapsed / updates * 1e6, 3),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--period', default='5y', choices=sorted(PERIOD_BARS))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    closes = closes_matrix(args.symbols, args.period)
+    results = batch(closes, args.repeat) + incremental(closes)
+    print(json.dumps({'benchmark': 'strategies', 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
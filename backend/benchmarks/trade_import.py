@@ -0,0 +1,111 @@
+"""Bulk trade import throughput vs one POST /execute per trade.
+
+    python -m benchmarks.trade_import --rows 100000
+
+Runs against a scratch SQLite database (or --database-url) with the app's
+engine settings. The per-trade baseline only replays --baseline-rows rows.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+import time
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+
+SYMBOLS = ['AAPL', 'MSFT', 'GOOG', 'AMZN', 'NVDA', 'META', 'TSLA', 'JPM', 'V', 'KO']
+
+
+def fills(rows, seed=0):
+    rng = random.Random(seed)
+    for i in range(rows):
+        yield {
+            'symbol': rng.choice(SYMBOLS),
+            'quantity': rng.randint(1, 100),
+            'price': round(rng.uniform(10, 500), 2),
+            'type': 'buy' if rng.random() < 0.6 else 'sell',
+            'timestamp': f'2024-{1 + i % 12:02d}-{1 + i % 28:02d}T15:30:00',
+        }
+
+
+def csv_body(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, ['symbol', 'quantity', 'price', 'type', 'timestamp'])
+    writer.writeheader()
+    writer.writerows(fills(rows))
+    return buffer.getvalue().encode()
+
+
+def ndjson_body(rows):
+    return ''.join(json.dumps(fill) + '\n' for fill in fills(rows)).encode()
+
+
+def make_client(url):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': url,
+        'JWT_SECRET_KEY': 'benchmark-secret-key-with-at-least-32-bytes',
+        'SCHEDULER_ENABLED': False,
+    })
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(id=1, username='bench', email='bench@example.com'))
+        db.session.commit()
+        token = create_access_token(identity='1')
+    return app, app.test_client(), {'Authorization': f'Bearer {token}'}
+
+
+def run_import(url, fmt, body, rows):
+    app, client, headers = make_client(url)
+    start = time.perf_counter()
+    response = client.post('/api/trading/import', data=body, headers=headers,
+                           content_type='text/csv' if fmt == 'csv' else 'application/x-ndjson')
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 201, response.get_data(as_text=True)
+    return {
+        'path': f'import-{fmt}',
+        'rows': response.json['imported'],
+        'batch_size': app.config['IMPORT_BATCH_SIZE'],
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(rows / elapsed, 1),
+    }
+
+
+def run_execute(url, rows):
+    _, client, headers = make_client(url)
+    start = time.perf_counter()
+    for fill in fills(rows):
+        client.post('/api/trading/execute', json=fill, headers=headers)
+    elapsed = time.perf_counter() - start
+    return {
+        'path': 'execute-per-trade',
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(rows / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--baseline-rows', type=int, default=2000)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'import.db')}"
+        results = [
+            run_import(url, 'csv', csv_body(args.rows), args.rows),
+            run_import(url, 'ndjson', ndjson_body(args.rows), args.rows),
+            run_execute(url, args.baseline_rows),
+        ]
+    print(json.dumps({'benchmark': 'trade_import', 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
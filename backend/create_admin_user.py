@@ -1,5 +1,6 @@
 from app import create_app
-from app.models.user import User, db
+from app.extensions import db
+from app.models.user import User
 import secrets
 
 app = create_app()
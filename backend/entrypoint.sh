@@ -0,0 +1,10 @@
+#!/bin/sh
+# Bring the schema up to date before serving; DATABASE_URL is only known at run time.
+set -e
+
+until flask db upgrade; do
+    echo "Database not ready, retrying in 2s..."
+    sleep 2
+done
+
+exec "$@"
@@ -1,10 +1,12 @@
 from app import create_app
-from app.models.user import User, db
+from flask_migrate import upgrade
+from app.extensions import db
+from app.models.user import User
 import secrets
 
 app = create_app()
 with app.app_context():
-    db.create_all()
+    upgrade()
     existing_admin = User.query.filter_by(username='admin').first()
     if not existing_admin:
         password = secrets.token_urlsafe(12)
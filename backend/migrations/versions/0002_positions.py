@@ -0,0 +1,50 @@
+"""positions and trade history index
+
+Adds the materialized position table, backfilled from trade history, and the
+(user_id, timestamp, id) index used for keyset pagination of trades.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 14:21:41.813596
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('position',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('symbol', sa.String(length=10), nullable=False),
+    sa.Column('quantity', sa.Float(), nullable=False),
+    sa.Column('cost_basis', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'symbol', name='uq_position_user_symbol')
+    )
+    with op.batch_alter_table('trade', schema=None) as batch_op:
+        batch_op.create_index('ix_trade_user_timestamp', ['user_id', 'timestamp', 'id'], unique=False)
+
+    # Same aggregate as rebuild_positions().
+    op.execute(
+        "INSERT INTO position (user_id, symbol, quantity, cost_basis) "
+        "SELECT user_id, symbol, "
+        "SUM(CASE WHEN type = 'buy' THEN quantity ELSE -quantity END), "
+        "SUM(CASE WHEN type = 'buy' THEN quantity * price ELSE -quantity * price END) "
+        "FROM trade GROUP BY user_id, symbol"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('trade', schema=None) as batch_op:
+        batch_op.drop_index('ix_trade_user_timestamp')
+
+    op.drop_table('position')
@@ -0,0 +1,46 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.auth.identity import user_claims
+from app.extensions import db
+from app.models.user import User
+from app.utils.bar_store import bar_store
+from app.utils.market_data import market_data, SyntheticProvider
+
+@pytest.fixture
+def app():
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'JWT_SECRET_KEY': 'test-secret-key-with-at-least-32-bytes',
+        'SCHEDULER_ENABLED': False,
+        'QUERY_BUDGET': 10,
+    })
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id=1, username='trader', email='trader@example.com'))
+        db.session.commit()
+        yield app
+
+@pytest.fixture
+def session(app):
+    return db.session
+
+@pytest.fixture
+def auth_headers(app):
+    """``auth_headers(user_id=1)``: a Bearer header carrying the user's login claims."""
+    def headers(user_id=1):
+        user = db.session.get(User, int(user_id))
+        claims = user_claims(user) if user else {}
+        return {'Authorization': f'Bearer {create_access_token(identity=str(user_id), additional_claims=claims)}'}
+    return headers
+
+@pytest.fixture
+def synthetic_bars(tmp_path):
+    """Seeded synthetic market data and a scratch bar store."""
+    original_provider, original_root = market_data.provider, bar_store.root
+    market_data.set_provider(SyntheticProvider())
+    bar_store.root = str(tmp_path)
+    yield
+    market_data.set_provider(original_provider)
+    bar_store.root = original_root
@@ -0,0 +1,116 @@
+import pytest
+from app.extensions import db, scheduler
+from app.models.alert import Alert
+from app.models.version import bump_version
+from app.notifications.dispatcher import dispatcher
+from app.utils.alerts import AlertEngine, ActiveAlert, alert_engine
+from app.utils.stock_updater import price_stream, ALERTS_ROOM, JOB_ID, LIVE_SIGNALS_ROOM
+
+def make_engine(*alerts):
+    engine = AlertEngine()
+    for i, (metric, condition, threshold) in enumerate(alerts, start=1):
+        engine.add(ActiveAlert(i, 1, 'AAPL', metric, condition, threshold))
+    return engine
+
+def fired_ids(fired):
+    return sorted(alert.id for alert, _ in fired)
+
+def test_alerts_fire_once_when_their_threshold_is_crossed():
+    engine = make_engine(('price', 'above', 100), ('price', 'above', 105), ('price', 'above', 110),
+                         ('price', 'below', 95), ('price', 'below', 99))
+    assert engine.check('price', {'AAPL': 100.0}) == []  # first reading is the baseline
+    assert fired_ids(engine.check('price', {'AAPL': 107.0})) == [2]
+    assert fired_ids(engine.check('price', {'AAPL': 90.0})) == [4, 5]
+    assert fired_ids(engine.check('price', {'AAPL': 120.0})) == [1, 3]
+    assert engine.check('price', {'AAPL': 90.0}) == []
+    assert engine.alerts == {}
+
+def test_indicator_alerts_and_removal():
+    engine = make_engine(('rsi', 'below', 30), ('rsi', 'above', 70), ('price', 'below', 50))
+    engine.remove(2)
+    engine.on_prices({'AAPL': 60.0}, {'rsi': {'AAPL': 45.0}})
+    fired = engine.on_prices({'AAPL': 55.0}, {'rsi': {'AAPL': 25.0, 'MSFT': float('nan')}})
+    assert [(alert.id, value) for alert, value in fired] == [(1, 25.0)]
+    assert engine.on_prices({'AAPL': 60.0}, {'rsi': {'AAPL': 80.0}}) == []
+
+@pytest.fixture
+def alert_rooms(synthetic_bars):
+    yield
+    for room in (ALERTS_ROOM, LIVE_SIGNALS_ROOM):
+        price_stream.unsubscribe(room)
+    if scheduler.get_job(JOB_ID):
+        scheduler.remove_job(JOB_ID)
+
+def test_created_alerts_trigger_notifications(app, alert_rooms, auth_headers, monkeypatch):
+    alert_engine.load()
+    alert_engine.last.clear()
+    headers = auth_headers()
+    client = app.test_client()
+    response = client.post('/api/notifications/alerts', headers=headers,
+                           json={'symbol': 'aapl', 'condition': 'above', 'threshold': 150})
+    assert response.status_code == 201
+    assert client.post('/api/notifications/alerts', headers=headers,
+                       json={'symbol': 'AAPL', 'metric': 'rsi', 'condition': 'below', 'threshold': 30}).status_code == 201
+    assert client.post('/api/notifications/alerts', headers=headers,
+                       json={'symbol': 'AAPL', 'metric': 'rsi', 'condition': 'below', 'threshold': 130}).status_code == 400
+    assert 'AAPL' in price_stream.symbols()
+
+    sent = []
+    monkeypatch.setattr(dispatcher, 'submit', lambda *args: sent.append(args))
+    alert_engine.notify(alert_engine.on_prices({'AAPL': 140.0}))
+    alert_engine.notify(alert_engine.on_prices({'AAPL': 151.0}))
+    assert sent == [(['email', 'push'], 1, 'trader@example.com', 'AAPL price crossed above 150',
+                     'AAPL price is 151.00 (above your alert at 150).')]
+
+    alerts = client.get('/api/notifications/alerts', headers=headers).json['alerts']
+    price_alert = next(alert for alert in alerts if alert['metric'] == 'price')
+    assert price_alert['active'] is False and price_alert['triggered_value'] == 151.0
+    assert client.delete(f"/api/notifications/alerts/{alerts[0]['id']}", headers=headers).status_code == 200
+    assert db.session.query(Alert).count() == 1
+    assert alert_engine.alerts == {}
+
+def test_workers_follow_the_database_and_send_each_alert_once(app, monkeypatch):
+    workers = [AlertEngine(), AlertEngine()]
+    for engine in workers:
+        engine.init_app(app)
+        engine.load()
+    kept, deleted = Alert(user_id=1, symbol='AAPL', condition='above', threshold=150), \
+        Alert(user_id=1, symbol='MSFT', condition='below', threshold=100)
+    db.session.add_all([kept, deleted])
+    bump_version('alerts')  # as the routes do, from another worker
+    db.session.commit()
+    assert all(engine.refresh() for engine in workers)
+    db.session.delete(deleted)
+    bump_version('alerts')
+    db.session.commit()
+    assert all(engine.refresh() for engine in workers)
+    assert [engine.symbols() for engine in workers] == [['AAPL'], ['AAPL']]
+
+    sent = []
+    monkeypatch.setattr(dispatcher, 'submit', lambda *args: sent.append(args))
+    for engine in workers:
+        engine.on_prices({'AAPL': 140.0})
+    assert [engine.notify(engine.on_prices({'AAPL': 151.0})) for engine in workers] == [1, 0]
+    assert len(sent) == 1
+    assert [engine.refresh() for engine in workers] == [False, True]  # only the claimer's index is current
+
+def test_alerts_are_kept_when_marking_them_triggered_fails(app, monkeypatch):
+    engine = AlertEngine()
+    engine.init_app(app)
+    db.session.add(Alert(user_id=1, symbol='AAPL', condition='below', threshold=100))
+    db.session.commit()
+    engine.load()
+    engine.on_prices({'AAPL': 110.0})
+
+    def locked(fired):
+        raise RuntimeError('database is locked')
+
+    claim = engine.claim
+    monkeypatch.setattr(engine, 'claim', locked)
+    with pytest.raises(RuntimeError):
+        engine.notify(engine.on_prices({'AAPL': 90.0}))
+    sent = []
+    monkeypatch.setattr(engine, 'claim', claim)
+    monkeypatch.setattr(dispatcher, 'submit', lambda *args: sent.append(args))
+    assert engine.notify([]) == 1  # retried with the next tick
+    assert sent[0][3] == 'AAPL price crossed below 100'
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+import numpy as np
+from app.models.position import apply_trade
+from app.models.trade import Trade
+from app.portfolio.analytics import holdings_matrix, risk_metrics
+from app.utils.market_data import market_data, SyntheticProvider
+
+def test_time_weighted_returns_ignore_cash_flows():
+    dates = np.array(['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04'], dtype='datetime64[D]')
+    prices = np.array([[100.0, 50.0], [110.0, 50.0], [110.0, 55.0], [99.0, 55.0]])
+    holdings = holdings_matrix([
+        ('AAPL', '2023-12-29', 1.0),
+        ('MSFT', '2024-01-02', 2.0),   # bought at the close: no effect on that day's return
+        ('AAPL', '2024-01-03', 1.0),
+    ], dates, ['AAPL', 'MSFT'])
+    np.testing.assert_array_equal(holdings, [[1, 0], [1, 2], [2, 2], [2, 2]])
+
+    metrics = risk_metrics(prices, holdings, benchmark=prices[:, 0])
+    np.testing.assert_allclose(metrics['returns'], [0.10, 10 / 210, -22 / 330])
+    np.testing.assert_allclose(metrics['total_return'], 1.1 * (220 / 210) * (308 / 330) - 1)
+    np.testing.assert_allclose(metrics['max_drawdown'], 308 / 330 - 1)
+    assert metrics['correlation'].shape == (2, 2)
+
+def test_analytics_endpoint_is_cached_until_a_trade_in_any_process(app, session, synthetic_bars, auth_headers):
+    start = datetime.utcnow() - timedelta(days=90)
+    session.add_all([
+        Trade(user_id=1, symbol='AAPL', quantity=10, price=100, type='buy', timestamp=start),
+        Trade(user_id=1, symbol='MSFT', quantity=5, price=300, type='buy', timestamp=start + timedelta(days=30)),
+    ])
+    session.commit()
+    headers = auth_headers()
+    client = app.test_client()
+
+    body = client.get('/api/portfolio/analytics?period=6mo', headers=headers).json
+    assert body['symbols'] == ['AAPL', 'MSFT'] and body['benchmark'] == 'SPY'
+    assert len(body['series']['dates']) == len(body['series']['returns']) > 40
+    assert body['max_drawdown'] <= 0 and body['volatility'] > 0 and body['beta'] is not None
+    assert len(body['correlation']) == 2
+
+    market_data.set_provider(SyntheticProvider())
+    assert client.get('/api/portfolio/analytics?period=6mo', headers=headers).json == body
+    assert market_data.provider.calls == 0
+
+    # A trade recorded by another worker: nothing invalidates this process's cache.
+    trade = Trade(user_id=1, symbol='GOOG', quantity=1, price=140, type='buy')
+    session.add(trade)
+    apply_trade(trade)
+    session.commit()
+    assert client.get('/api/portfolio/analytics?period=6mo', headers=headers).json['symbols'] == ['AAPL', 'GOOG', 'MSFT']
@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 import pytest
 from app import create_app
 
@@ -16,3 +19,9 @@ def test_health_check(client):
 def test_login_required(client):
     response = client.get('/api/portfolio/holdings')
     assert response.status_code == 401  # Unauthorized
+
+def test_create_app_defers_heavy_imports():
+    script = "import sys, app; app.create_app(); print(sorted({'pandas', 'numpy', 'yfinance'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(os.path.dirname(__file__)),
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == '[]'
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+from app.strategies.backtest import backtest, expand_grid, grid_size, run_grid, summarize
+from app.utils.market_data import SyntheticProvider
+
+def test_backtest_holds_exposure_after_entry():
+    index = pd.bdate_range('2024-01-01', periods=5)
+    closes = pd.DataFrame({'AAPL': [100.0, 110.0, 121.0, 108.9, 108.9]}, index=index)
+    positions = pd.DataFrame({'AAPL': [None, 1.0, 0.0, -1.0, 0.0]}, index=index)
+    result = backtest(closes, positions)
+    assert list(result['equity']['AAPL']) == pytest.approx([1.0, 1.0, 1.1, 0.99, 0.99])
+    assert result['drawdown']['AAPL'].min() == pytest.approx(0.99 / 1.1 - 1)
+    metrics = summarize(result).loc['AAPL']
+    assert metrics['trades'] == 2
+    assert metrics['total_return'] == pytest.approx(-0.01)
+
+def test_expand_grid():
+    assert expand_grid({'short_window': [20, 50], 'long_window': 200}) == [
+        {'long_window': 200, 'short_window': 20},
+        {'long_window': 200, 'short_window': 50},
+    ]
+    assert grid_size({'short_window': [20, 50], 'long_window': 200}) == 2
+
+@pytest.mark.parametrize('body', [
+    {'params': {'period': list(range(1000)), 'lower': list(range(1000)), 'upper': list(range(1000))}},
+    {'params': [14]},
+    {'cost': 'cheap'},
+    {'symbols': ['../../etc/passwd']},
+])
+def test_invalid_backtests_are_rejected_before_running(app, auth_headers, body):
+    headers = auth_headers()
+    response = app.test_client().post('/api/trading/backtest', headers=headers,
+                                      json=dict({'symbols': ['AAPL'], 'strategy': 'rsi'}, **body))
+    assert response.status_code == 400
+
+def test_process_pool_matches_serial():
+    frames = SyntheticProvider().fetch(['AAPL', 'MSFT', 'GOOG'], '2y')
+    closes = pd.DataFrame({symbol: frame['Close'] for symbol, frame in frames.items()})
+    grid = {'short_window': [10, 20, 30], 'long_window': [60, 120]}
+    serial = run_grid(closes, 'moving_average', grid, cost=0.001)
+    parallel = run_grid(closes, 'moving_average', grid, cost=0.001, workers=2)
+    assert [params for params, _ in serial] == [params for params, _ in parallel]
+    for (_, expected), (_, actual) in zip(serial, parallel):
+        pd.testing.assert_frame_equal(expected, actual)
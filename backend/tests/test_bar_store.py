@@ -0,0 +1,104 @@
+import os
+import time
+import numpy as np
+import pytest
+from app.utils.bar_store import BarStore, bar_dtype
+from app.utils.market_data import market_data, SyntheticProvider
+
+class RecordingProvider(SyntheticProvider):
+    def __init__(self):
+        super().__init__()
+        self.periods = []
+
+    def fetch(self, symbols, period):
+        self.periods.append(period)
+        return super().fetch(symbols, period)
+
+@pytest.fixture
+def provider():
+    original, provider = market_data.provider, RecordingProvider()
+    market_data.set_provider(provider)
+    yield provider
+    market_data.set_provider(original)
+
+def test_backfill_then_read_locally(tmp_path, provider):
+    store = BarStore(root=str(tmp_path))
+    history = store.history('AAPL', '1y')
+    assert len(history) == 252
+    assert provider.periods == ['1y', '1d']
+    expected = SyntheticProvider().fetch(['AAPL'], '1y')['AAPL']
+    np.testing.assert_allclose(history['Close'], expected['Close'])
+
+    market_data.clear()
+    provider.periods.clear()
+    store.history('AAPL', '1y')
+    assert provider.periods == ['1d']
+
+def test_refresh_appends_only_missing_bars(tmp_path, provider):
+    store = BarStore(root=str(tmp_path))
+    store.refresh('AAPL')
+    path = os.path.join(str(tmp_path), 'AAPL.bars')
+    complete = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(complete - 3 * bar_dtype().itemsize)
+
+    market_data.clear()
+    provider.periods.clear()
+    BarStore(root=str(tmp_path)).refresh('AAPL')
+    assert provider.periods == ['5d']
+    assert os.path.getsize(path) == complete
+
+def test_closes_fetches_stale_gaps_in_one_batch(tmp_path, provider):
+    symbols = ['AAPL', 'MSFT', 'GOOG']
+    BarStore(root=str(tmp_path)).closes(symbols)
+    for symbol in symbols:
+        with open(os.path.join(str(tmp_path), f'{symbol}.bars'), 'r+b') as f:
+            f.truncate(os.path.getsize(f.name) - 3 * bar_dtype().itemsize)
+
+    market_data.clear()
+    provider.periods.clear()
+    closes = BarStore(root=str(tmp_path)).closes(symbols)
+    assert provider.periods == ['1d', '5d']
+    assert list(closes.columns) == symbols and len(closes) == 252
+
+def test_date_slices_are_views(tmp_path, provider):
+    store = BarStore(root=str(tmp_path))
+    store.refresh('AAPL')
+    everything = store.bars('AAPL')
+    dates = everything['date']
+    window = store.bars('AAPL', start=dates[10], end=dates[19])
+    assert len(window) == 10
+    assert window['date'][0] == dates[10]
+    assert isinstance(window, np.memmap)
+    assert np.shares_memory(window, everything) or window.base is not None
+
+class SlowStore(BarStore):
+    def last_date(self, symbol):
+        last = super().last_date(symbol)
+        time.sleep(0.1)  # widen the window between reading the end of the file and appending
+        return last
+
+def refresh_in_worker(root):
+    SlowStore(root=root).refresh('AAPL')
+
+def test_workers_filling_the_same_gap_do_not_duplicate_bars(tmp_path, provider):
+    multiprocessing = pytest.importorskip('multiprocessing')
+    BarStore(root=str(tmp_path)).refresh('AAPL')
+    path = os.path.join(str(tmp_path), 'AAPL.bars')
+    complete = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(complete - 3 * bar_dtype().itemsize)
+
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=refresh_in_worker, args=(str(tmp_path),)) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert os.path.getsize(path) == complete
+    assert (np.diff(BarStore(root=str(tmp_path)).bars('AAPL')['date']) > np.timedelta64(0, 'D')).all()
+
+@pytest.mark.parametrize('symbol', ['../AAPL', 'AAPL/../../x', '', 'TOOLONGSYMBOL'])
+def test_symbols_must_be_tickers(tmp_path, symbol):
+    with pytest.raises(ValueError):
+        BarStore(root=str(tmp_path)).history(symbol)
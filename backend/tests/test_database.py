@@ -0,0 +1,70 @@
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask import Flask
+from flask_migrate import upgrade
+from flask_sqlalchemy import SQLAlchemy
+from app import create_app
+from app.extensions import db as app_db
+from app.utils import database
+
+CONFIG = {
+    'SQLITE_JOURNAL_MODE': 'WAL',
+    'SQLITE_BUSY_TIMEOUT': 5000,
+    'SQLITE_SYNCHRONOUS': 'NORMAL',
+    'DB_POOL_SIZE': 10,
+    'DB_MAX_OVERFLOW': 20,
+    'DB_POOL_TIMEOUT': 30,
+    'DB_POOL_RECYCLE': 1800,
+}
+
+
+def test_database_url_from_env(monkeypatch):
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    assert database.database_url() == database.DEFAULT_DATABASE_URL
+    monkeypatch.setenv('DATABASE_URL', 'postgres://u:p@db/robinhood')
+    assert database.database_url() == 'postgresql://u:p@db/robinhood'
+
+
+def test_engine_options_per_backend():
+    postgres = database.engine_options('postgresql://u:p@db/robinhood', CONFIG)
+    assert postgres['pool_size'] == 10 and postgres['pool_pre_ping']
+    sqlite = database.engine_options('sqlite:///dashboard.db', CONFIG)
+    assert sqlite == {'connect_args': {'timeout': 5.0, 'check_same_thread': False}}
+
+
+def test_sqlite_connections_use_wal(tmp_path):
+    app = Flask(__name__)
+    url = f"sqlite:///{tmp_path / 'dashboard.db'}"
+    app.config.update(CONFIG, SQLALCHEMY_DATABASE_URI=url,
+                      SQLALCHEMY_ENGINE_OPTIONS=database.engine_options(url, CONFIG))
+    db = SQLAlchemy(app)
+    database.init_app(app, db)
+    with app.app_context():
+        with db.engine.connect() as connection:
+            assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+            assert connection.exec_driver_sql('PRAGMA busy_timeout').scalar() == 5000
+
+
+def test_migrations_match_models(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'migrated.db'}"})
+    with app.app_context():
+        upgrade()
+        with app_db.engine.connect() as connection:
+            assert compare_metadata(MigrationContext.configure(connection), app_db.metadata) == []
+
+
+def test_baseline_database_upgrade_backfills_positions(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'baseline.db'}"})
+    with app.app_context():
+        upgrade(revision='0001')  # the schema db.create_all() built before migrations
+        with app_db.engine.begin() as connection:
+            connection.exec_driver_sql("INSERT INTO user (id, username, email) VALUES (1, 'trader', 't@example.com')")
+            connection.exec_driver_sql(
+                "INSERT INTO trade (user_id, symbol, quantity, price, timestamp, type) VALUES "
+                "(1, 'AAPL', 10, 100, '2024-01-02', 'buy'), (1, 'AAPL', 4, 120, '2024-01-03', 'sell')"
+            )
+        upgrade()
+        with app_db.engine.connect() as connection:
+            assert connection.exec_driver_sql('SELECT user_id, symbol, quantity, cost_basis FROM position').all() == [
+                (1, 'AAPL', 6.0, 520.0)
+            ]
@@ -0,0 +1,53 @@
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app.auth.identity import UserCache, admin_required, user_cache, user_claims
+from app.extensions import db
+from app.models.user import User
+
+def count_queries():
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
+
+def test_cache_serves_repeat_lookups_until_invalidated(session):
+    cache = UserCache(ttl=60)
+    statements = count_queries()
+    assert cache.get('1').username == 'trader'
+    assert cache.get(1).is_admin is False
+    assert len(statements) == 1
+
+    db.session.get(User, 1).email_notifications = False
+    db.session.commit()
+    assert cache.get(1).email_notifications is True
+    cache.invalidate(1)
+    assert cache.get(1).email_notifications is False
+
+def test_admin_required_uses_claims_and_cache(app, session):
+    session.add(User(id=2, username='admin', email='admin@example.com', is_admin=True))
+    session.commit()
+    user_cache.clear()
+
+    @app.route('/admin-only')
+    @admin_required
+    def admin_only():
+        return {'ok': True}
+
+    tokens = {
+        user_id: create_access_token(identity=str(user_id), additional_claims=user_claims(db.session.get(User, user_id)))
+        for user_id in (1, 2)
+    }
+    client = app.test_client()
+    def get(user_id):
+        return client.get('/admin-only', headers={'Authorization': f'Bearer {tokens[user_id]}'})
+
+    statements = count_queries()
+    assert get(1).status_code == 403
+    assert statements == []
+    assert get(2).status_code == 200
+    assert get(2).status_code == 200
+    assert len(statements) == 1
+
+    db.session.get(User, 2).is_admin = False
+    db.session.commit()
+    user_cache.invalidate(2)
+    assert get(2).status_code == 403
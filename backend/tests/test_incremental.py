@@ -0,0 +1,80 @@
+import math
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+import pytest
+from app.strategies import MovingAverageCrossover
+from app.strategies.incremental import (
+    IncrementalMovingAverageCrossover, IncrementalRSI, LiveSignals, RollingMean
+)
+from app.utils.market_data import SyntheticProvider
+
+@pytest.fixture
+def closes():
+    return SyntheticProvider().fetch(['AAPL'], '1y')['AAPL']['Close']
+
+def wilder_rsi(closes, period):
+    deltas = np.diff(closes)
+    gains, losses = np.maximum(deltas, 0), np.maximum(-deltas, 0)
+    avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+    rsi = [100 - 100 / (1 + avg_gain / avg_loss)]
+    for gain, loss in zip(gains[period:], losses[period:]):
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+        rsi.append(100 - 100 / (1 + avg_gain / avg_loss))
+    return rsi
+
+def test_rolling_mean_ring_buffer():
+    mean = RollingMean(3)
+    values = [mean.push(x) for x in [1.0, 2.0, 3.0, 4.0, 5.0]]
+    assert values == [1.0, 1.5, 2.0, 3.0, 4.0]
+    assert mean.peek(9.0) == pytest.approx((4.0 + 5.0 + 9.0) / 3)
+    assert mean.value == 4.0
+
+def test_incremental_moving_average_matches_batch(closes):
+    batch = MovingAverageCrossover(10, 30).generate_signals(closes.to_frame('Close'))
+    live = IncrementalMovingAverageCrossover(10, 30)
+    results = pd.DataFrame([live.update(close) for close in closes], index=closes.index)
+    np.testing.assert_allclose(results['short_mavg'], batch['short_mavg'])
+    np.testing.assert_allclose(results['long_mavg'], batch['long_mavg'])
+    np.testing.assert_array_equal(results['signal'], batch['signal'])
+    np.testing.assert_array_equal(results['positions'], batch['positions'])
+
+def test_incremental_rsi_uses_wilder_smoothing(closes):
+    live = IncrementalRSI(period=14)
+    results = [live.update(close)['rsi'] for close in closes]
+    assert all(math.isnan(rsi) for rsi in results[:14])
+    np.testing.assert_allclose(results[14:], wilder_rsi(closes.to_numpy(), 14))
+
+def test_live_signals_roll_over_and_checkpoint(closes, tmp_path):
+    signals = LiveSignals()
+    signals.seed('AAPL', 'rsi', closes)
+    last_day = closes.index[-1].date()
+
+    signals.on_prices({'AAPL': closes.iloc[-1] * 1.01}, {'AAPL': last_day})
+    indicator = signals.entries[('AAPL', 'rsi')]['indicator']
+    assert indicator.prev_close == closes.iloc[-2]
+
+    # Weekend and holiday ticks still carry the last session's bar date.
+    signals.on_prices({'AAPL': closes.iloc[-1] * 1.01}, {'AAPL': last_day})
+    assert indicator.prev_close == closes.iloc[-2]
+
+    signals.on_prices({'AAPL': closes.iloc[-1] * 1.02}, {'AAPL': last_day + timedelta(days=3)})
+    assert indicator.prev_close == pytest.approx(closes.iloc[-1] * 1.01)
+
+    path = tmp_path / 'signals.json'
+    signals.save(str(path))
+    restored = LiveSignals()
+    restored.load(str(path))
+    assert restored.latest('AAPL', 'rsi') == pytest.approx(signals.latest('AAPL', 'rsi'), nan_ok=True)
+
+def test_idle_live_signals_are_evicted(closes):
+    signals = LiveSignals(idle_ttl=0)
+    signals.seed('AAPL', 'rsi', closes)
+    signals.seed('MSFT', 'rsi', closes)
+    assert signals.evict(keep={('MSFT', 'rsi')}) == [('AAPL', 'rsi')]
+    assert signals.symbols() == ['MSFT']
+
+    signals.idle_ttl = 3600
+    signals.seed('AAPL', 'moving_average', closes)
+    assert signals.evict() == []
@@ -0,0 +1,96 @@
+import json
+import logging
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from app.utils.logger import LogStats, LokiShipper, NonBlockingQueueHandler
+from app.utils.metrics import registry
+
+class LokiStandIn(BaseHTTPRequestHandler):
+    pushes = []
+    status = 204
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        if self.status < 300:
+            self.pushes.append(json.loads(body))
+        self.send_response(self.status)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def loki():
+    LokiStandIn.pushes, LokiStandIn.status = [], 204
+    server = HTTPServer(('127.0.0.1', 0), LokiStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield LokiStandIn, f'http://127.0.0.1:{server.server_port}/loki/api/v1/push'
+    server.shutdown()
+
+def make_logger(log_queue, stats, start=lambda: None):
+    logger = logging.getLogger(f'test-loki-{id(log_queue)}')
+    logger.propagate = False
+    logger.addHandler(NonBlockingQueueHandler(log_queue, stats, start))
+    logger.setLevel(logging.INFO)
+    return logger
+
+def test_records_are_shipped_in_batches(loki):
+    sink, url = loki
+    log_queue, stats = queue.Queue(), LogStats()
+    logger = make_logger(log_queue, stats)
+    for i in range(250):
+        logger.warning('trade %d', i)
+    shipper = LokiShipper(log_queue, url, {'application': 'test'}, stats, batch_size=100, flush_interval=0.05)
+    shipper.start()
+    shipper.stop()
+
+    assert stats['shipped'] == 250
+    assert len(sink.pushes) == 3
+    stream = sink.pushes[0]['streams'][0]
+    assert stream['stream'] == {'application': 'test', 'level': 'warning'}
+    assert stream['values'][0][1] == 'trade 0'
+
+def test_full_queue_drops_without_blocking():
+    stats = LogStats()
+    logger = make_logger(queue.Queue(maxsize=2), stats)
+    for i in range(5):
+        logger.info('message %d', i)
+    assert stats == {'enqueued': 2, 'dropped': 3}
+
+def test_failed_pushes_are_spooled_and_replayed(loki, tmp_path):
+    sink, url = loki
+    spool = tmp_path / 'loki.spool'
+    stats = LogStats()
+    shipper = LokiShipper(queue.Queue(), url, {'application': 'test'}, stats, spool_path=str(spool))
+    record = logging.LogRecord('test', logging.ERROR, __file__, 1, 'boom', None, None)
+
+    sink.status = 500
+    shipper.ship([record, record])
+    assert stats['spooled'] == 2
+    assert len(spool.read_text().splitlines()) == 2
+
+    sink.status = 204
+    shipper.ship([record])
+    assert stats['shipped'] == 3
+    assert stats['spooled'] == 0
+    assert not spool.exists()
+
+def test_stats_are_exported_to_prometheus():
+    def sample(name, **labels):
+        return registry.get_sample_value(name, labels) or 0
+
+    before = sample('loki_log_records_total', result='dropped'), sample('loki_log_spooled_records')
+    stats = LogStats()
+    threads = [threading.Thread(target=lambda: [stats.add('dropped') for _ in range(1000)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats.add('spooled', 5)
+    stats.add('spooled', -2)
+
+    assert stats == {'dropped': 4000, 'spooled': 3}
+    assert sample('loki_log_records_total', result='dropped') - before[0] == 4000
+    assert sample('loki_log_spooled_records') - before[1] == 3
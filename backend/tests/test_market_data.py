@@ -0,0 +1,49 @@
+import threading
+from app.utils.market_data import MarketDataService, SyntheticProvider
+
+def test_cache_hits_within_ttl():
+    provider = SyntheticProvider()
+    service = MarketDataService(provider=provider, ttl=60)
+    first = service.latest_prices(['AAPL', 'MSFT'])
+    second = service.latest_prices(['MSFT', 'AAPL'])
+    assert first == second
+    assert provider.calls == 1
+    assert service.hits == 2
+
+def test_only_missing_symbols_are_fetched():
+    calls = []
+
+    class RecordingProvider(SyntheticProvider):
+        def fetch(self, symbols, period):
+            calls.append(list(symbols))
+            return super().fetch(symbols, period)
+
+    service = MarketDataService(provider=RecordingProvider())
+    service.history('AAPL', period='1y')
+    closes = service.closes(['AAPL', 'GOOG'], period='1y')
+    assert calls == [['AAPL'], ['GOOG']]
+    assert list(closes.columns) == ['AAPL', 'GOOG']
+    assert len(closes) == 252
+
+def test_expired_and_evicted_entries_are_refetched():
+    provider = SyntheticProvider()
+    service = MarketDataService(provider=provider, ttl=0, max_entries=1)
+    service.history('AAPL')
+    service.history('AAPL')
+    assert provider.calls == 2
+
+    service = MarketDataService(provider=provider, ttl=60, max_entries=1)
+    service.history('AAPL')
+    service.history('MSFT')
+    service.history('AAPL')
+    assert provider.calls == 5
+
+def test_concurrent_misses_share_one_fetch():
+    provider = SyntheticProvider(latency=0.2)
+    service = MarketDataService(provider=provider)
+    threads = [threading.Thread(target=service.history, args=('AAPL',)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert provider.calls == 1
@@ -0,0 +1,27 @@
+from flask import Flask
+from app import create_app
+from app.utils import metrics
+from app.utils.market_data import MarketDataService, SyntheticProvider
+
+def test_metrics_endpoint_reports_route_latency():
+    client = create_app().test_client()
+    client.get('/api/health')
+    MarketDataService(provider=SyntheticProvider()).latest_prices(['AAPL', 'AAPL'])
+    body = client.get('/api/metrics').get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{blueprint="",endpoint="health_check",method="GET",status="200"}' in body
+    assert 'market_data_fetch_seconds_count{period="1d"}' in body
+    assert 'market_data_cache_hit_ratio' in body
+
+def test_profile_header_dumps_profile(tmp_path):
+    app = Flask(__name__)
+    app.config.update(PROFILING_ENABLED=True, PROFILE_DIR=str(tmp_path))
+    metrics.init_app(app)
+
+    @app.route('/api/slow')
+    def slow():
+        return {'total': sum(range(10000))}
+
+    client = app.test_client()
+    assert 'X-Profile-File' not in client.get('/api/slow').headers
+    response = client.get('/api/slow', headers={'X-Profile': '1'})
+    assert (tmp_path / response.headers['X-Profile-File']).exists()
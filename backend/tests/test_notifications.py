@@ -0,0 +1,80 @@
+import threading
+import time
+import pytest
+from flask import Flask
+from app.notifications.dispatcher import NotificationDispatcher, QueueFull
+
+def wait_for(dispatcher, job_ids, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if all((dispatcher.status(job_id) or {}).get('status') in ('sent', 'failed') for job_id in job_ids):
+            return
+        time.sleep(0.01)
+    raise AssertionError('notifications not settled')
+
+def make_dispatcher(**kwargs):
+    dispatcher = NotificationDispatcher(**kwargs)
+    dispatcher.init_app(Flask(__name__))
+    return dispatcher
+
+def test_jobs_are_sent_in_batches():
+    batches = []
+    release = threading.Event()
+
+    def email(app, jobs):
+        release.wait()
+        batches.append(len(jobs))
+        return {}
+
+    dispatcher = make_dispatcher(workers=1, batch_size=50)
+    dispatcher.channels = {'email': email}
+    job_ids = [dispatcher.submit(['email'], 1, 'a@example.com', 'Hi', 'Body') for _ in range(20)]
+    release.set()
+    wait_for(dispatcher, job_ids)
+    assert sum(batches) == 20
+    assert len(batches) <= 2
+
+def test_failed_channels_are_retried_with_backoff():
+    attempts = []
+
+    def flaky(app, jobs):
+        attempts.append(time.time())
+        return {job['id']: 'unavailable' for job in jobs} if len(attempts) < 3 else {}
+
+    dispatcher = make_dispatcher(workers=1, backoff=0.01, max_retries=3)
+    dispatcher.channels = {'email': flaky, 'push': lambda app, jobs: {}}
+    job_id = dispatcher.submit(['email', 'push'], 1, 'a@example.com', 'Hi', 'Body')
+    wait_for(dispatcher, [job_id])
+    job = dispatcher.status(job_id)
+    assert job['status'] == 'sent'
+    assert job['attempts'] == 3
+    assert job['channels'] == {'email': 'sent', 'push': 'sent'}
+
+def test_gives_up_after_max_retries():
+    dispatcher = make_dispatcher(workers=1, backoff=0.01, max_retries=1)
+    dispatcher.channels = {'email': lambda app, jobs: {job['id']: 'down' for job in jobs}}
+    job_id = dispatcher.submit(['email'], 1, 'a@example.com', 'Hi', 'Body')
+    wait_for(dispatcher, [job_id])
+    assert dispatcher.status(job_id)['channels'] == {'email': 'failed'}
+
+def test_full_queue_is_rejected():
+    release = threading.Event()
+    dispatcher = make_dispatcher(workers=1, maxsize=1, batch_size=1)
+    dispatcher.channels = {'email': lambda app, jobs: release.wait() and {}}
+    dispatcher.submit(['email'], 1, 'a@example.com', 'Hi', 'Body')
+    with pytest.raises(QueueFull):
+        for _ in range(3):
+            dispatcher.submit(['email'], 1, 'a@example.com', 'Hi', 'Body')
+    release.set()
+
+def test_job_state_is_readable_from_another_worker(app):
+    accepting, other = NotificationDispatcher(workers=1), NotificationDispatcher()
+    accepting.init_app(app)
+    other.init_app(app)
+    accepting.channels = {'email': lambda app, jobs: {}}
+    job_id = accepting.submit(['email'], 1, 'a@example.com', 'Hi', 'Body')
+    wait_for(other, [job_id])
+
+    assert job_id not in other.jobs
+    assert other.status(job_id)['channels'] == {'email': 'sent'}
+    assert other.status('missing') is None
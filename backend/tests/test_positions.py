@@ -0,0 +1,75 @@
+import os
+import threading
+import pytest
+from app import create_app
+from app.extensions import db
+from app.models.trade import Trade
+from app.models.user import User
+from app.models.position import Position, apply_trade, rebuild_positions, verify_positions
+from app.portfolio.routes import portfolio_performance
+
+def record(session, symbol, trade_type, quantity, price):
+    trade = Trade(user_id=1, symbol=symbol, type=trade_type, quantity=quantity, price=price)
+    session.add(trade)
+    apply_trade(trade)
+    session.commit()
+
+def test_apply_trade_updates_position_incrementally(session):
+    record(session, 'AAPL', 'buy', 10, 100.0)
+    record(session, 'AAPL', 'buy', 5, 110.0)
+    record(session, 'AAPL', 'sell', 3, 120.0)
+    position = Position.query.filter_by(user_id=1, symbol='AAPL').one()
+    assert position.quantity == 12
+    assert position.cost_basis == pytest.approx(10 * 100.0 + 5 * 110.0 - 3 * 120.0)
+    assert verify_positions() == []
+
+def test_rebuild_repairs_drifted_positions(session):
+    record(session, 'AAPL', 'buy', 10, 100.0)
+    record(session, 'MSFT', 'buy', 2, 300.0)
+    Position.query.filter_by(symbol='AAPL').one().quantity = 99
+    session.add(Position(user_id=1, symbol='TSLA', quantity=1, cost_basis=1))
+    session.commit()
+    assert {row[1] for row in verify_positions()} == {'AAPL', 'TSLA'}
+
+    assert rebuild_positions() == 2
+    assert verify_positions() == []
+    assert Position.query.filter_by(symbol='AAPL').one().quantity == 10
+
+def test_performance_of_a_position_with_no_cost_basis(session, synthetic_bars):
+    record(session, 'AAPL', 'buy', 10, 100.0)
+    record(session, 'AAPL', 'sell', 5, 200.0)
+    performance = portfolio_performance(1)['AAPL']
+    assert performance['cost_basis'] == 0
+    assert performance['profit_loss'] == performance['current_value']
+    assert performance['profit_loss_percent'] is None
+
+# SQLite serializes writers, so the lost-update race only shows on Postgres
+# (set TEST_POSTGRES_URL; its tables are dropped and recreated).
+@pytest.mark.parametrize('backend', ['sqlite', 'postgres'])
+def test_concurrent_trades_on_one_position_are_not_lost(tmp_path, backend):
+    url = f"sqlite:///{tmp_path / 'positions.db'}" if backend == 'sqlite' else os.getenv('TEST_POSTGRES_URL')
+    if not url:
+        pytest.skip('TEST_POSTGRES_URL is not set')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': url, 'SCHEDULER_ENABLED': False})
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(id=1, username='trader', email='trader@example.com'))
+        db.session.commit()
+
+    barrier = threading.Barrier(8)
+
+    def trade():
+        with app.app_context():
+            barrier.wait()
+            for _ in range(10):
+                record(db.session, 'AAPL', 'buy', 1, 100.0)
+
+    threads = [threading.Thread(target=trade) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with app.app_context():
+        assert Position.query.filter_by(user_id=1, symbol='AAPL').one().quantity == 80
+        assert verify_positions() == []
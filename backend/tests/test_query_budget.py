@@ -0,0 +1,41 @@
+import pytest
+from app.auth.identity import user_cache
+from app.extensions import db
+from app.models.position import Position
+from app.models.user import User
+from app.utils.metrics import QueryBudgetExceeded, query_budget
+from app.utils.stock_updater import price_stream, user_room
+
+SYMBOLS = [f'SYM{i}' for i in range(20)]
+
+def test_portfolio_and_admin_endpoints_stay_within_budget(app, session, synthetic_bars, auth_headers):
+    app.config['QUERY_BUDGET'] = 2
+    session.add(User(id=2, username='admin', email='admin@example.com', is_admin=True))
+    session.add_all(User(id=i, username=f'user{i}', email=f'user{i}@example.com') for i in range(3, 23))
+    session.add_all(Position(user_id=1, symbol=symbol, quantity=1.0, cost_basis=100.0) for symbol in SYMBOLS)
+    session.commit()
+    user_cache.clear()
+    client = app.test_client()
+
+    trader, admin = auth_headers(1), auth_headers(2)
+    assert len(client.get('/api/portfolio/holdings', headers=trader).json) == 20
+    assert len(client.get('/api/portfolio/performance', headers=trader).json) == 20
+    assert len(client.get('/api/admin/users', headers=admin).json) == 22
+    assert client.get('/api/admin/stats', headers=admin).json == {'total_users': 22, 'admin_users': 1}
+    price_stream.unsubscribe(user_room(1))
+
+def test_exceeding_budget_fails_request(app, session):
+    @app.route('/n-plus-one')
+    def n_plus_one():
+        return {'users': [db.session.get(User, 1, populate_existing=True).username for _ in range(3)]}
+
+    @app.route('/bulk')
+    @query_budget(5)
+    def bulk():
+        return {'users': [db.session.get(User, 1, populate_existing=True).username for _ in range(3)]}
+
+    app.config['QUERY_BUDGET'] = 2
+    client = app.test_client()
+    with pytest.raises(QueryBudgetExceeded, match='n_plus_one'):
+        client.get('/n-plus-one')
+    assert client.get('/bulk').status_code == 200
@@ -0,0 +1,65 @@
+import gzip
+import json
+import pytest
+from app.models.position import apply_trade
+from app.models.trade import Trade
+from app.models.user import User
+from app.utils.response_cache import response_cache
+
+def test_unchanged_holdings_return_304_until_a_trade(app, auth_headers):
+    client, headers = app.test_client(), auth_headers()
+    first = client.get('/api/portfolio/holdings', headers=headers)
+    assert first.status_code == 200 and first.json == {}
+    etag = first.headers['ETag']
+
+    again = client.get('/api/portfolio/holdings', headers=dict(headers, **{'If-None-Match': etag}))
+    assert again.status_code == 304 and again.get_data() == b''
+
+    client.post('/api/trading/execute', headers=headers,
+                json={'symbol': 'AAPL', 'quantity': 3, 'price': 100.0, 'type': 'buy'})
+    after = client.get('/api/portfolio/holdings', headers=dict(headers, **{'If-None-Match': etag}))
+    assert after.status_code == 200 and after.json == {'AAPL': 3.0}
+    assert after.headers['ETag'] != etag
+
+def test_trades_recorded_by_another_process_are_not_served_stale(app, session, auth_headers):
+    client, headers = app.test_client(), auth_headers()
+    assert client.get('/api/portfolio/holdings', headers=headers).json == {}
+    assert client.get('/api/trading/history', headers=headers).json['trades'] == []
+
+    # Another worker records a trade; this process's cache is never invalidated.
+    trade = Trade(user_id=1, symbol='MSFT', quantity=2, price=300.0, type='buy')
+    session.add(trade)
+    session.flush()
+    apply_trade(trade)
+    session.commit()
+    assert client.get('/api/portfolio/holdings', headers=headers).json == {'MSFT': 2.0}
+    assert len(client.get('/api/trading/history', headers=headers).json['trades']) == 1
+
+@pytest.mark.parametrize('encoding, decompress', [
+    ('gzip', gzip.decompress),
+    ('br', lambda body: pytest.importorskip('brotli').decompress(body)),
+])
+def test_large_responses_are_compressed(app, monkeypatch, encoding, decompress, auth_headers):
+    monkeypatch.setattr(response_cache, 'min_size', 0)
+    client, headers = app.test_client(), auth_headers()
+    for i in range(20):
+        client.post('/api/trading/execute', headers=headers,
+                    json={'symbol': 'AAPL', 'quantity': 1, 'price': 100.0 + i, 'type': 'buy'})
+    plain = client.get('/api/trading/history?limit=20', headers=headers)
+    response = client.get('/api/trading/history?limit=20', headers=dict(headers, **{'Accept-Encoding': encoding}))
+    assert response.headers['Content-Encoding'] == encoding
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert json.loads(decompress(response.get_data())) == plain.json
+    assert len(response.get_data()) < len(plain.get_data())
+
+def test_admin_stats_are_invalidated_by_user_writes(app, session, auth_headers):
+    admin = User(id=2, username='admin', email='admin@example.com', is_admin=True)
+    session.add(admin)
+    session.commit()
+    client, headers = app.test_client(), auth_headers(2)
+    assert client.get('/api/admin/stats', headers=headers).json == {'total_users': 2, 'admin_users': 1}
+
+    client.post('/api/auth/register', json={'username': 'new', 'email': 'new@example.com', 'password': 'pw'})
+    assert client.get('/api/admin/stats', headers=headers).json['total_users'] == 3
+    client.put('/api/admin/user/3', headers=headers, json={'is_admin': True})
+    assert client.get('/api/admin/stats', headers=headers).json['admin_users'] == 2
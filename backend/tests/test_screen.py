@@ -0,0 +1,53 @@
+import json
+import time
+from app.strategies import RSIStrategy
+from app.trading import screen as screen_module
+from app.utils.bar_store import bar_store
+from app.utils.market_data import SyntheticProvider
+
+def test_screen_streams_one_line_per_symbol_and_strategy(app, synthetic_bars, auth_headers):
+    headers = auth_headers()
+    response = app.test_client().post('/api/trading/screen', headers=headers, json={
+        'symbols': ['aapl', 'MSFT', 'GOOG'],
+        'strategies': ['rsi', {'strategy': 'moving_average', 'params': {'short_window': 5, 'long_window': 20}}],
+        'period': '6mo',
+    })
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    results, summary = lines[:-1], lines[-1]['summary']
+    assert sorted((r['symbol'], r['strategy']) for r in results) == sorted(
+        (symbol, strategy) for symbol in ['AAPL', 'MSFT', 'GOOG'] for strategy in ['rsi', 'moving_average']
+    )
+    assert summary == {'results': 6, 'errors': [], 'timed_out': [], 'missing': []}
+
+    closes = bar_store.closes(['AAPL'], period='6mo')
+    expected = RSIStrategy().generate_signals_batch(closes).iloc[-1][('signal', 'AAPL')]
+    rsi = next(r for r in results if r['symbol'] == 'AAPL' and r['strategy'] == 'rsi')
+    assert rsi['latest_signal'] == expected
+
+def test_screen_and_analyze_report_the_same_rsi_signal(app, synthetic_bars, auth_headers):
+    headers = auth_headers()
+    client = app.test_client()
+    symbols = [f'SYM{i}' for i in range(60)]
+    lines = client.post('/api/trading/screen', headers=headers,
+                        json={'symbols': symbols, 'strategies': ['rsi']}).get_data(as_text=True).splitlines()
+    screened = {r['symbol']: r['latest_signal'] for r in map(json.loads, lines[:-1])}
+    analyzed = {symbol: client.post('/api/trading/analyze', headers=headers,
+                                    json={'symbol': symbol, 'strategy': 'rsi'}).json['latest_signal']
+                for symbol in symbols}
+    assert screened == analyzed
+    assert set(screened.values()) != {0.0}  # some symbols are overbought or oversold
+
+def test_screen_rejects_unknown_strategy(app, auth_headers):
+    headers = auth_headers()
+    response = app.test_client().post('/api/trading/screen', headers=headers,
+                                      json={'symbols': ['AAPL'], 'strategies': ['momentum']})
+    assert response.status_code == 400
+
+def test_screen_reports_work_past_the_deadline(monkeypatch):
+    closes = SyntheticProvider().fetch(['AAPL'], '1y')['AAPL'][['Close']].rename(columns={'Close': 'AAPL'})
+    monkeypatch.setattr(screen_module, 'evaluate', lambda closes, name, params: time.sleep(0.5) or [])
+    items = list(screen_module.screen(closes, [('rsi', {})], timeout=0.05))
+    assert items == [{'summary': {'results': 0, 'errors': [], 'timed_out': [
+        {'strategy': 'rsi', 'params': {}, 'symbols': ['AAPL']}
+    ]}}]
@@ -0,0 +1,107 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app.extensions import scheduler, socketio
+from app.models.position import Position
+from app.utils.market_data import market_data, SyntheticProvider
+from app.utils.stock_updater import PriceStream, schedule_stock_updates, price_stream, user_room, JOB_ID
+
+@pytest.fixture
+def provider():
+    original, provider = market_data.provider, SyntheticProvider()
+    market_data.set_provider(provider)
+    yield provider
+    market_data.set_provider(original)
+
+def test_tick_fetches_union_once_and_fans_out_per_room(provider):
+    stream = PriceStream()
+    stream.subscribe('user:1', ['AAPL', 'MSFT'])
+    stream.subscribe('user:2', ['AAPL'])
+    sent = []
+    stream.tick(lambda event, message, to: sent.append((to, sorted(message['prices']))))
+    assert provider.calls == 1
+    assert sorted(sent) == [('user:1', ['AAPL', 'MSFT']), ('user:2', ['AAPL'])]
+
+def test_only_changed_prices_are_sent_with_sequence_numbers(provider):
+    stream = PriceStream(min_tick=0.5)
+    stream.subscribe('user:1', ['AAPL', 'MSFT'])
+    sent = []
+    emit = lambda event, message, to: sent.append((event, message))
+    stream.tick(emit)
+    stream.tick(emit)
+    assert len(sent) == 1
+
+    base = stream.published['AAPL']
+    market_data.set_provider(ShiftedProvider({'AAPL': 0.2}))
+    stream.tick(emit)
+    market_data.set_provider(ShiftedProvider({'AAPL': 1.0}))
+    stream.tick(emit)
+    assert [message['seq'] for _, message in sent] == [1, 2]
+    assert sent[-1][1]['prices'] == {'AAPL': pytest.approx(base + 1.0)}
+
+    stream.subscribe('user:1', ['AAPL', 'MSFT', 'GOOG'])
+    stream.tick(emit)
+    assert sorted(sent[-1][1]['prices']) == ['GOOG']
+    snapshot = stream.snapshot('user:1')
+    assert snapshot['seq'] == 3
+    assert sorted(snapshot['prices']) == ['AAPL', 'GOOG', 'MSFT']
+
+class ShiftedProvider(SyntheticProvider):
+    def __init__(self, shifts):
+        super().__init__()
+        self.shifts = shifts
+
+    def fetch(self, symbols, period):
+        frames = super().fetch(symbols, period)
+        for symbol, shift in self.shifts.items():
+            if symbol in frames:
+                frames[symbol]['Close'] += shift
+        return frames
+
+def test_subscriptions_are_reference_counted():
+    stream = PriceStream()
+    stream.subscribe('user:1', ['AAPL', 'MSFT'])
+    stream.subscribe('user:1', ['AAPL', 'MSFT'])
+    stream.subscribe('user:2', ['AAPL'])
+    assert stream.refcounts == {'AAPL': 2, 'MSFT': 1}
+
+    stream.connect('sid-1', 'user:1')
+    stream.connect('sid-2', 'user:1')
+    stream.disconnect('sid-1')
+    assert stream.symbols() == ['AAPL', 'MSFT']
+    stream.disconnect('sid-2')
+    assert stream.symbols() == ['AAPL']
+
+def test_repeated_scheduling_keeps_one_job():
+    for _ in range(5):
+        schedule_stock_updates('user:1', ['AAPL'])
+    schedule_stock_updates('user:2', ['AAPL', 'GOOG'])
+    assert [job.id for job in scheduler.get_jobs()] == [JOB_ID]
+    scheduler.remove_job(JOB_ID)
+    price_stream.unsubscribe('user:1')
+    price_stream.unsubscribe('user:2')
+
+def test_user_room_follows_connected_sockets(app, session, provider):
+    session.add_all([Position(user_id=1, symbol='AAPL', quantity=2.0, cost_basis=300.0),
+                     Position(user_id=1, symbol='MSFT', quantity=1.0, cost_basis=400.0)])
+    session.commit()
+    token = create_access_token(identity='1')
+    headers = {'Authorization': f'Bearer {token}'}
+    http = app.test_client()
+    http.get('/api/portfolio/holdings', headers=headers)
+    assert user_room(1) not in price_stream.rooms  # no socket, nothing to stream to
+
+    client = socketio.test_client(app, auth={'token': token})
+    assert client.get_received()[0]['name'] == 'stock_snapshot'
+    assert price_stream.rooms[user_room(1)] == {'AAPL', 'MSFT'}
+    http.post('/api/trading/execute', headers=headers,
+              json={'symbol': 'GOOG', 'quantity': 1, 'price': 100.0, 'type': 'buy'})
+    http.get('/api/portfolio/holdings', headers=headers)
+    assert price_stream.rooms[user_room(1)] == {'AAPL', 'GOOG', 'MSFT'}
+    client.disconnect()
+    assert user_room(1) not in price_stream.rooms
+
+    client = socketio.test_client(app, auth={'token': token})  # reconnect without refetching holdings
+    assert price_stream.rooms[user_room(1)] == {'AAPL', 'GOOG', 'MSFT'}
+    client.disconnect()
+    if scheduler.get_job(JOB_ID):
+        scheduler.remove_job(JOB_ID)
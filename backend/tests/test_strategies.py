@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.strategies import MovingAverageCrossover, RSIStrategy
+from app.strategies.incremental import IncrementalRSI
+from app.utils.market_data import SyntheticProvider
+
+SYMBOLS = ['AAPL', 'MSFT', 'GOOG']
+
+@pytest.fixture
+def frames():
+    return SyntheticProvider().fetch(SYMBOLS, '1y')
+
+def reference_moving_average(data, short_window, long_window):
+    signals = pd.DataFrame(index=data.index)
+    short_mavg = data['Close'].rolling(window=short_window, min_periods=1).mean()
+    long_mavg = data['Close'].rolling(window=long_window, min_periods=1).mean()
+    signals['signal'] = np.where(short_mavg > long_mavg, 1.0, 0.0)
+    signals.iloc[:short_window, 0] = 0.0
+    return signals['signal']
+
+def reference_rsi(data, period, overbought, oversold):
+    # Wilder's RSI, bar by bar, as served by /analyze and the alerts.
+    indicator = IncrementalRSI(period, overbought, oversold)
+    return pd.Series([indicator.update(float(close))['signal'] for close in data['Close']], index=data.index)
+
+def test_moving_average_matches_reference(frames):
+    strategy = MovingAverageCrossover(short_window=20, long_window=50)
+    for data in frames.values():
+        signals = strategy.generate_signals(data)
+        assert list(signals.columns) == ['signal', 'short_mavg', 'long_mavg', 'positions']
+        expected = reference_moving_average(data, 20, 50)
+        np.testing.assert_array_equal(signals['signal'], expected)
+        np.testing.assert_array_equal(signals['positions'], expected.diff())
+
+def test_rsi_matches_reference(frames):
+    strategy = RSIStrategy()
+    for data in frames.values():
+        signals = strategy.generate_signals(data)
+        assert list(signals.columns) == ['rsi', 'signal', 'positions']
+        np.testing.assert_array_equal(signals['signal'], reference_rsi(data, 14, 70, 30))
+
+@pytest.mark.parametrize('strategy', [MovingAverageCrossover(20, 50), RSIStrategy()])
+def test_batch_matches_per_symbol(frames, strategy):
+    closes = pd.DataFrame({symbol: data['Close'] for symbol, data in frames.items()})
+    batch = strategy.generate_signals_batch(closes)
+    for symbol, data in frames.items():
+        pd.testing.assert_frame_equal(
+            batch.xs(symbol, axis=1, level=1),
+            strategy.generate_signals(data),
+            check_names=False
+        )
@@ -0,0 +1,46 @@
+import json
+from datetime import datetime, timedelta
+from app.models.trade import Trade
+from app.trading.history import decode_cursor, history_query, page, stream_csv, stream_ndjson
+
+START = datetime(2024, 1, 1)
+
+def add_trades(session, count):
+    for i in range(count):
+        session.add(Trade(
+            user_id=1,
+            symbol='AAPL' if i % 2 else 'MSFT',
+            quantity=1,
+            price=100 + i,
+            type='buy',
+            timestamp=START + timedelta(days=i // 3)  # three trades share each timestamp
+        ))
+    session.commit()
+
+def test_keyset_pages_cover_every_trade_once(session):
+    add_trades(session, 25)
+    seen, cursor = [], None
+    while True:
+        trades, next_cursor = page(history_query(1, cursor=cursor), 4)
+        seen.extend(trade['id'] for trade in trades)
+        if next_cursor is None:
+            break
+        cursor = decode_cursor(next_cursor)
+    assert len(seen) == 25
+    assert seen == sorted(seen, reverse=True)
+
+def test_filters(session):
+    add_trades(session, 12)
+    trades, _ = page(history_query(1, symbol='AAPL', start=START + timedelta(days=1),
+                                   end=START + timedelta(days=3)), 100)
+    assert {trade['symbol'] for trade in trades} == {'AAPL'}
+    assert len(trades) == 3
+    assert all('2024-01-02' <= trade['timestamp'] < '2024-01-04' for trade in trades)
+
+def test_streamed_exports(session):
+    add_trades(session, 5)
+    rows = [json.loads(line) for line in stream_ndjson(history_query(1))]
+    assert [row['id'] for row in rows] == [5, 4, 3, 2, 1]
+    lines = ''.join(stream_csv(history_query(1))).splitlines()
+    assert lines[0] == 'id,symbol,quantity,price,type,timestamp'
+    assert len(lines) == 6
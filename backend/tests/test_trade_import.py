@@ -0,0 +1,55 @@
+import io
+import json
+from app.models.position import Position
+from app.models.trade import Trade
+
+def test_csv_import_batches_rows_and_rebuilds_positions(app, session, auth_headers):
+    app.config['IMPORT_BATCH_SIZE'] = 2
+    body = (
+        'id,symbol,quantity,price,type,timestamp\n'
+        '1,aapl,10,100,buy,2024-01-02T15:30:00\n'
+        '2,AAPL,4,110,sell,2024-01-03T15:30:00+00:00\n'
+        '3,MSFT,1,300,hold,2024-01-03T15:30:00\n'
+        '4,MSFT,2,abc,buy,\n'
+        '5,MSFT,5,300,buy,\n'
+        '6,MSFT,1,0,buy,\n'
+    )
+    response = app.test_client().post('/api/trading/import', data=body, content_type='text/csv', headers=auth_headers())
+    assert response.status_code == 201
+    assert response.json['imported'] == 3
+    assert response.json['rejected'] == 3
+    assert [error['row'] for error in response.json['errors']] == [3, 4, 6]
+    assert session.query(Trade).count() == 3
+    positions = {p.symbol: (p.quantity, p.cost_basis) for p in Position.query.filter_by(user_id=1)}
+    assert positions == {'AAPL': (6.0, 560.0), 'MSFT': (5.0, 1500.0)}
+
+def test_ndjson_upload_and_bad_header(app, session, auth_headers):
+    client = app.test_client()
+    lines = '\n'.join([
+        json.dumps({'symbol': 'GOOG', 'quantity': 3, 'price': 140.5, 'type': 'buy'}),
+        'not json',
+    ])
+    response = client.post(
+        '/api/trading/import',
+        data={'file': (io.BytesIO(lines.encode()), 'fills.ndjson')},
+        content_type='multipart/form-data',
+        headers=auth_headers()
+    )
+    assert response.status_code == 201
+    assert (response.json['imported'], response.json['rejected']) == (1, 1)
+
+    response = client.post('/api/trading/import', data='ticker,qty\nAAPL,1\n', content_type='text/csv',
+                           headers=auth_headers())
+    assert response.status_code == 400
+    assert 'Missing columns' in response.json['error']
+
+def test_aborted_import_reports_committed_rows(app, session, auth_headers):
+    app.config['IMPORT_BATCH_SIZE'] = 50
+    rows = ''.join(f'AAPL,1,{100 + i},buy\n' for i in range(600))
+    body = ('symbol,quantity,price,type\n' + rows).encode() + b'\xff\xfe broken\n'
+    response = app.test_client().post('/api/trading/import', data=body, content_type='text/csv',
+                                      headers=auth_headers())
+    assert response.status_code == 400
+    assert 'utf-8' in response.json['error']
+    assert 0 < response.json['imported'] == session.query(Trade).count()
+    assert Position.query.filter_by(user_id=1, symbol='AAPL').one().quantity == response.json['imported']
@@ -6,6 +6,7 @@ import 'react-toastify/dist/ReactToastify.css';
 const Portfolio = () => {
   const [holdings, setHoldings] = useState({});
   const [performance, setPerformance] = useState({});
+  const [prices, setPrices] = useState({});
 
   useEffect(() => {
     const fetchHoldings = async () => {
@@ -31,20 +32,30 @@ const Portfolio = () => {
     fetchHoldings();
     fetchPerformance();
 
-    socket.on('stock_update', (data) => {
-      setHoldings((prevHoldings) => {
-        const updatedHoldings = { ...prevHoldings };
-        Object.keys(data).forEach((symbol) => {
-          if (updatedHoldings[symbol]) {
-            updatedHoldings[symbol].currentPrice = data[symbol];
-          }
-        });
-        return updatedHoldings;
-      });
+    if (!socket.connected) {
+      socket.connect();
+    }
+
+    // Deltas carry a per-room sequence number; on a gap, ask for a fresh snapshot.
+    const lastSeq = {};
+
+    socket.on('stock_snapshot', ({ room, seq, prices: snapshot }) => {
+      lastSeq[room] = seq;
+      setPrices((prevPrices) => ({ ...prevPrices, ...snapshot }));
+    });
+
+    socket.on('stock_delta', ({ room, seq, prices: changed }) => {
+      if (lastSeq[room] !== undefined && seq !== lastSeq[room] + 1) {
+        socket.emit('resync', { room });
+        return;
+      }
+      lastSeq[room] = seq;
+      setPrices((prevPrices) => ({ ...prevPrices, ...changed }));
     });
 
     return () => {
-      socket.off('stock_update');
+      socket.off('stock_snapshot');
+      socket.off('stock_delta');
     };
   }, []);
 
@@ -68,7 +79,7 @@ const Portfolio = () => {
             <tr key={symbol}>
               <td>{symbol}</td>
               <td>{data.quantity}</td>
-              <td>${(holdings[symbol]?.currentPrice || 0).toFixed(2)}</td>
+              <td>${(prices[symbol] || 0).toFixed(2)}</td>
               <td>${data.current_value.toFixed(2)}</td>
               <td>${data.cost_basis.toFixed(2)}</td>
               <td>${data.profit_loss.toFixed(2)}</td>
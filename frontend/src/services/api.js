@@ -19,17 +19,33 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
-export const socket = io(SOCKET_URL);
+export const socket = io(SOCKET_URL, {
+  autoConnect: false,
+  auth: (cb) => cb({ token: localStorage.getItem('token') }),
+});
 
 export const login = (credentials) => api.post('/auth/login', credentials);
 export const register = (userData) => api.post('/auth/register', userData);
 export const executeTradeAPI = (tradeData) => api.post('/trading/execute', tradeData);
-export const getTradeHistoryAPI = () => api.get('/trading/history');
+export const getTradeHistoryAPI = (params) => api.get('/trading/history', { params });
+export const importTradesAPI = (file) => {
+  const form = new FormData();
+  form.append('file', file);
+  return api.post('/trading/import', form);
+};
 export const getHoldingsAPI = () => api.get('/portfolio/holdings');
 export const getPerformanceAPI = () => api.get('/portfolio/performance');
 export const analyzeStockAPI = (symbol, strategy) => api.post('/trading/analyze', { symbol, strategy });
+export const backtestAPI = (backtest) => api.post('/trading/backtest', backtest);
+export const screenAPI = (screen) =>
+  api.post('/trading/screen', screen, { responseType: 'text' }).then((response) =>
+    response.data.split('\n').filter(Boolean).map((line) => JSON.parse(line))
+  );
 export const getNotificationSettingsAPI = () => api.get('/notifications/settings');
 export const updateNotificationSettingsAPI = (settings) => api.post('/notifications/settings', settings);
+export const getAlertsAPI = () => api.get('/notifications/alerts');
+export const createAlertAPI = (alert) => api.post('/notifications/alerts', alert);
+export const deleteAlertAPI = (alertId) => api.delete(`/notifications/alerts/${alertId}`);
 
 export default api;
 export const getUsers = () => api.get('/admin/users');